@@ -0,0 +1,94 @@
+"""
+Memory benchmark for ``fatsecret.models``.
+
+Decodes the same ``food.get`` payloads into raw dicts and into
+:class:`~fatsecret.Food` records and reports the memory held by each, as
+measured by ``tracemalloc``.
+
+Run with::
+
+    PYTHONPATH=src python benchmarks/bench_models.py [number_of_foods]
+"""
+
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+from fatsecret import Food
+
+UNITS = ("g", "ml", "oz")
+MEASURES = ("serving", "cup", "slice", "g")
+
+
+def serving(i, j):
+    return {
+        "serving_id": str(i * 10 + j),
+        "serving_description": f"1 {MEASURES[j % len(MEASURES)]}",
+        "serving_url": f"https://www.fatsecret.com/calories-nutrition/generic/{i}?portionid={j}",
+        "metric_serving_amount": f"{100 + j * 25:.3f}",
+        "metric_serving_unit": UNITS[j % len(UNITS)],
+        "number_of_units": "1.000",
+        "measurement_description": MEASURES[j % len(MEASURES)],
+        "calories": str(80 + i % 300),
+        "carbohydrate": f"{(i % 50) / 3:.2f}",
+        "protein": f"{(i % 30) / 7:.2f}",
+        "fat": f"{(i % 20) / 9:.2f}",
+        "saturated_fat": "0.100",
+        "polyunsaturated_fat": "0.200",
+        "monounsaturated_fat": "0.050",
+        "cholesterol": "0",
+        "sodium": str(i % 400),
+        "potassium": str(i % 200),
+        "fiber": "2.4",
+        "sugar": "10.39",
+        "vitamin_a": "3",
+        "vitamin_c": "14",
+        "calcium": "1",
+        "iron": "1",
+    }
+
+
+def food(i, servings=3):
+    return {
+        "food_id": str(1000000 + i),
+        "food_name": f"Food {i}",
+        "food_type": "Brand" if i % 2 else "Generic",
+        "brand_name": f"Brand {i % 40}",
+        "food_url": f"https://www.fatsecret.com/calories-nutrition/generic/{i}",
+        "servings": {"serving": [serving(i, j) for j in range(servings)]},
+    }
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size, elapsed
+
+
+def main(count=100000):
+    # The documents arrive as JSON text, so both variants start from bytes.
+    documents = [json.dumps(food(i)).encode() for i in range(count)]
+    print(f"{count} foods with 3 servings each")
+
+    raw, raw_size, raw_time = measure(lambda: [json.loads(d) for d in documents])
+    del raw
+    models, model_size, model_time = measure(
+        lambda: [Food.from_dict(json.loads(d)) for d in documents]
+    )
+    assert len(models) == count
+
+    print(f"{'raw dicts':<14} {raw_size / 2 ** 20:8.1f} MiB  {raw_time:6.2f} s")
+    print(f"{'Food records':<14} {model_size / 2 ** 20:8.1f} MiB  {model_time:6.2f} s")
+    print(f"{'ratio':<14} {raw_size / model_size:8.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
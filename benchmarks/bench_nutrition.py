@@ -0,0 +1,96 @@
+"""
+Benchmark for ``fatsecret.nutrition``.
+
+Totals one million food entries per day, once with the dict loop over
+``food_get`` servings that the engine replaces and once with
+:meth:`~fatsecret.NutritionEngine.daily_totals`.
+
+Run with::
+
+    PYTHONPATH=src python benchmarks/bench_nutrition.py [number_of_entries]
+"""
+
+import random
+import sys
+import time
+
+from fatsecret import NutritionEngine
+from fatsecret.models import NUTRIENTS
+from fatsecret.sync import date_int
+
+FOODS = 5000
+SERVINGS = 3
+
+
+def food(i):
+    return {
+        "food_id": str(i),
+        "servings": {
+            "serving": [
+                dict(
+                    {name: f"{random.uniform(0, 50):.2f}" for name in NUTRIENTS},
+                    serving_id=str(i * SERVINGS + j),
+                    number_of_units="1.000" if j else "100.000",
+                )
+                for j in range(SERVINGS)
+            ]
+        },
+    }
+
+
+def dict_loop(foods, entries):
+    """Total entries per day by looking up each serving dict."""
+    servings = {}
+    for data in foods:
+        for serving in data["servings"]["serving"]:
+            servings[serving["serving_id"]] = serving
+    days = {}
+    for entry in entries:
+        serving = servings[entry["serving_id"]]
+        scale = float(entry["number_of_units"]) / float(serving["number_of_units"])
+        day = days.setdefault(entry["date_int"], dict.fromkeys(NUTRIENTS, 0.0))
+        for name in NUTRIENTS:
+            value = serving.get(name)
+            if value:
+                day[name] += float(value) * scale
+    return days
+
+
+def main(count=1000000):
+    random.seed(1)
+    foods = [food(i) for i in range(FOODS)]
+    entries = [
+        {
+            "serving_id": str(random.randrange(FOODS * SERVINGS)),
+            "number_of_units": f"{random.uniform(0.5, 3):.2f}",
+            "date_int": str(19000 + random.randrange(365 * 5)),
+        }
+        for _ in range(count)
+    ]
+    print(f"{count} food entries over {FOODS * SERVINGS} servings")
+
+    started = time.perf_counter()
+    expected = dict_loop(foods, entries)
+    loop = time.perf_counter() - started
+
+    started = time.perf_counter()
+    engine = NutritionEngine(capacity=FOODS * SERVINGS)
+    for data in foods:
+        engine.add_food(data)
+    packed = time.perf_counter() - started
+    started = time.perf_counter()
+    daily = engine.daily_totals(entries)
+    vectorized = time.perf_counter() - started
+
+    day = min(daily)
+    key = str(date_int(day))
+    assert abs(daily[day]["calories"] - expected[key]["calories"]) < 1e-6 * max(
+        1.0, expected[key]["calories"]
+    )
+    print(f"{'dict loop':<22} {loop:7.2f} s")
+    print(f"{'matrix packing':<22} {packed:7.2f} s")
+    print(f"{'vectorized totals':<22} {vectorized:7.2f} s  ({loop / vectorized:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
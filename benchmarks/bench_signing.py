@@ -0,0 +1,66 @@
+"""
+Microbenchmark for OAuth 1.0 request signing.
+
+Compares the per-request work rauth's ``OAuth1Session`` performs (protocol
+parameter generation, deep copies, generic normalisation and re-keying HMAC)
+against ``fatsecret.signing.OAuth1Signer``.
+
+Run with::
+
+    PYTHONPATH=src python benchmarks/bench_signing.py
+"""
+
+from copy import deepcopy
+import timeit
+
+from rauth.service import OAuth1Service
+
+from fatsecret.signing import OAuth1Signer
+
+URL = "https://platform.fatsecret.com/rest/server.api"
+PARAMS = {
+    "method": "foods.search",
+    "format": "json",
+    "search_expression": "greek yoghurt",
+    "page_number": 3,
+    "max_results": 50,
+    "region": "US",
+}
+
+
+def rauth_sign(session):
+    req_kwargs = {"params": deepcopy(PARAMS), "headers": {}}
+    oauth_params = session._get_oauth_params(req_kwargs)
+    oauth_params["oauth_signature"] = session.signature.sign(
+        session.consumer_secret,
+        session.access_token_secret,
+        "GET",
+        URL,
+        oauth_params,
+        req_kwargs,
+    )
+    req_kwargs["params"].update(oauth_params)
+    return req_kwargs["params"]
+
+
+def main(number=20000):
+    service = OAuth1Service(
+        name="bench", consumer_key="key", consumer_secret="secret", base_url=URL
+    )
+    session = service.get_session(token=("token", "token-secret"))
+    signer = OAuth1Signer("key", "secret", "token", "token-secret")
+
+    env = {"session": session, "signer": signer, "rauth_sign": rauth_sign}
+    env.update(URL=URL, PARAMS=PARAMS)
+    legacy = timeit.timeit("rauth_sign(session)", globals=env, number=number)
+    current = timeit.timeit(
+        "signer.sign('GET', URL, PARAMS)", globals=env, number=number
+    )
+    print(f"{number} signatures")
+    print(f"rauth OAuth1Session  {legacy / number * 1e6:6.1f} us/request")
+    print(f"OAuth1Signer         {current / number * 1e6:6.1f} us/request")
+    print(f"speedup              {legacy / current:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
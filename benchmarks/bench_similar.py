@@ -0,0 +1,48 @@
+"""
+Query latency benchmark for ``fatsecret.SimilarFoods``.
+
+Indexes random nutrient profiles and times single and batched top-10
+queries.
+
+Run with::
+
+    PYTHONPATH=src python benchmarks/bench_similar.py [number_of_foods]
+"""
+
+import random
+import sys
+import time
+
+from fatsecret import SimilarFoods
+from fatsecret.models import NUTRIENTS
+
+
+def food(i):
+    serving = {name: f"{random.uniform(0, 40):.2f}" for name in NUTRIENTS}
+    serving.update(
+        serving_id=str(i), metric_serving_amount="100", metric_serving_unit="g"
+    )
+    return {"food_id": str(i), "food_name": f"Food {i}", "servings": serving}
+
+
+def main(count=100000, queries=1000):
+    random.seed(1)
+    index = SimilarFoods(capacity=count)
+    started = time.perf_counter()
+    index.update(food(i) for i in range(count))
+    print(f"indexed {count} foods in {time.perf_counter() - started:.2f} s")
+
+    ids = random.sample(range(count), queries)
+    started = time.perf_counter()
+    for food_id in ids[:100]:
+        index.nearest(food_id)
+    single = (time.perf_counter() - started) / 100
+    started = time.perf_counter()
+    index.nearest_many(ids)
+    batched = (time.perf_counter() - started) / queries
+    print(f"single query  {single * 1e3:7.2f} ms")
+    print(f"batched query {batched * 1e3:7.2f} ms per food ({queries} at once)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
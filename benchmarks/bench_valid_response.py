@@ -0,0 +1,95 @@
+"""
+Microbenchmark for ``Fatsecret.valid_response``.
+
+Compares the previous implementation, which called ``response.json()`` for
+every lookup, against the single-decode dispatch in ``fatsecret.responses``.
+
+Run with::
+
+    PYTHONPATH=src python benchmarks/bench_valid_response.py
+"""
+
+import json
+import timeit
+
+import requests
+
+from fatsecret import Fatsecret, responses
+
+
+def legacy_valid_response(response):
+    """The pre-dispatch implementation, reduced to the branches exercised here."""
+    if response.json():
+        for key in response.json():
+            if key == "foods":
+                return response.json()[key]["food"]
+            elif key == "food_entries":
+                if response.json()[key] is None:
+                    return []
+                entries = response.json()[key]["food_entry"]
+                if isinstance(entries, dict):
+                    return [entries]
+                elif isinstance(entries, list):
+                    return entries
+            elif key == "month":
+                return response.json()[key]["day"]
+
+
+def make_response(payload):
+    resp = requests.Response()
+    resp.status_code = 200
+    resp._content = json.dumps(payload).encode("utf-8")
+    return resp
+
+
+def food(i):
+    return {
+        "food_id": str(i),
+        "food_name": f"Food {i}",
+        "food_type": "Generic",
+        "food_description": "Per 100g - Calories: 89kcal | Fat: 0.33g",
+        "food_url": f"https://www.fatsecret.com/calories-nutrition/generic/{i}",
+    }
+
+
+PAYLOADS = {
+    "foods.search (50 foods)": {
+        "foods": {"food": [food(i) for i in range(50)], "total_results": "50"}
+    },
+    "food_entries.get (40 entries)": {
+        "food_entries": {
+            "food_entry": [
+                dict(food(i), food_entry_id=str(i), calories="120.0") for i in range(40)
+            ]
+        }
+    },
+    "food_entries.get_month (31 days)": {
+        "month": {
+            "day": [
+                {"date_int": str(20000 + d), "calories": "2000", "fat": "70.1"}
+                for d in range(31)
+            ]
+        }
+    },
+}
+
+
+def main(number=2000):
+    backend = "orjson" if responses.orjson is not None else "json"
+    print(f"JSON backend: {backend}, {number} calls each")
+    for name, payload in PAYLOADS.items():
+        response = make_response(payload)
+        assert legacy_valid_response(response) == Fatsecret.valid_response(response)
+        env = {"response": response, "legacy": legacy_valid_response}
+        legacy = timeit.timeit("legacy(response)", globals=env, number=number)
+        env["current"] = Fatsecret.valid_response
+        current = timeit.timeit("current(response)", globals=env, number=number)
+        print(
+            f"{name:<36} legacy {legacy / number * 1e6:8.1f} us/call  "
+            f"current {current / number * 1e6:8.1f} us/call  "
+            f"({legacy / current:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,100 @@
+import importlib
+
+from .autocomplete import AsyncAutocompleter, Autocompleter, SuggestionTrie
+from .backfill import BackfillJob
+from .barcodes import GtinIndex
+from .bloom import BloomFilter
+from .bulk import BulkMixin, BulkResult
+from .cache import (MemoryBackend, ResponseCache, SharedMemoryBackend,
+                    SQLiteBackend)
+from .diary import DiaryMixin
 from .errors import (ApplicationError, AuthenticationError, BaseFatsecretError,
-                     GeneralError, ParameterError)
+                     GeneralError, InvalidBarcode, ParameterError,
+                     RateLimitExceeded)
 from .exercises import ExercisesMixin
 from .fatsecret import Fatsecret
 from .foods import FoodsMixin
 from .meals import MealsMixin
+from .models import Food, FoodEntry, Recipe, SavedMeal, Serving, WeightDay
+from .pagination import PaginationMixin
+from .pool import FatsecretPool
 from .profile import ProfileMixin
+from .ratelimit import RateLimiter
 from .recipes import RecipesMixin
+from .reconcile import ReconcileMixin
+from .retry import RetryPolicy
+from .search import AsyncLocalSearch, FoodSearchIndex, LocalSearch
+from .sync import DiarySync
 from .weight import WeightMixin
+from .writequeue import WriteHandle, WriteQueue
+
+# Modules importing a slow optional dependency are loaded on first access.
+_LAZY = {
+    "AsyncFatsecret": ".async_client",
+    "ColumnarWriter": ".export",
+    "DiaryExporter": ".export",
+    "NutritionEngine": ".nutrition",
+    "SimilarFoods": ".similar",
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     "ApplicationError",
+    "AsyncAutocompleter",
+    "AsyncFatsecret",
+    "AsyncLocalSearch",
     "AuthenticationError",
+    "Autocompleter",
+    "BackfillJob",
     "BaseFatsecretError",
+    "BloomFilter",
+    "BulkMixin",
+    "BulkResult",
+    "ColumnarWriter",
+    "DiaryExporter",
+    "DiaryMixin",
+    "DiarySync",
     "ExercisesMixin",
     "Fatsecret",
     "FatsecretCore",
+    "FatsecretPool",
+    "Food",
+    "FoodEntry",
+    "FoodSearchIndex",
     "FoodsMixin",
     "GeneralError",
+    "GtinIndex",
+    "InvalidBarcode",
+    "LocalSearch",
     "MealsMixin",
+    "MemoryBackend",
+    "NutritionEngine",
+    "PaginationMixin",
     "ParameterError",
     "ProfileMixin",
+    "RateLimitExceeded",
+    "RateLimiter",
+    "Recipe",
     "RecipesMixin",
+    "ReconcileMixin",
+    "ResponseCache",
+    "RetryPolicy",
+    "SavedMeal",
+    "Serving",
+    "SharedMemoryBackend",
+    "SimilarFoods",
+    "SQLiteBackend",
+    "SuggestionTrie",
+    "WeightDay",
     "WeightMixin",
+    "WriteHandle",
+    "WriteQueue",
 ]
@@ -0,0 +1,353 @@
+"""
+fatsecret.async_client
+----------------------
+
+asyncio flavour of the FatSecret client built on ``aiohttp``.
+
+Install with the ``async`` extra: ``pip install pyfatsecret-chocotonic[async]``.
+"""
+
+from typing import Optional, Tuple
+import asyncio
+import functools
+import inspect
+
+from . import responses
+from .bulk import async_fan_out
+from .diary import _as_date, _as_datetime, _days_in_range
+from .exercises import ExercisesMixin
+from .fatsecret import Fatsecret
+from .foods import FoodsMixin
+from .meals import MealsMixin
+from .pagination import MAX_PAGE_SIZE, _check_page_size, afan_out_pages, aiter_pages
+from .profile import ProfileMixin
+from .recipes import RecipesMixin
+from .reconcile import ReconcileResult, plan_food_entries
+from .retry import WRITE_METHODS
+from .singleflight import AsyncSingleFlight, request_key
+from .sync import months
+from .weight import WeightMixin
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - optional dependency
+    aiohttp = None
+
+
+ENDPOINT_MIXINS = (
+    ExercisesMixin,
+    FoodsMixin,
+    MealsMixin,
+    ProfileMixin,
+    RecipesMixin,
+    WeightMixin,
+)
+
+
+class AsyncFatsecret(Fatsecret):
+    """FatSecret client whose endpoint methods are coroutines.
+
+    Every public method of the endpoint mixins is available with the same
+    signature and must be awaited. Requests are signed by the same
+    :class:`~fatsecret.signing.OAuth1Signer` as the synchronous client and
+    sent over a pooled ``aiohttp.ClientSession``.
+    """
+
+    _single_flight_class = AsyncSingleFlight
+
+    def __init__(
+        self,
+        consumer_key: str,
+        consumer_secret: str,
+        session_token: Optional[Tuple[str, str]] = None,
+        http_session=None,
+        max_connections: int = 100,
+        **kwargs,
+    ):
+        """Initialize the asynchronous FatSecret API client.
+
+        Args:
+            consumer_key: API consumer key
+            consumer_secret: API consumer secret
+            session_token: Optional (token, secret) tuple for an existing authenticated session
+            http_session: Optional ``aiohttp.ClientSession`` to share a connection pool
+                between clients. It is not closed by :meth:`close`.
+            max_connections: Size of the connection pool created when no
+                ``http_session`` is given
+            **kwargs: Further options accepted by :class:`~fatsecret.Fatsecret`
+        """
+        if aiohttp is None:
+            raise ImportError(
+                "AsyncFatsecret requires aiohttp; install the 'async' extra"
+            )
+
+        super().__init__(consumer_key, consumer_secret, session_token, **kwargs)
+
+        self.max_connections = max_connections
+        self._http = http_session
+        self._owns_http = http_session is None
+        self._refreshes = set()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    @property
+    def http(self):
+        """The pooled ``aiohttp.ClientSession``, created on first use."""
+        if self._http is None:
+            self._http = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections)
+            )
+        return self._http
+
+    async def _request(self, params: dict, extractor=responses.extract):
+        """Awaitable counterpart of :meth:`Fatsecret._request`."""
+        cacheable = self._cacheable(params, extractor)
+        if cacheable:
+            hit, value = self.cache.lookup(
+                params, lambda: self._revalidate(params, extractor)
+            )
+            if hit:
+                return value
+
+        if self.single_flight is None or params.get("method") in WRITE_METHODS:
+            return await self._load(params, extractor, cacheable)
+        return await self.single_flight.do(
+            request_key(self, params, extractor),
+            self._load,
+            params,
+            extractor,
+            cacheable,
+        )
+
+    def _revalidate(self, params: dict, extractor) -> None:
+        """Refresh a stale cache entry in a background task."""
+        task = asyncio.ensure_future(self._refresh(params, extractor))
+        self._refreshes.add(task)
+        task.add_done_callback(self._refreshes.discard)
+
+    async def _refresh(self, params: dict, extractor) -> None:
+        try:
+            await self._load(params, extractor, True)
+        except asyncio.CancelledError:
+            self.cache.release(params)
+            raise
+        except Exception:
+            self.cache.release(params)
+
+    async def _load(self, params: dict, extractor, cacheable: bool):
+        """Awaitable counterpart of :meth:`Fatsecret._load`."""
+        value = await self._fetch(params, extractor)
+        if cacheable:
+            self.cache.store(params, value)
+        return value
+
+    async def _fetch(self, params: dict, extractor=responses.extract):
+        """Awaitable counterpart of :meth:`Fatsecret._fetch`."""
+        if self.retry is None:
+            return await self._send(params, extractor)
+        return await self.retry.call_async(
+            params.get("method", ""),
+            lambda timeout: self._send(params, extractor, timeout),
+            self.REQUEST_TIMEOUT,
+        )
+
+    async def _send(self, params: dict, extractor=responses.extract, timeout=None):
+        """Send a signed GET with aiohttp and return the extracted payload."""
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire_async()
+        timeout = aiohttp.ClientTimeout(
+            total=self.REQUEST_TIMEOUT if timeout is None else timeout
+        )
+        async with self.http.get(
+            self.api_url,
+            params=self.signer.sign("GET", self.api_url, params),
+            timeout=timeout,
+        ) as response:
+            if response.status >= 500:
+                response.raise_for_status()
+            body = await response.read()
+        return extractor(responses.loads(body))
+
+    def food_get_many(
+        self, food_ids, region=None, language=None, max_concurrency=8, ordered=False
+    ):
+        """Asynchronously fetch many foods; see :meth:`Fatsecret.food_get_many`.
+
+        Returns an async iterator of :class:`~fatsecret.bulk.BulkResult`.
+        """
+        return async_fan_out(
+            lambda food_id: self.food_get_v2(food_id, region, language),
+            food_ids,
+            max_concurrency=max_concurrency,
+            ordered=ordered,
+        )
+
+    def iter_foods_search(
+        self, search_expression, page_size=MAX_PAGE_SIZE, region=None, language=None
+    ):
+        """Async iterator over every matching food; see :meth:`Fatsecret.iter_foods_search`."""
+        _check_page_size(page_size)
+        return aiter_pages(
+            lambda page_number: self.foods_search_page(
+                search_expression, page_number, page_size, region, language
+            ),
+            page_size,
+        )
+
+    def iter_recipes_search(
+        self, search_expression, recipe_type=None, page_size=MAX_PAGE_SIZE
+    ):
+        """Async iterator over every matching recipe; see :meth:`Fatsecret.iter_recipes_search`."""
+        _check_page_size(page_size)
+        return aiter_pages(
+            lambda page_number: self.recipes_search_page(
+                search_expression, recipe_type, page_number, page_size
+            ),
+            page_size,
+        )
+
+    def foods_search_all(
+        self,
+        search_expression,
+        page_size=MAX_PAGE_SIZE,
+        max_concurrency=4,
+        max_total=None,
+        region=None,
+        language=None,
+    ):
+        """Async iterator over every matching food; see :meth:`Fatsecret.foods_search_all`."""
+        _check_page_size(page_size)
+        return afan_out_pages(
+            lambda page_number: self.foods_search_page(
+                search_expression, page_number, page_size, region, language
+            ),
+            page_size,
+            max_concurrency,
+            max_total,
+        )
+
+    def recipes_search_all(
+        self,
+        search_expression,
+        recipe_type=None,
+        page_size=MAX_PAGE_SIZE,
+        max_concurrency=4,
+        max_total=None,
+    ):
+        """Async iterator over every matching recipe; see :meth:`Fatsecret.recipes_search_all`."""
+        _check_page_size(page_size)
+        return afan_out_pages(
+            lambda page_number: self.recipes_search_page(
+                search_expression, recipe_type, page_number, page_size
+            ),
+            page_size,
+            max_concurrency,
+            max_total,
+        )
+
+    async def _month_summaries(self, get_month, start, end, max_concurrency):
+        """Yield the month summaries covering two dates, in order."""
+        results = async_fan_out(
+            lambda month: get_month(_as_datetime(month)),
+            months(start, end),
+            max_concurrency=max_concurrency,
+            ordered=True,
+        )
+        async for result in results:
+            if not result.ok:
+                raise result.error
+            yield result.value
+
+    async def _stream_days(self, get_month, get_day, start, end, max_concurrency):
+        start, end = _as_date(start), _as_date(end)
+        dates = []
+        async for summary in self._month_summaries(
+            get_month, start, end, max_concurrency
+        ):
+            dates.extend(date for date, _ in _days_in_range(summary, start, end))
+        results = async_fan_out(
+            lambda date: get_day(date=_as_datetime(date)),
+            dates,
+            max_concurrency=max_concurrency,
+            ordered=True,
+        )
+        async for result in results:
+            if not result.ok:
+                raise result.error
+            yield result.key, result.value
+
+    def food_entries_get_range(self, start, end, max_concurrency=8):
+        """Async iterator over days with food entries; see :meth:`Fatsecret.food_entries_get_range`."""
+        return self._stream_days(
+            self.food_entries_get_month,
+            self.food_entries_get,
+            start,
+            end,
+            max_concurrency,
+        )
+
+    def exercise_entries_get_range(self, start, end, max_concurrency=8):
+        """Async iterator over days with exercise; see :meth:`Fatsecret.exercise_entries_get_range`."""
+        return self._stream_days(
+            self.exercise_entries_get_month,
+            self.exercise_entries_get,
+            start,
+            end,
+            max_concurrency,
+        )
+
+    async def weights_get_range(self, start, end, max_concurrency=8):
+        """Async iterator over weigh-ins; see :meth:`Fatsecret.weights_get_range`."""
+        start, end = _as_date(start), _as_date(end)
+        async for summary in self._month_summaries(
+            self.weights_get_month, start, end, max_concurrency
+        ):
+            for item in _days_in_range(summary, start, end):
+                yield item
+
+    async def food_entries_plan(self, date, desired):
+        """Awaitable counterpart of :meth:`Fatsecret.food_entries_plan`."""
+        return plan_food_entries(await self.food_entries_get(date=date), desired)
+
+    async def food_entries_reconcile(self, date, desired, max_concurrency=4):
+        """Awaitable counterpart of :meth:`Fatsecret.food_entries_reconcile`."""
+        plan = await self.food_entries_plan(date, desired)
+        results = async_fan_out(
+            lambda operation: self._apply(operation, date),
+            plan.operations,
+            max_concurrency=max_concurrency,
+            ordered=True,
+        )
+        return ReconcileResult(plan, [result async for result in results])
+
+    async def close(self) -> None:
+        """Cancel pending cache refreshes and close the HTTP sessions owned by this client."""
+        refreshes = list(self._refreshes)
+        for task in refreshes:
+            task.cancel()
+        await asyncio.gather(*refreshes, return_exceptions=True)
+        if self._owns_http and self._http is not None:
+            await self._http.close()
+            self._http = None
+        Fatsecret.close(self)
+
+
+def _coroutine_endpoint(method):
+    @functools.wraps(method)
+    async def endpoint(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        if inspect.isawaitable(result):
+            return await result
+        return result
+
+    return endpoint
+
+
+for _mixin in ENDPOINT_MIXINS:
+    for _name, _method in vars(_mixin).items():
+        if not _name.startswith("_") and inspect.isfunction(_method):
+            setattr(AsyncFatsecret, _name, _coroutine_endpoint(_method))
@@ -0,0 +1,262 @@
+"""
+fatsecret.autocomplete
+----------------------
+
+Local answers for ``foods.autocomplete`` typeahead requests.
+
+Suggestions returned by the API are kept in a :class:`SuggestionTrie` per
+region and language. A longer prefix is answered by filtering the
+suggestions held for a shorter one whenever that is as good as asking the
+API: when the shorter prefix returned fewer suggestions than requested (so
+it listed every match) or when enough of its suggestions still match. Only
+cold prefixes are sent to the API.
+
+:class:`Autocompleter` serves the synchronous client; :class:`AsyncAutocompleter`
+adds the debouncing and cancellation a per-keystroke typeahead needs.
+"""
+
+from collections import OrderedDict
+from typing import List, Optional
+import asyncio
+import threading
+
+#: Number of suggestions the API returns when ``max_results`` is not given.
+DEFAULT_MAX_RESULTS = 4
+
+
+def normalize_expression(expression: str) -> str:
+    """Lower-case ``expression`` and collapse its whitespace."""
+    return " ".join(expression.lower().split())
+
+
+def suggestion_list(value) -> List[str]:
+    """Return the suggestions of a ``foods_autocomplete`` result as a list."""
+    if not value:
+        return []
+    if isinstance(value, dict):
+        value = value.get("suggestion", [])
+    if isinstance(value, str):
+        return [value]
+    return list(value)
+
+
+class _Node:
+    __slots__ = ("children", "limit", "suggestions")
+
+    def __init__(self):
+        self.children = None
+        self.suggestions = None
+        self.limit = 0
+
+
+class SuggestionTrie:
+    """Prefix trie of API suggestions, one root per region and language.
+
+    Nodes only exist along prefixes that were stored, child maps are created
+    on demand, and the oldest stored prefixes are evicted first.
+
+    :param max_entries: Number of prefixes whose suggestions are kept
+    :type max_entries: int
+    """
+
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries = max_entries
+        self._roots = {}
+        self._order = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._order)
+
+    def lookup(
+        self,
+        expression: str,
+        max_results: int = DEFAULT_MAX_RESULTS,
+        region: Optional[str] = None,
+        language: Optional[str] = None,
+    ) -> Optional[List[str]]:
+        """Return suggestions for ``expression`` from stored ones, or ``None`` if cold."""
+        prefix = normalize_expression(expression)
+        with self._lock:
+            node = self._roots.get((region, language))
+            path = []
+            for character in prefix:
+                node = node.children.get(character) if node and node.children else None
+                if node is None:
+                    break
+                path.append(node)
+            if path and len(path) == len(prefix):
+                node = path.pop()
+                if node.suggestions is not None and (
+                    node.limit >= max_results or len(node.suggestions) < node.limit
+                ):
+                    return node.suggestions[:max_results]
+            for ancestor in reversed(path):
+                if ancestor.suggestions is None:
+                    continue
+                # The API returns suggestions containing the expression, and
+                # whatever contains ``prefix`` also contains its ancestors.
+                matches = [s for s in ancestor.suggestions if prefix in s.lower()]
+                complete = len(ancestor.suggestions) < ancestor.limit
+                if complete or len(matches) >= max_results:
+                    return matches[:max_results]
+        return None
+
+    def insert(
+        self,
+        expression: str,
+        suggestions: List[str],
+        max_results: int = DEFAULT_MAX_RESULTS,
+        region: Optional[str] = None,
+        language: Optional[str] = None,
+    ) -> None:
+        """Store the API's ``suggestions`` for ``expression`` requested with ``max_results``."""
+        prefix = normalize_expression(expression)
+        if not prefix:
+            return
+        locale = (region, language)
+        with self._lock:
+            node = self._roots.get(locale)
+            if node is None:
+                node = self._roots[locale] = _Node()
+            for character in prefix:
+                if node.children is None:
+                    node.children = {}
+                child = node.children.get(character)
+                if child is None:
+                    child = node.children[character] = _Node()
+                node = child
+            node.suggestions = list(suggestions)
+            node.limit = max_results
+
+            key = (locale, prefix)
+            self._order[key] = None
+            self._order.move_to_end(key)
+            while len(self._order) > self.max_entries:
+                self._remove(*self._order.popitem(last=False)[0])
+
+    def _remove(self, locale, prefix):
+        """Drop the suggestions of ``prefix`` and prune nodes left empty."""
+        node = self._roots[locale]
+        path = [node]
+        for character in prefix:
+            node = node.children[character]
+            path.append(node)
+        node.suggestions = None
+        for depth in range(len(prefix), 0, -1):
+            node = path[depth]
+            if node.suggestions is not None or node.children:
+                break
+            del path[depth - 1].children[prefix[depth - 1]]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._roots.clear()
+            self._order.clear()
+
+
+class Autocompleter:
+    """``foods_autocomplete`` answered from a :class:`SuggestionTrie` when possible.
+
+    :param client: Client used for cold prefixes
+    :type client: ~fatsecret.Fatsecret
+    :param trie: Suggestion store, shareable between autocompleters
+    :type trie: SuggestionTrie
+    """
+
+    def __init__(self, client, trie: Optional[SuggestionTrie] = None):
+        self.client = client
+        self.trie = trie if trie is not None else SuggestionTrie()
+        self.hits = 0
+        self.misses = 0
+
+    def suggest(
+        self,
+        expression: str,
+        max_results: int = DEFAULT_MAX_RESULTS,
+        region: Optional[str] = None,
+        language: Optional[str] = None,
+    ) -> List[str]:
+        """Return up to ``max_results`` suggestions for ``expression``."""
+        if not normalize_expression(expression):
+            return []
+        suggestions = self.trie.lookup(expression, max_results, region, language)
+        if suggestions is not None:
+            self.hits += 1
+            return suggestions
+        self.misses += 1
+        suggestions = suggestion_list(
+            self.client.foods_autocomplete(expression, max_results, region, language)
+        )
+        self.trie.insert(expression, suggestions, max_results, region, language)
+        return suggestions
+
+
+class AsyncAutocompleter(Autocompleter):
+    """Debounced typeahead over :class:`~fatsecret.AsyncFatsecret`.
+
+    Use one instance per input field (e.g. per user session) and call
+    :meth:`suggest` on every keystroke. Warm prefixes are answered at once;
+    cold ones wait ``delay`` seconds and are dropped if another keystroke
+    arrives meanwhile, so only the last pause in typing reaches the API.
+
+    :param client: Asynchronous client used for cold prefixes
+    :type client: ~fatsecret.AsyncFatsecret
+    :param trie: Suggestion store, shareable between autocompleters
+    :type trie: SuggestionTrie
+    :param delay: Debounce delay in seconds
+    :type delay: float
+    """
+
+    def __init__(self, client, trie: Optional[SuggestionTrie] = None, delay=0.15):
+        super().__init__(client, trie)
+        self.delay = delay
+        self.superseded = 0
+        self._pending = None
+
+    async def suggest(
+        self,
+        expression: str,
+        max_results: int = DEFAULT_MAX_RESULTS,
+        region: Optional[str] = None,
+        language: Optional[str] = None,
+    ) -> Optional[List[str]]:
+        """Return suggestions for ``expression``, or ``None`` if superseded or cancelled."""
+        self.cancel()
+        if not normalize_expression(expression):
+            return []
+        suggestions = self.trie.lookup(expression, max_results, region, language)
+        if suggestions is not None:
+            self.hits += 1
+            return suggestions
+
+        task = self._pending = asyncio.ensure_future(
+            self._fetch(expression, max_results, region, language)
+        )
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.cancelled():
+                raise
+            return None
+        finally:
+            if self._pending is task:
+                self._pending = None
+
+    async def _fetch(self, expression, max_results, region, language):
+        await asyncio.sleep(self.delay)
+        self.misses += 1
+        suggestions = suggestion_list(
+            await self.client.foods_autocomplete(
+                expression, max_results, region, language
+            )
+        )
+        self.trie.insert(expression, suggestions, max_results, region, language)
+        return suggestions
+
+    def cancel(self) -> None:
+        """Drop the pending cold lookup, if any; its caller receives ``None``."""
+        pending, self._pending = self._pending, None
+        if pending is not None and not pending.done():
+            pending.cancel()
+            self.superseded += 1
@@ -0,0 +1,240 @@
+"""
+fatsecret.backfill
+------------------
+
+Resumable backfill of a user's diary history.
+
+A :class:`BackfillJob` walks the months of a date range concurrently, reads
+each month summary and fetches the days holding entries. Every day handed to
+the ``on_day`` callback and every finished month is recorded in a SQLite
+checkpoint file as soon as it is done, so a job that crashed or was stopped
+resumes with the first day it had not delivered. A day whose callback
+returned just before a crash may be delivered a second time, so callbacks
+should store entries idempotently, e.g. keyed by ``food_entry_id``.
+"""
+
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from typing import Callable, NamedTuple, Optional
+import datetime
+import sqlite3
+import threading
+import time
+
+from .diary import DateLike, _as_date, _as_datetime, _days_in_range
+from .signing import token_key
+from .sync import date_int, months, months_end
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS backfill_months (
+    job TEXT NOT NULL, month INTEGER NOT NULL, PRIMARY KEY (job, month));
+CREATE TABLE IF NOT EXISTS backfill_days (
+    job TEXT NOT NULL, day INTEGER NOT NULL, PRIMARY KEY (job, day));
+"""
+
+#: Month summary and day methods of the client for each kind of diary.
+KINDS = {
+    "food": ("food_entries_get_month", "food_entries_get"),
+    "exercise": ("exercise_entries_get_month", "exercise_entries_get"),
+}
+
+
+class BackfillProgress(NamedTuple):
+    """Snapshot passed to ``on_progress`` and returned by :meth:`BackfillJob.run`.
+
+    Month counts include months finished by earlier runs; day and entry
+    counts and throughput cover the current run only.
+    """
+
+    months_done: int
+    months_total: int
+    days_done: int
+    entries: int
+    elapsed: float
+
+    @property
+    def days_per_second(self) -> float:
+        return self.days_done / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def entries_per_second(self) -> float:
+        return self.entries / self.elapsed if self.elapsed else 0.0
+
+
+class BackfillJob:
+    """Checkpointed, concurrent backfill of one user's diary.
+
+    :param client: Client authenticated as the user
+    :type client: ~fatsecret.Fatsecret
+    :param path: SQLite checkpoint file, shareable between jobs
+    :type path: str
+    :param start: First day to backfill
+    :type start: datetime.date
+    :param end: Last day to backfill (inclusive)
+    :type end: datetime.date
+    :param on_day: Called as ``on_day(date, entries)`` for every day with
+        entries; calls are serialized
+    :type on_day: callable
+    :param on_progress: Called with a :class:`BackfillProgress` after every
+        day and month
+    :type on_progress: callable
+    :param kind: ``"food"`` or ``"exercise"``
+    :type kind: str
+    :param max_concurrency: Number of months processed at once
+    :type max_concurrency: int
+    :param job_id: Key of the checkpoint (default: a digest of the access
+        token, kind and range)
+    :type job_id: str
+    """
+
+    def __init__(
+        self,
+        client,
+        path: str,
+        start: DateLike,
+        end: DateLike,
+        on_day: Optional[Callable] = None,
+        on_progress: Optional[Callable] = None,
+        kind: str = "food",
+        max_concurrency: int = 4,
+        job_id: Optional[str] = None,
+    ):
+        if kind not in KINDS:
+            raise ValueError(f"kind must be one of {sorted(KINDS)}")
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.client = client
+        self.start = _as_date(start)
+        self.end = _as_date(end)
+        self.on_day = on_day
+        self.on_progress = on_progress
+        self.kind = kind
+        self.max_concurrency = max_concurrency
+        self.job_id = job_id or (
+            f"{token_key(client.access_token or '')}:{kind}:{self.start.isoformat()}:"
+            f"{self.end.isoformat()}"
+        )
+
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def stop(self) -> None:
+        """Ask a running job to stop after the days currently being fetched."""
+        self._stopped.set()
+
+    def completed_months(self) -> set:
+        """First days of the months already finished."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT month FROM backfill_months WHERE job = ?", (self.job_id,)
+            ).fetchall()
+        return {datetime.date(1970, 1, 1) + datetime.timedelta(m) for m, in rows}
+
+    def reset(self) -> None:
+        """Forget the checkpoint so the next run starts from scratch."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM backfill_months WHERE job = ?", (self.job_id,)
+            )
+            self._conn.execute(
+                "DELETE FROM backfill_days WHERE job = ?", (self.job_id,)
+            )
+
+    def run(self) -> BackfillProgress:
+        """Backfill every month not finished yet and return the final progress.
+
+        The first error raised by a request or callback stops the job and is
+        re-raised; running the job again resumes from its checkpoint.
+        """
+        self._stopped.clear()
+        all_months = list(months(self.start, self.end))
+        finished = self.completed_months()
+        pending = [month for month in all_months if month not in finished]
+
+        self._months_total = len(all_months)
+        self._months_done = len(all_months) - len(pending)
+        self._days_done = 0
+        self._entries = 0
+        self._started = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            futures = [executor.submit(self._backfill_month, m) for m in pending]
+            done, not_done = wait(futures, return_when=FIRST_EXCEPTION)
+            for future in done:
+                if future.exception() is not None:
+                    self._stopped.set()
+                    for other in not_done:
+                        other.cancel()
+                    raise future.exception()
+        return self._progress()
+
+    def _progress(self) -> BackfillProgress:
+        return BackfillProgress(
+            self._months_done,
+            self._months_total,
+            self._days_done,
+            self._entries,
+            time.monotonic() - self._started,
+        )
+
+    def _report(self) -> None:
+        if self.on_progress is not None:
+            self.on_progress(self._progress())
+
+    def _backfill_month(self, month: datetime.date) -> None:
+        if self._stopped.is_set():
+            return
+        get_month, get_day = (getattr(self.client, name) for name in KINDS[self.kind])
+        first = max(month, self.start)
+        last = min(months_end(month), self.end)
+
+        with self._lock:
+            delivered = {
+                day
+                for day, in self._conn.execute(
+                    "SELECT day FROM backfill_days WHERE job = ? AND day BETWEEN ? AND ?",
+                    (self.job_id, date_int(first), date_int(last)),
+                )
+            }
+
+        for date, _ in _days_in_range(get_month(_as_datetime(month)), first, last):
+            if date_int(date) in delivered:
+                continue
+            if self._stopped.is_set():
+                return
+            entries = get_day(date=_as_datetime(date)) or []
+            with self._lock:
+                if self.on_day is not None:
+                    self.on_day(date, entries)
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR IGNORE INTO backfill_days VALUES (?, ?)",
+                        (self.job_id, date_int(date)),
+                    )
+                self._days_done += 1
+                self._entries += len(entries)
+                self._report()
+
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO backfill_months VALUES (?, ?)",
+                    (self.job_id, date_int(month)),
+                )
+                self._conn.execute(
+                    "DELETE FROM backfill_days WHERE job = ? AND day BETWEEN ? AND ?",
+                    (self.job_id, date_int(first), date_int(last)),
+                )
+            self._months_done += 1
+            self._report()
@@ -0,0 +1,187 @@
+"""
+fatsecret.barcodes
+------------------
+
+Barcode normalization and a local GTIN-13 to food ID index.
+
+:func:`normalize_barcode` turns UPC-A, UPC-E, EAN-8, EAN-13 and GTIN-14 codes
+into the zero-padded GTIN-13 form expected by ``food.find_id_for_barcode``,
+validating the check digit. A :class:`GtinIndex` is a sorted file of
+fixed-size records, memory-mapped and binary searched, that the client
+consults before asking the API.
+"""
+
+from typing import Iterable, Iterator, Optional, Tuple, Union
+import mmap
+import os
+import struct
+
+from .errors import InvalidBarcode
+
+
+def check_digit(digits: str) -> int:
+    """Return the GS1 mod-10 check digit for ``digits`` (without a check digit)."""
+    total = 0
+    for position, digit in enumerate(reversed(digits)):
+        total += int(digit) * (3 if position % 2 == 0 else 1)
+    return (10 - total % 10) % 10
+
+
+def expand_upc_e(code: str) -> str:
+    """Expand a UPC-E code to its 11 UPC-A digits without check digit.
+
+    :param code: Number system digit (``0`` or ``1``) followed by the six UPC-E digits
+    """
+    system, body = code[0], code[1:7]
+    if system not in "01":
+        raise InvalidBarcode(f"UPC-E number system must be 0 or 1: {code}")
+    last = body[5]
+    if last in "012":
+        expanded = body[:2] + last + "0000" + body[2:5]
+    elif last == "3":
+        expanded = body[:3] + "00000" + body[3:5]
+    elif last == "4":
+        expanded = body[:4] + "00000" + body[4]
+    else:
+        expanded = body[:5] + "0000" + last
+    return system + expanded
+
+
+def _validated(gtin: str, original) -> str:
+    if check_digit(gtin[:-1]) != int(gtin[-1]):
+        raise InvalidBarcode(f"Invalid check digit: {original}")
+    return gtin
+
+
+def normalize_barcode(barcode: Union[str, int], kind: Optional[str] = None) -> str:
+    """Return ``barcode`` as a 13-digit GTIN-13 string.
+
+    Spaces and dashes are ignored. The symbology is inferred from the length,
+    except for 8-digit codes: an EAN-8 and a UPC-E code can share the same
+    digits and both have a valid check digit, so ``kind`` must tell them apart.
+
+    :param barcode: UPC-A, UPC-E (6, 7 or 8 digits), EAN-8, EAN-13 or GTIN-14
+        code; integers are read as zero-padded GTIN-13
+    :type barcode: str
+    :param kind: Symbology of 8-digit codes: ``"upc-e"`` or ``"ean-8"``
+    :type kind: str
+    :raises InvalidBarcode: for malformed codes and wrong check digits
+    :raises ValueError: for an 8-digit code without ``kind``
+    """
+    if kind not in (None, "upc-e", "ean-8"):
+        raise ValueError(f"Unknown barcode kind: {kind}")
+    if isinstance(barcode, int):
+        # Leading zeros are lost in integers, so only GTIN-13 values are meaningful.
+        barcode = str(barcode).zfill(13)
+    code = barcode.strip().replace(" ", "").replace("-", "")
+    if not code.isdigit() or not code.isascii():
+        raise InvalidBarcode(f"Barcodes may only contain digits: {barcode}")
+
+    length = len(code)
+    if length == 8 and kind is None:
+        raise ValueError(f"Pass kind='upc-e' or kind='ean-8' for 8-digit {barcode}")
+
+    if length in (6, 7) or (length == 8 and kind == "upc-e"):
+        if length == 6:
+            code = "0" + code
+        upc_a = expand_upc_e(code)
+        if length < 8:
+            return "0" + upc_a + str(check_digit(upc_a))
+        return _validated("0" + upc_a + code[7], barcode)
+    if length == 14:
+        if code[0] != "0":
+            raise InvalidBarcode(f"GTIN-14 with a packaging indicator: {barcode}")
+        code = code[1:]
+    if length in (8, 12, 13, 14):
+        return _validated(code.zfill(13), barcode)
+    raise InvalidBarcode(f"Unsupported barcode length {length}: {barcode}")
+
+
+class GtinIndex:
+    """Read-only GTIN-13 to food ID map stored in a memory-mapped file.
+
+    Records are pairs of little-endian unsigned 64-bit integers sorted by
+    GTIN, so a lookup is a binary search over the mapped file with no parsing
+    at open time. Write the file with :meth:`build`.
+
+    :param path: Index file written by :meth:`build`
+    :type path: str
+    """
+
+    MAGIC = b"FSGTIN01"
+    _HEADER = struct.Struct("<8sQ")
+    _RECORD = struct.Struct("<QQ")
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as handle:
+            self._memory = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count = b"", -1
+        if len(self._memory) >= self._HEADER.size:
+            magic, count = self._HEADER.unpack_from(self._memory, 0)
+        expected = self._HEADER.size + count * self._RECORD.size
+        if magic != self.MAGIC or len(self._memory) != expected:
+            self._memory.close()
+            raise ValueError(f"{path} is not a GTIN index file")
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __contains__(self, barcode) -> bool:
+        return self.get(barcode) is not None
+
+    def _record(self, position: int) -> Tuple[int, int]:
+        offset = self._HEADER.size + position * self._RECORD.size
+        return self._RECORD.unpack_from(self._memory, offset)
+
+    def get(self, barcode: Union[str, int]) -> Optional[str]:
+        """Return the food ID for a normalized GTIN-13, or ``None`` if unknown."""
+        gtin = int(barcode)
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            key, food_id = self._record(middle)
+            if key < gtin:
+                low = middle + 1
+            elif key > gtin:
+                high = middle
+            else:
+                return str(food_id)
+        return None
+
+    def items(self) -> Iterator[Tuple[str, str]]:
+        """Yield every ``(gtin, food_id)`` pair in GTIN order."""
+        for position in range(self._count):
+            gtin, food_id = self._record(position)
+            yield f"{gtin:013d}", str(food_id)
+
+    def close(self) -> None:
+        self._memory.close()
+
+    @classmethod
+    def build(cls, path: str, pairs: Iterable[Tuple[Union[str, int], Union[str, int]]]):
+        """Write an index of ``(barcode, food_id)`` pairs to ``path`` atomically.
+
+        Barcodes are normalized first, so 8-digit codes must be given as
+        GTIN-13; for duplicates the last pair wins. Returns the opened index.
+        """
+        mapping = {}
+        for barcode, food_id in pairs:
+            mapping[int(normalize_barcode(barcode))] = int(food_id)
+
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb") as handle:
+            handle.write(cls._HEADER.pack(cls.MAGIC, len(mapping)))
+            for gtin in sorted(mapping):
+                handle.write(cls._RECORD.pack(gtin, mapping[gtin]))
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary, path)
+        return cls(path)
@@ -0,0 +1,217 @@
+"""
+fatsecret.bloom
+---------------
+
+Persisted Bloom filter of barcodes the API is known not to recognise.
+
+Give a :class:`BloomFilter` to :class:`~fatsecret.ResponseCache` as
+``miss_filter`` and every barcode lookup answered with "not found" is added
+to it; later lookups of those barcodes are answered locally without a
+network call. A barcode in the filter may be a false positive, at a rate
+bounded by the filter's ``error_rate`` budget. Once the filter holds more
+barcodes than it was sized for and the estimated rate exceeds the budget it
+is no longer consulted, and should be rebuilt from a list of misses::
+
+    python -m fatsecret.bloom misses.txt barcodes.bloom --error-rate 0.001
+
+The cache trusts a filter only for the negative TTL of barcode lookups after
+it was created, then clears it so that barcodes added to the API since are
+looked up again. Rebuild from the misses of that last period only.
+"""
+
+from typing import Iterable, Optional
+import argparse
+import hashlib
+import math
+import os
+import struct
+import sys
+import threading
+import time
+
+from .barcodes import normalize_barcode
+from .errors import InvalidBarcode
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter of strings.
+
+    :param capacity: Number of items the filter is sized for
+    :type capacity: int
+    :param error_rate: False-positive rate budget at ``capacity`` items
+    :type error_rate: float
+    """
+
+    MAGIC = b"FSBLOOM2"
+    _HEADER = struct.Struct("<8sQIQQdd")
+
+    def __init__(self, capacity: int = 1000000, error_rate: float = 0.001):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self.count = 0
+        #: When the filter was created or last cleared
+        self.created = time.time()
+        self._array = bytearray((self.bits + 7) // 8)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, item: str) -> bool:
+        array = self._array
+        return all(
+            array[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        step = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * step) % self.bits for i in range(self.hashes)]
+
+    def add(self, item: str) -> None:
+        """Add ``item`` to the filter."""
+        positions = self._positions(item)
+        with self._lock:
+            added = False
+            for position in positions:
+                mask = 1 << (position & 7)
+                if not self._array[position >> 3] & mask:
+                    self._array[position >> 3] |= mask
+                    added = True
+            if added:
+                self.count += 1
+
+    def update(self, items: Iterable[str]) -> None:
+        """Add every item of ``items``."""
+        for item in items:
+            self.add(item)
+
+    def clear(self) -> None:
+        """Remove every item and restart the filter's lifetime."""
+        with self._lock:
+            self._array = bytearray(len(self._array))
+            self.count = 0
+            self.created = time.time()
+
+    @property
+    def estimated_error_rate(self) -> float:
+        """False-positive rate expected with the current number of items."""
+        return (1 - math.exp(-self.hashes * self.count / self.bits)) ** self.hashes
+
+    @property
+    def over_budget(self) -> bool:
+        """Whether the estimated false-positive rate exceeds ``error_rate``."""
+        return self.estimated_error_rate > self.error_rate
+
+    def save(self, path: str) -> None:
+        """Atomically write the filter to ``path``."""
+        with self._lock:
+            header = self._HEADER.pack(
+                self.MAGIC,
+                self.bits,
+                self.hashes,
+                self.capacity,
+                self.count,
+                self.error_rate,
+                self.created,
+            )
+            data = bytes(self._array)
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb") as handle:
+            handle.write(header)
+            handle.write(data)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BloomFilter":
+        """Read a filter written by :meth:`save`."""
+        with open(path, "rb") as handle:
+            header = handle.read(cls._HEADER.size)
+            data = handle.read()
+        if len(header) != cls._HEADER.size:
+            raise ValueError(f"{path} is not a Bloom filter file")
+        fields = cls._HEADER.unpack(header)
+        magic, bits, hashes, capacity, count, error_rate, created = fields
+        if magic != cls.MAGIC or len(data) != (bits + 7) // 8:
+            raise ValueError(f"{path} is not a Bloom filter file")
+        bloom = cls(capacity, error_rate)
+        bloom.bits, bloom.hashes, bloom.count = bits, hashes, count
+        bloom.created = created
+        bloom._array = bytearray(data)
+        return bloom
+
+    @classmethod
+    def build(
+        cls,
+        items: Iterable[str],
+        error_rate: float = 0.001,
+        headroom: float = 2.0,
+        capacity: Optional[int] = None,
+    ) -> "BloomFilter":
+        """Return a filter holding ``items`` with room for more.
+
+        :param headroom: Capacity as a multiple of the number of items, used
+            when ``capacity`` is not given
+        """
+        items = list(dict.fromkeys(items))
+        if capacity is None:
+            capacity = max(1, math.ceil(len(items) * headroom))
+        bloom = cls(capacity, error_rate)
+        bloom.update(items)
+        return bloom
+
+
+def main(argv=None):
+    """Rebuild a barcode miss filter from a file of barcodes, one per line.
+
+    Barcodes are normalized to GTIN-13 like lookups are; invalid lines are
+    reported on stderr and skipped.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m fatsecret.bloom", description=main.__doc__.splitlines()[0]
+    )
+    parser.add_argument("source", help="file of barcodes, or - for stdin")
+    parser.add_argument("output", help="filter file to write")
+    parser.add_argument("--error-rate", type=float, default=0.001)
+    parser.add_argument(
+        "--headroom",
+        type=float,
+        default=2.0,
+        help="capacity as a multiple of the number of barcodes read",
+    )
+    args = parser.parse_args(argv)
+
+    if args.source == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(args.source) as handle:
+            lines = handle.read().splitlines()
+    barcodes = []
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            barcodes.append(normalize_barcode(line))
+        except (InvalidBarcode, ValueError) as error:
+            print(f"line {number}: {error}", file=sys.stderr)
+
+    bloom = BloomFilter.build(barcodes, args.error_rate, args.headroom)
+    bloom.save(args.output)
+    print(
+        f"{len(bloom)} barcodes, capacity {bloom.capacity}, "
+        f"{bloom.bits // 8} bytes, {bloom.hashes} hashes"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+fatsecret.bulk
+--------------
+
+Bounded concurrent fan-out of API calls over the client's pooled transport.
+"""
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import NamedTuple, Optional
+import asyncio
+
+
+class BulkResult(NamedTuple):
+    """Outcome of one call in a bulk operation.
+
+    ``index`` is the position of ``key`` in the input sequence. Exactly one of
+    ``value`` and ``error`` is meaningful.
+    """
+
+    index: int
+    key: object
+    value: object = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _reorder(results):
+    """Re-emit index-tagged results in input order."""
+    pending = {}
+    expected = 0
+    for result in results:
+        pending[result.index] = result
+        while expected in pending:
+            yield pending.pop(expected)
+            expected += 1
+
+
+def _run(func, index, key):
+    try:
+        return BulkResult(index, key, func(key))
+    except Exception as error:
+        return BulkResult(index, key, error=error)
+
+
+def _fan_out_unordered(func, keys, max_concurrency):
+    keys = iter(enumerate(keys))
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        in_flight = set()
+        try:
+            while True:
+                # Keep a bounded window of submitted work so huge inputs are
+                # never materialised as futures all at once.
+                for index, key in keys:
+                    in_flight.add(executor.submit(_run, func, index, key))
+                    if len(in_flight) >= max_concurrency * 2:
+                        break
+                if not in_flight:
+                    return
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+
+def fan_out(func, keys, max_concurrency=8, ordered=False):
+    """Call ``func(key)`` for every key on a thread pool and yield :class:`BulkResult`.
+
+    Exceptions raised by ``func`` are captured on the result instead of
+    aborting the batch.
+
+    :param func: Callable taking one key
+    :type func: callable
+    :param keys: Keys to process
+    :type keys: iterable
+    :param max_concurrency: Maximum number of calls in flight
+    :type max_concurrency: int
+    :param ordered: Yield in input order instead of completion order
+    :type ordered: bool
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+    results = _fan_out_unordered(func, keys, max_concurrency)
+    return _reorder(results) if ordered else results
+
+
+async def async_fan_out(func, keys, max_concurrency=8, ordered=False):
+    """Asynchronous counterpart of :func:`fan_out` for coroutine functions."""
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+
+    keys = iter(enumerate(keys))
+    queue = asyncio.Queue()
+
+    async def worker():
+        for index, key in keys:
+            try:
+                result = BulkResult(index, key, await func(key))
+            except Exception as error:
+                result = BulkResult(index, key, error=error)
+            await queue.put(result)
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(max_concurrency)]
+    done = asyncio.gather(*workers)
+    done.add_done_callback(lambda _: queue.put_nowait(None))
+
+    pending = {}
+    expected = 0
+    try:
+        while True:
+            result = await queue.get()
+            if result is None:
+                break
+            if not ordered:
+                yield result
+                continue
+            pending[result.index] = result
+            while expected in pending:
+                yield pending.pop(expected)
+                expected += 1
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
+class BulkMixin:
+
+    def food_get_many(
+        self, food_ids, region=None, language=None, max_concurrency=8, ordered=False
+    ):
+        """Fetch details for many foods concurrently with ``food.get.v2``.
+
+        Results are yielded as :class:`~fatsecret.bulk.BulkResult` tuples as soon
+        as each request finishes. A failing id is reported through the result's
+        ``error`` attribute and does not stop the batch.
+
+        :param food_ids: Fatsecret food identifiers
+        :type food_ids: iterable
+        :param max_concurrency: Maximum number of requests in flight
+        :type max_concurrency: int
+        :param ordered: Yield results in the order of ``food_ids``
+        :type ordered: bool
+        """
+        return fan_out(
+            lambda food_id: self.food_get_v2(food_id, region, language),
+            food_ids,
+            max_concurrency=max_concurrency,
+            ordered=ordered,
+        )
@@ -0,0 +1,481 @@
+"""
+fatsecret.cache
+---------------
+
+Opt-in caching of reference data endpoints whose results rarely change.
+
+A :class:`ResponseCache` decides which API methods are cacheable and for how
+long, and stores JSON-encoded results in a pluggable backend:
+
+* :class:`MemoryBackend` - per-process LRU bounded by entry count and bytes
+* :class:`SQLiteBackend` - on-disk LRU shared by every process using the file
+* :class:`SharedMemoryBackend` - fixed-size table in anonymous shared memory,
+  inherited by worker processes forked after it is created
+"""
+
+from collections import Counter, OrderedDict
+import hashlib
+import math
+import mmap
+import multiprocessing
+import random
+import sqlite3
+import struct
+import threading
+import time
+import urllib.parse
+
+from . import responses
+
+DAY = 24 * 60 * 60
+
+#: Default time-to-live in seconds for each cacheable API method.
+DEFAULT_TTLS = {
+    "food.get": 7 * DAY,
+    "food.get.v2": 7 * DAY,
+    "recipe.get": 7 * DAY,
+    "exercises.get": 30 * DAY,
+    "recipe_types.get": 30 * DAY,
+    "food.find_id_for_barcode": 7 * DAY,
+}
+
+#: Default time-to-live in seconds for "not found" results of each method.
+DEFAULT_NEGATIVE_TTLS = {
+    "food.find_id_for_barcode": DAY,
+}
+
+#: Values the API returns when it has no result, e.g. food ID ``"0"`` for an
+#: unknown barcode.
+NEGATIVE_RESULTS = (None, "0")
+
+BARCODE_METHOD = "food.find_id_for_barcode"
+
+
+class MemoryBackend:
+    """In-process LRU store.
+
+    :param max_entries: Maximum number of entries kept
+    :type max_entries: int
+    :param max_bytes: Maximum total size of the stored values
+    :type max_bytes: int
+    """
+
+    def __init__(self, max_entries=10000, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Return ``(expires, value)`` for ``key`` or ``None``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, value, expires):
+        """Store ``value`` bytes under ``key`` until the ``expires`` timestamp."""
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = (expires, value)
+            self.size += len(value)
+            while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+
+    def delete(self, key):
+        with self._lock:
+            self._pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def _pop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[1])
+
+
+class SQLiteBackend:
+    """LRU store in a SQLite database file.
+
+    :param path: Database file; ``":memory:"`` keeps it private to the process
+    :type path: str
+    :param max_entries: Maximum number of rows kept
+    :type max_entries: int
+    :param max_bytes: Maximum total size of the stored values
+    :type max_bytes: int
+    """
+
+    def __init__(self, path, max_entries=100000, max_bytes=512 * 1024 * 1024):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL NOT NULL, "
+                "accessed INTEGER NOT NULL, size INTEGER NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)"
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    @property
+    def size(self):
+        with self._lock:
+            query = "SELECT COALESCE(SUM(size), 0) FROM responses"
+            return self._conn.execute(query).fetchone()[0]
+
+    def get(self, key):
+        """Return ``(expires, value)`` for ``key`` or ``None``."""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT expires, value FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed = ? WHERE key = ?",
+                (time.time_ns(), key),
+            )
+            return row[0], bytes(row[1])
+
+    def set(self, key, value, expires):
+        """Store ``value`` bytes under ``key`` until the ``expires`` timestamp."""
+        if len(value) > self.max_bytes:
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, value, expires, time.time_ns(), len(value)),
+            )
+            self._evict()
+
+    def delete(self, key):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+    def close(self):
+        self._conn.close()
+
+    def _evict(self):
+        count, total = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        victims = []
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY accessed")
+        for key, size in rows:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            victims.append((key,))
+            count -= 1
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+
+
+class SharedMemoryBackend:
+    """Set-associative LRU table in anonymous shared memory.
+
+    The table must be created in the parent process before workers are forked
+    (for example with gunicorn's ``preload_app``); every child then reads and
+    writes the same memory. Capacity is fixed at ``slots`` entries of at most
+    ``slot_size`` bytes each; larger values are not cached.
+
+    :param slots: Number of entries the table can hold
+    :type slots: int
+    :param slot_size: Bytes reserved per entry, including a small header
+    :type slot_size: int
+    :param ways: Entries per hash bucket; LRU eviction happens within a bucket
+    :type ways: int
+    """
+
+    _HEADER = struct.Struct("16sdQI")
+
+    def __init__(self, slots=4096, slot_size=16 * 1024, ways=8):
+        if slot_size <= self._HEADER.size:
+            raise ValueError("slot_size is too small to hold any value")
+        self.ways = max(1, min(ways, slots))
+        self.buckets = max(1, slots // self.ways)
+        self.slot_size = slot_size
+        self.max_value_size = slot_size - self._HEADER.size
+        self.max_bytes = self.buckets * self.ways * self.max_value_size
+        self._memory = mmap.mmap(-1, self.buckets * self.ways * slot_size)
+        self._lock = multiprocessing.get_context("fork").Lock()
+
+    def __len__(self):
+        now = time.time()
+        with self._lock:
+            headers = map(self._header, range(self.buckets * self.ways))
+            return sum(
+                1 for _, expires, _, length in headers if length and expires > now
+            )
+
+    @property
+    def size(self):
+        with self._lock:
+            return sum(
+                self._header(slot)[3] for slot in range(self.buckets * self.ways)
+            )
+
+    def get(self, key):
+        """Return ``(expires, value)`` for ``key`` or ``None``."""
+        digest = self._digest(key)
+        with self._lock:
+            for slot in self._bucket(digest):
+                found, expires, _, length = self._header(slot)
+                if length and found == digest:
+                    self._write_header(slot, digest, expires, length)
+                    start = slot * self.slot_size + self._HEADER.size
+                    return expires, bytes(self._memory[start : start + length])
+        return None
+
+    def set(self, key, value, expires):
+        """Store ``value`` bytes under ``key`` until the ``expires`` timestamp."""
+        if not value or len(value) > self.max_value_size:
+            return
+        digest = self._digest(key)
+        with self._lock:
+            victim = None
+            victim_rank = None
+            for slot in self._bucket(digest):
+                found, slot_expires, accessed, length = self._header(slot)
+                if length and found == digest:
+                    victim = slot
+                    break
+                # Prefer empty slots, then expired ones, then the least recently used.
+                rank = (bool(length), slot_expires > time.time(), accessed)
+                if victim_rank is None or rank < victim_rank:
+                    victim, victim_rank = slot, rank
+            start = victim * self.slot_size + self._HEADER.size
+            self._memory[start : start + len(value)] = value
+            self._write_header(victim, digest, expires, len(value))
+
+    def delete(self, key):
+        digest = self._digest(key)
+        with self._lock:
+            for slot in self._bucket(digest):
+                if self._header(slot)[0] == digest:
+                    self._write_header(slot, bytes(16), 0.0, 0)
+
+    def clear(self):
+        with self._lock:
+            for slot in range(self.buckets * self.ways):
+                self._write_header(slot, bytes(16), 0.0, 0)
+
+    @staticmethod
+    def _digest(key):
+        return hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+
+    def _bucket(self, digest):
+        first = (int.from_bytes(digest[:8], "little") % self.buckets) * self.ways
+        return range(first, first + self.ways)
+
+    def _header(self, slot):
+        return self._HEADER.unpack_from(self._memory, slot * self.slot_size)
+
+    def _write_header(self, slot, digest, expires, length):
+        self._HEADER.pack_into(
+            self._memory, slot * self.slot_size, digest, expires, time.time_ns(), length
+        )
+
+
+class ResponseCache:
+    """Per-method TTL cache for API results.
+
+    Pass an instance as the ``cache`` argument of :class:`~fatsecret.Fatsecret`.
+    Only methods listed in ``ttls`` are cached. Keys are built from every
+    request parameter, so ``region`` and ``language`` variants are stored
+    separately.
+
+    :param backend: Storage backend (default :class:`MemoryBackend`)
+    :param ttls: Mapping of API method name to time-to-live in seconds;
+        merged over :data:`DEFAULT_TTLS`. A TTL of ``0`` disables a method.
+    :type ttls: dict
+    :param grace: Seconds past expiry during which an entry is still served
+        while a single background refresh runs
+    :type grace: float
+    :param early_expiration: Fraction of the TTL over which entries expire
+        early at random, with a probability growing towards the real expiry,
+        so that entries stored together are not all refreshed together.
+        ``0`` disables early expiration.
+    :type early_expiration: float
+    :param negative_ttls: Mapping of API method name to time-to-live in
+        seconds of "not found" results; merged over :data:`DEFAULT_NEGATIVE_TTLS`
+    :type negative_ttls: dict
+    :param miss_filter: Filter of barcodes known to be unknown to the API,
+        consulted before any barcode lookup and updated with new misses. It
+        is cleared once older than the negative TTL of barcode lookups.
+    :type miss_filter: ~fatsecret.bloom.BloomFilter
+    """
+
+    def __init__(
+        self,
+        backend=None,
+        ttls=None,
+        grace=0.0,
+        early_expiration=0.01,
+        negative_ttls=None,
+        miss_filter=None,
+    ):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.negative_ttls = dict(DEFAULT_NEGATIVE_TTLS)
+        if negative_ttls:
+            self.negative_ttls.update(negative_ttls)
+        self.miss_filter = miss_filter
+        self.filtered = 0
+        self.grace = grace
+        self.early_expiration = early_expiration
+        self.hits = Counter()
+        self.misses = Counter()
+        self.stale = Counter()
+        self.refreshes = 0
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def accepts(self, params):
+        """Whether results for these request parameters may be cached."""
+        return self.ttls.get(params.get("method"), 0) > 0
+
+    @staticmethod
+    def key(params):
+        """Canonical cache key for a set of request parameters."""
+        items = sorted(
+            (str(k), str(v)) for k, v in params.items() if k not in ("method", "format")
+        )
+        return f"{params['method']}?{urllib.parse.urlencode(items)}"
+
+    def lookup(self, params, revalidate=None):
+        """Return ``(True, value)`` on a hit, otherwise ``(False, None)``.
+
+        An entry that has expired, early or within the ``grace`` window, is a
+        miss unless ``revalidate`` is given and ``grace`` is positive. It is
+        then served stale and ``revalidate()`` is called by the first such
+        lookup only, which must refresh the entry with :meth:`store` or give up
+        with :meth:`release`.
+
+        :param revalidate: Callable starting a background refresh of the entry
+        """
+        method = params["method"]
+        if method == BARCODE_METHOD and self._filtered(str(params["barcode"])):
+            return True, "0"
+        key = self.key(params)
+        entry = self.backend.get(key)
+        if entry is not None:
+            expires, data = entry
+            value = responses.loads(data)
+            now = time.time()
+            if now < self._expiry(method, expires, value):
+                self.hits[method] += 1
+                return True, value
+            if revalidate is not None and self.grace > 0 and now < expires + self.grace:
+                self.stale[method] += 1
+                if self._claim(key):
+                    revalidate()
+                return True, value
+        self.misses[method] += 1
+        return False, None
+
+    def _ttl(self, method, value):
+        """Time-to-live of ``value``, shorter for "not found" results."""
+        ttl = self.ttls.get(method, 0)
+        if method in self.negative_ttls and value in NEGATIVE_RESULTS:
+            ttl = min(ttl, self.negative_ttls[method])
+        return ttl
+
+    def _expiry(self, method, expires, value):
+        """Expiry of an entry, moved forward at random by early expiration."""
+        if self.early_expiration <= 0:
+            return expires
+        window = self._ttl(method, value) * self.early_expiration
+        # -log(U) is exponentially distributed, so an entry ``r`` seconds
+        # from expiry is treated as expired with probability exp(-r / window).
+        return expires + window * math.log(1.0 - random.random())
+
+    def _filtered(self, barcode):
+        """Whether the miss filter answers for ``barcode``; counts filtered lookups."""
+        miss_filter = self.miss_filter
+        if miss_filter is None or miss_filter.over_budget:
+            return False
+        if time.time() >= miss_filter.created + self._ttl(BARCODE_METHOD, "0"):
+            # Its oldest misses are past the negative TTL; learn them again.
+            miss_filter.clear()
+            return False
+        if barcode not in miss_filter:
+            return False
+        with self._lock:
+            self.filtered += 1
+        return True
+
+    def _claim(self, key):
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            self.refreshes += 1
+            return True
+
+    def release(self, params):
+        """Give up a background refresh claimed by :meth:`lookup`."""
+        with self._lock:
+            self._refreshing.discard(self.key(params))
+
+    def store(self, params, value):
+        """Cache ``value`` for the TTL configured for the request's method."""
+        method = params["method"]
+        key = self.key(params)
+        ttl = self._ttl(method, value)
+        if method == BARCODE_METHOD and value in NEGATIVE_RESULTS:
+            if self.miss_filter is not None and not self.miss_filter.over_budget:
+                self.miss_filter.add(str(params["barcode"]))
+        if ttl > 0:
+            self.backend.set(key, responses.dumps(value), time.time() + ttl)
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def invalidate(self, params):
+        """Drop the cached result for these request parameters."""
+        self.backend.delete(self.key(params))
+
+    def clear(self):
+        """Drop every cached result."""
+        self.backend.clear()
+
+    def stats(self):
+        """Return hit and miss counters, overall and per method, and stale serves."""
+        return {
+            "hits": sum(self.hits.values()),
+            "misses": sum(self.misses.values()),
+            "stale": sum(self.stale.values()),
+            "refreshes": self.refreshes,
+            "filtered": self.filtered,
+            "by_method": {
+                method: {"hits": self.hits[method], "misses": self.misses[method]}
+                for method in sorted(set(self.hits) | set(self.misses))
+            },
+            "entries": len(self.backend),
+            "bytes": self.backend.size,
+        }
@@ -0,0 +1,103 @@
+"""
+fatsecret.diary
+---------------
+
+Date-range reads of a user's diary built on the monthly summary endpoints.
+
+The ``*.get_month`` calls reveal which days hold entries, so a range costs one
+request per month plus one per non-empty day, and the day requests run
+concurrently. Days are streamed in date order as soon as they and every
+earlier day have arrived.
+"""
+
+from typing import Iterator, Tuple
+import datetime
+
+from .bulk import fan_out
+from .sync import DateLike, _as_date, from_date_int, month_days, months
+
+
+def _as_datetime(value: datetime.date) -> datetime.datetime:
+    return datetime.datetime(value.year, value.month, value.day)
+
+
+def _days_in_range(summaries, start, end):
+    """Yield the dates of month summary days that fall between ``start`` and ``end``."""
+    for day in month_days(summaries):
+        date = from_date_int(day["date_int"])
+        if start <= date <= end:
+            yield date, day
+
+
+class DiaryMixin:
+
+    def _days_with_entries(self, get_month, start, end):
+        """Lazily yield the days between two dates that the month summaries list."""
+        for month in months(start, end):
+            for date, _ in _days_in_range(get_month(_as_datetime(month)), start, end):
+                yield date
+
+    def _stream_days(self, get_month, get_day, start, end, max_concurrency):
+        start, end = _as_date(start), _as_date(end)
+        results = fan_out(
+            lambda date: get_day(date=_as_datetime(date)),
+            self._days_with_entries(get_month, start, end),
+            max_concurrency=max_concurrency,
+            ordered=True,
+        )
+        for result in results:
+            if not result.ok:
+                raise result.error
+            yield result.key, result.value
+
+    def food_entries_get_range(
+        self, start: DateLike, end: DateLike, max_concurrency: int = 8
+    ) -> Iterator[Tuple[datetime.date, list]]:
+        """Yield ``(date, food_entries)`` for every day with entries between two dates.
+
+        Days without entries are skipped. The first failing request is raised
+        when its day is reached.
+
+        :param start: First day of the range
+        :type start: datetime.date
+        :param end: Last day of the range (inclusive)
+        :type end: datetime.date
+        :param max_concurrency: Maximum number of day requests in flight
+        :type max_concurrency: int
+        """
+        return self._stream_days(
+            self.food_entries_get_month,
+            self.food_entries_get,
+            start,
+            end,
+            max_concurrency,
+        )
+
+    def exercise_entries_get_range(
+        self, start: DateLike, end: DateLike, max_concurrency: int = 8
+    ) -> Iterator[Tuple[datetime.date, list]]:
+        """Yield ``(date, exercise_entries)`` for every day with exercise between two dates.
+
+        See :meth:`food_entries_get_range`.
+        """
+        return self._stream_days(
+            self.exercise_entries_get_month,
+            self.exercise_entries_get,
+            start,
+            end,
+            max_concurrency,
+        )
+
+    def weights_get_range(
+        self, start: DateLike, end: DateLike
+    ) -> Iterator[Tuple[datetime.date, dict]]:
+        """Yield ``(date, weight_day)`` for every weigh-in between two dates.
+
+        ``weight_day`` is the day record of ``weights.get_month``, holding
+        ``weight_kg`` and ``weight_comment``. Only monthly requests are made.
+        """
+        start, end = _as_date(start), _as_date(end)
+        for month in months(start, end):
+            yield from _days_in_range(
+                self.weights_get_month(_as_datetime(month)), start, end
+            )
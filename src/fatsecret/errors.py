@@ -29,3 +29,26 @@ class ParameterError(BaseFatsecretError):
 class ApplicationError(BaseFatsecretError):
     def __init__(self, code, message):
         super().__init__(code, message)
+
+
+class RateLimitExceeded(GeneralError):
+    """Raised by the client-side rate limiter instead of sending a request.
+
+    Uses code 12, the API's own "too many actions" error. ``retry_after`` is
+    the number of seconds until a token is available, or ``None`` when the
+    daily quota is exhausted.
+    """
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(12, message)
+        self.retry_after = retry_after
+
+
+class InvalidBarcode(ParameterError):
+    """Raised for a barcode that cannot be a valid UPC/EAN code, without sending a request.
+
+    Uses code 108, the API's "invalid value" parameter error.
+    """
+
+    def __init__(self, message):
+        super().__init__(108, message)
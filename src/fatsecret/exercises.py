@@ -7,8 +7,7 @@ class ExercisesMixin:
 
         params = {"method": "exercises.get", "format": "json"}
 
-        response = self.session.get(self.api_url, params=params)
-        return self.valid_response(response)
+        return self._request(params)
 
     def exercise_entries_commit_day(self, date=None):
         """Saves the default exercise entries for the user on a nominated date.
@@ -22,8 +21,7 @@ class ExercisesMixin:
         if date:
             params["date"] = self.unix_time(date)
 
-        response = self.session.get(self.api_url, params=params)
-        return self.valid_response(response)
+        return self._request(params)
 
     def exercise_entries_get(self, date=None):
         """Returns the daily exercise entries for the user on a nominated date.
@@ -41,8 +39,7 @@ class ExercisesMixin:
         if date:
             params["date"] = self.unix_time(date)
 
-        response = self.session.get(self.api_url, params=params)
-        return self.valid_response(response)
+        return self._request(params)
 
     def exercise_entries_get_month(self, date=None):
         """Returns the summary estimated daily calories expended for a user's exercise diary entries for
@@ -58,8 +55,7 @@ class ExercisesMixin:
         if date:
             params["date"] = self.unix_time(date)
 
-        response = self.session.get(self.api_url, params=params)
-        return self.valid_response(response)
+        return self._request(params)
 
     def exercise_entries_save_template(self, days, date=None):
         """Takes the set of exercise entries on a nominated date and saves these entries as "template"
@@ -81,8 +77,7 @@ class ExercisesMixin:
         if date:
             params["date"] = self.unix_time(date)
 
-        response = self.session.get(self.api_url, params=params)
-        return self.valid_response(response)
+        return self._request(params)
 
     def exercise_entry_edit(
         self,
@@ -145,5 +140,4 @@ class ExercisesMixin:
             else:
                 return
 
-        response = self.session.get(self.api_url, params=params)
-        return self.valid_response(response)
+        return self._request(params)
@@ -0,0 +1,277 @@
+"""
+fatsecret.export
+----------------
+
+Columnar export of diaries to Parquet, Arrow IPC or CSV files.
+
+Rows are streamed from the client's date-range reads into Arrow record
+batches of ``batch_size`` rows with typed columns: the API's numeric strings
+are parsed by Arrow in bulk into ``float64`` columns and ``date_int`` becomes
+a ``date32`` column. Every batch is written as soon as it is full, so memory
+stays bounded by one batch whatever the length of the history.
+
+Requires the ``export`` extra (``pyarrow``).
+"""
+
+from typing import Iterable, Iterator, Optional, Tuple
+import datetime
+
+from .diary import DateLike, _as_date, _as_datetime, _days_in_range
+from .models import NUTRIENTS
+from .sync import date_int, months
+
+try:
+    import pyarrow
+    import pyarrow.csv
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - optional dependency
+    pyarrow = None
+
+#: Column types: ``"str"``, ``"float"`` (parsed from strings), ``"int"`` or ``"date"``.
+#: Food entries have one ``float`` column per :data:`~fatsecret.models.NUTRIENTS`.
+FOOD_ENTRY_COLUMNS = (
+    ("date_int", "date"),
+    ("food_entry_id", "str"),
+    ("food_entry_name", "str"),
+    ("food_entry_description", "str"),
+    ("food_id", "str"),
+    ("serving_id", "str"),
+    ("meal", "str"),
+    ("number_of_units", "float"),
+) + tuple((name, "float") for name in NUTRIENTS)
+
+EXERCISE_ENTRY_COLUMNS = (
+    ("date_int", "date"),
+    ("exercise_id", "str"),
+    ("exercise_name", "str"),
+    ("minutes", "float"),
+    ("calories", "float"),
+)
+
+FOOD_SUMMARY_COLUMNS = (
+    ("date_int", "date"),
+    ("calories", "float"),
+    ("carbohydrate", "float"),
+    ("protein", "float"),
+    ("fat", "float"),
+)
+
+EXERCISE_SUMMARY_COLUMNS = (
+    ("date_int", "date"),
+    ("calories", "float"),
+)
+
+WEIGHT_COLUMNS = (
+    ("date_int", "date"),
+    ("weight_kg", "float"),
+    ("weight_comment", "str"),
+)
+
+FORMATS = {".parquet": "parquet", ".arrow": "arrow", ".feather": "arrow", ".csv": "csv"}
+
+
+def _require_pyarrow():
+    if pyarrow is None:
+        raise ImportError(
+            "Columnar export requires pyarrow; install the 'export' extra"
+        )
+
+
+def schema(columns):
+    """Return the Arrow schema of a column specification."""
+    _require_pyarrow()
+    types = {
+        "str": pyarrow.string(),
+        "float": pyarrow.float64(),
+        "int": pyarrow.int64(),
+        "date": pyarrow.date32(),
+    }
+    return pyarrow.schema([(name, types[kind]) for name, kind in columns])
+
+
+def _text(value):
+    if value is None or value == "":
+        return None
+    return str(value)
+
+
+def _column(values, kind):
+    if kind == "float":
+        # Arrow parses the whole column of numeric strings in one pass.
+        return pyarrow.array([_text(v) for v in values], pyarrow.string()).cast(
+            pyarrow.float64()
+        )
+    if kind == "date":
+        return (
+            pyarrow.array([None if v is None else int(v) for v in values])
+            .cast(pyarrow.int32())
+            .cast(pyarrow.date32())
+        )
+    if kind == "int":
+        return pyarrow.array([_text(v) for v in values], pyarrow.string()).cast(
+            pyarrow.int64()
+        )
+    return pyarrow.array([_text(v) for v in values], pyarrow.string())
+
+
+def record_batches(
+    rows: Iterable[dict], columns, batch_size: int = 10000
+) -> Iterator["pyarrow.RecordBatch"]:
+    """Group ``rows`` into typed record batches of at most ``batch_size`` rows.
+
+    Keys missing from a row become nulls and keys not in ``columns`` are dropped.
+
+    :param rows: API records, e.g. food entries
+    :type rows: iterable of dict
+    :param columns: Column specification such as :data:`FOOD_ENTRY_COLUMNS`
+    :type columns: tuple
+    :param batch_size: Maximum number of rows per batch
+    :type batch_size: int
+    """
+    _require_pyarrow()
+    target = schema(columns)
+    buffers = [[] for _ in columns]
+    for row in rows:
+        for buffer, (name, _) in zip(buffers, columns):
+            buffer.append(row.get(name))
+        if len(buffers[0]) >= batch_size:
+            yield _batch(buffers, columns, target)
+            buffers = [[] for _ in columns]
+    if buffers[0]:
+        yield _batch(buffers, columns, target)
+
+
+def _batch(buffers, columns, target):
+    arrays = [_column(values, kind) for values, (_, kind) in zip(buffers, columns)]
+    return pyarrow.RecordBatch.from_arrays(arrays, schema=target)
+
+
+class ColumnarWriter:
+    """Incremental writer of record batches to a Parquet, Arrow IPC or CSV file.
+
+    :param path: Output file
+    :type path: str
+    :param columns: Column specification such as :data:`FOOD_ENTRY_COLUMNS`
+    :type columns: tuple
+    :param format: ``"parquet"``, ``"arrow"`` or ``"csv"`` (default: from the
+        file extension)
+    :type format: str
+    """
+
+    def __init__(self, path: str, columns, format: Optional[str] = None):
+        _require_pyarrow()
+        if format is None:
+            extension = path[path.rfind(".") :].lower() if "." in path else ""
+            format = FORMATS.get(extension)
+            if format is None:
+                raise ValueError(f"Cannot infer the export format of {path}")
+        if format not in FORMATS.values():
+            raise ValueError(f"Unknown export format: {format}")
+        self.path = path
+        self.columns = columns
+        self.format = format
+        self.rows = 0
+
+        target = schema(columns)
+        if format == "parquet":
+            self._writer = pyarrow.parquet.ParquetWriter(path, target)
+        elif format == "arrow":
+            self._writer = pyarrow.ipc.new_file(path, target)
+        else:
+            self._writer = pyarrow.csv.CSVWriter(path, target)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write_batch(self, batch) -> None:
+        self._writer.write_batch(batch)
+        self.rows += batch.num_rows
+
+    def write_rows(self, rows: Iterable[dict], batch_size: int = 10000) -> int:
+        """Write ``rows`` batch by batch and return the number written."""
+        written = self.rows
+        for batch in record_batches(rows, self.columns, batch_size):
+            self.write_batch(batch)
+        return self.rows - written
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+def _dated(days: Iterable[Tuple[datetime.date, list]]) -> Iterator[dict]:
+    """Flatten ``(date, entries)`` pairs, filling in entries' ``date_int``."""
+    for day, entries in days:
+        for entry in entries or []:
+            if entry.get("date_int") is None:
+                entry = dict(entry, date_int=date_int(day))
+            yield entry
+
+
+class DiaryExporter:
+    """Stream one user's diary into columnar files.
+
+    Each ``export_*`` method takes a date range and an output path and
+    returns the number of rows written.
+
+    :param client: Client authenticated as the user
+    :type client: ~fatsecret.Fatsecret
+    :param batch_size: Rows per record batch (and Parquet row group)
+    :type batch_size: int
+    :param max_concurrency: Maximum number of day requests in flight
+    :type max_concurrency: int
+    """
+
+    def __init__(self, client, batch_size: int = 10000, max_concurrency: int = 8):
+        _require_pyarrow()
+        self.client = client
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+
+    def _export(self, path, columns, rows, format):
+        with ColumnarWriter(path, columns, format) as writer:
+            return writer.write_rows(rows, self.batch_size)
+
+    def _summaries(self, get_month, start, end):
+        start, end = _as_date(start), _as_date(end)
+        for month in months(start, end):
+            for _, day in _days_in_range(get_month(_as_datetime(month)), start, end):
+                yield day
+
+    def export_food_entries(
+        self, path: str, start: DateLike, end: DateLike, format: Optional[str] = None
+    ) -> int:
+        """Write every food entry between two dates inclusive."""
+        days = self.client.food_entries_get_range(start, end, self.max_concurrency)
+        return self._export(path, FOOD_ENTRY_COLUMNS, _dated(days), format)
+
+    def export_exercise_entries(
+        self, path: str, start: DateLike, end: DateLike, format: Optional[str] = None
+    ) -> int:
+        """Write every exercise entry between two dates inclusive."""
+        days = self.client.exercise_entries_get_range(start, end, self.max_concurrency)
+        return self._export(path, EXERCISE_ENTRY_COLUMNS, _dated(days), format)
+
+    def export_food_summaries(
+        self, path: str, start: DateLike, end: DateLike, format: Optional[str] = None
+    ) -> int:
+        """Write the daily nutrient totals of ``food_entries.get_month``."""
+        rows = self._summaries(self.client.food_entries_get_month, start, end)
+        return self._export(path, FOOD_SUMMARY_COLUMNS, rows, format)
+
+    def export_exercise_summaries(
+        self, path: str, start: DateLike, end: DateLike, format: Optional[str] = None
+    ) -> int:
+        """Write the daily calories of ``exercise_entries.get_month``."""
+        rows = self._summaries(self.client.exercise_entries_get_month, start, end)
+        return self._export(path, EXERCISE_SUMMARY_COLUMNS, rows, format)
+
+    def export_weights(
+        self, path: str, start: DateLike, end: DateLike, format: Optional[str] = None
+    ) -> int:
+        """Write the weigh-ins of ``weights.get_month``."""
+        rows = (day for _, day in self.client.weights_get_range(start, end))
+        return self._export(path, WEIGHT_COLUMNS, rows, format)
@@ -6,34 +6,45 @@ Simple python wrapper of the Fatsecret API
 
 """
 
+from .bulk import BulkMixin
+from .diary import DiaryMixin
 from .exercises import ExercisesMixin
 from .foods import FoodsMixin
 from .meals import MealsMixin
+from .pagination import PaginationMixin
 from .profile import ProfileMixin
 from .recipes import RecipesMixin
+from .reconcile import ReconcileMixin
 from .weight import WeightMixin
 
 from typing import Optional, Tuple, Union
-import base64
 import datetime
-import hashlib
-import hmac
-import time
+import threading
 import urllib
-import uuid
 
 import requests
+from requests.adapters import HTTPAdapter
 from rauth.service import OAuth1Service
 
-from .errors import ApplicationError, AuthenticationError, GeneralError, ParameterError
+from . import responses
+from .barcodes import GtinIndex
+from .cache import ResponseCache
+from .ratelimit import RateLimiter
+from .retry import WRITE_METHODS, RetryPolicy
+from .signing import OAuth1Signer
+from .singleflight import SingleFlight, request_key
 
 
 class Fatsecret(
+    BulkMixin,
+    DiaryMixin,
     ExercisesMixin,
     FoodsMixin,
     MealsMixin,
+    PaginationMixin,
     ProfileMixin,
     RecipesMixin,
+    ReconcileMixin,
     WeightMixin,
 ):
     """Core FatSecret API client logic (auth, request handling, utilities)."""
@@ -42,12 +53,21 @@ class Fatsecret(
     AUTHORIZE_URL = "https://authentication.fatsecret.com/oauth/authorize"
     ACCESS_TOKEN_URL = "https://authentication.fatsecret.com/oauth/access_token"
     BASE_URL = "https://platform.fatsecret.com/rest/server.api"
+    REQUEST_TIMEOUT = 300
+
+    _single_flight_class = SingleFlight
 
     def __init__(
         self,
         consumer_key: str,
         consumer_secret: str,
         session_token: Optional[Tuple[str, str]] = None,
+        cache: Optional[ResponseCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry: Optional[RetryPolicy] = None,
+        coalesce: bool = True,
+        barcode_index: Optional[GtinIndex] = None,
+        pool_maxsize: int = 10,
     ):
         """Initialize the FatSecret API session.
 
@@ -55,9 +75,21 @@ class Fatsecret(
             consumer_key: API consumer key (register at https://platform.fatsecret.com/api)
             consumer_secret: API consumer secret
             session_token: Optional (token, secret) tuple for an existing authenticated session
+            cache: Optional ResponseCache for reference data endpoints
+            rate_limiter: Optional RateLimiter consulted before every request sent
+            retry: Optional RetryPolicy applied to failed requests
+            coalesce: Share one request between concurrent identical read calls
+            barcode_index: Optional GtinIndex consulted before barcode lookups
+            pool_maxsize: Connections kept open per host; size it to the largest
+                ``max_concurrency`` of the bulk and streaming calls used
         """
         self.consumer_key = consumer_key
         self.consumer_secret = consumer_secret
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.retry = retry
+        self.single_flight = self._single_flight_class() if coalesce else None
+        self.barcode_index = barcode_index
 
         # Needed for new access. Generated by running get_authorize_url()
         self.request_token = None
@@ -77,19 +109,106 @@ class Fatsecret(
             base_url=self.BASE_URL,
         )
 
+        # Requests are signed locally and sent over one pooled HTTP session
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._owns_session = True
+        self.signer = OAuth1Signer(consumer_key, consumer_secret)
+
         # Open prior session or default to unauthorized session
         if session_token:
-            self.access_token = session_token[0]
-            self.access_token_secret = session_token[1]
-            self.session = self.oauth.get_session(token=session_token)
-        else:
-            # Default to unauthorized session
-            self.session = self.oauth.get_session()
+            self._use_token(session_token)
 
     @property
     def api_url(self) -> str:
         return self.oauth.base_url
 
+    def _use_token(self, session_token: Tuple[str, str]) -> None:
+        """Sign subsequent requests with the given (token, secret) pair."""
+        self.access_token, self.access_token_secret = session_token
+        self.signer = OAuth1Signer(
+            self.consumer_key, self.consumer_secret, *session_token
+        )
+
+    def _request(self, params: dict, extractor=responses.extract):
+        """Return the validated payload for an API call.
+
+        Every endpoint method in the mixins funnels through here. Results are
+        served from and stored in :attr:`cache` when the method is cacheable,
+        and concurrent identical reads share one request via :attr:`single_flight`.
+
+        :param extractor: Turns the decoded JSON document into the return value;
+            only the default :func:`~fatsecret.responses.extract` results are cached
+        """
+        cacheable = self._cacheable(params, extractor)
+        if cacheable:
+            hit, value = self.cache.lookup(
+                params, lambda: self._revalidate(params, extractor)
+            )
+            if hit:
+                return value
+
+        if self.single_flight is None or params.get("method") in WRITE_METHODS:
+            return self._load(params, extractor, cacheable)
+        return self.single_flight.do(
+            request_key(self, params, extractor),
+            self._load,
+            params,
+            extractor,
+            cacheable,
+        )
+
+    def _cacheable(self, params: dict, extractor) -> bool:
+        return (
+            self.cache is not None
+            and extractor is responses.extract
+            and self.cache.accepts(params)
+        )
+
+    def _revalidate(self, params: dict, extractor) -> None:
+        """Refresh a stale cache entry in a background thread."""
+
+        def refresh():
+            try:
+                self._load(params, extractor, True)
+            except Exception:
+                self.cache.release(params)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def _load(self, params: dict, extractor, cacheable: bool):
+        """Fetch a payload from the API and store it in the cache if ``cacheable``."""
+        value = self._fetch(params, extractor)
+        if cacheable:
+            self.cache.store(params, value)
+        return value
+
+    def _fetch(self, params: dict, extractor=responses.extract):
+        """Send a request, retrying failures according to :attr:`retry`."""
+        if self.retry is None:
+            return self._send(params, extractor)
+        return self.retry.call(
+            params.get("method", ""),
+            lambda timeout: self._send(params, extractor, timeout),
+            self.REQUEST_TIMEOUT,
+        )
+
+    def _send(self, params: dict, extractor=responses.extract, timeout=None):
+        """Send a signed GET to the REST endpoint and return the extracted payload."""
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        signed = self.signer.sign("GET", self.api_url, params)
+        response = self.session.get(
+            self.api_url,
+            params=signed,
+            timeout=self.REQUEST_TIMEOUT if timeout is None else timeout,
+        )
+        if response.status_code >= 500:
+            response.raise_for_status()
+        return extractor(responses.loads(response.content))
+
     def get_authorize_url(self, callback_url: str = "oob") -> str:
         """
         New implementation using manual OAuth 1.0 flow to /oauth/request_token on the new endpoint.
@@ -99,52 +218,9 @@ class Fatsecret(
         """
         print("Generating request token...")
 
-        oauth_consumer_key = self.consumer_key
-        oauth_consumer_secret = self.consumer_secret
-        oauth_signature_method = "HMAC-SHA1"
-        oauth_timestamp = str(int(time.time()))
-        oauth_nonce = str(uuid.uuid4().hex)
-        oauth_version = "1.0"
-        oauth_callback = callback_url
-
-        # Collect parameters for base string
-        params = {
-            "oauth_consumer_key": oauth_consumer_key,
-            "oauth_signature_method": oauth_signature_method,
-            "oauth_timestamp": oauth_timestamp,
-            "oauth_nonce": oauth_nonce,
-            "oauth_version": oauth_version,
-            "oauth_callback": oauth_callback,
-        }
-
-        base_params = "&".join(
-            [
-                "{}={}".format(
-                    urllib.parse.quote(k, safe=""), urllib.parse.quote(v, safe="")
-                )
-                for k, v in sorted(params.items())
-            ]
-        )
-        method = "POST"
         base_url = self.oauth.request_token_url
-        signature_base_string = "&".join(
-            [
-                method,
-                urllib.parse.quote(base_url, safe=""),
-                urllib.parse.quote(base_params, safe=""),
-            ]
-        )
-
-        signing_key = f"{urllib.parse.quote(oauth_consumer_secret, safe='')}&"
-
-        hashed = hmac.new(
-            signing_key.encode("utf-8"),
-            signature_base_string.encode("utf-8"),
-            hashlib.sha1,
-        )
-        oauth_signature = base64.b64encode(hashed.digest()).decode()
-
-        params["oauth_signature"] = oauth_signature
+        signer = OAuth1Signer(self.consumer_key, self.consumer_secret)
+        params = signer.sign("POST", base_url, {"oauth_callback": callback_url})
 
         headers = {
             "Content-Type": "application/x-www-form-urlencoded",
@@ -179,16 +255,17 @@ class Fatsecret(
             params={"oauth_verifier": verifier},
         )
 
-        self.access_token = session_token[0]
-        self.access_token_secret = session_token[1]
-        self.session = self.oauth.get_session(session_token)
+        self._use_token(session_token)
 
         # Return session token for app specific caching
         return session_token
 
     def close(self) -> None:
-        """Close the current HTTP session."""
-        self.session.close()
+        """Close the current HTTP session and rate limiter unless shared from a pool."""
+        if self._owns_session:
+            self.session.close()
+            if self.rate_limiter is not None:
+                self.rate_limiter.close()
 
     @staticmethod
     def unix_time(dt: datetime.datetime) -> int:
@@ -221,81 +298,8 @@ class Fatsecret(
 
     @staticmethod
     def valid_response(response: requests.Response):
-        """Validate a JSON API response and extract its data or raise an error."""
-        if response.json():
-
-            for key in response.json():
-
-                # Error Code Handling
-                if key == "error":
-                    code = response.json()[key]["code"]
-                    message = response.json()[key]["message"]
-                    if code == 2:
-                        raise AuthenticationError(
-                            2, "This api call requires an authenticated session"
-                        )
-
-                    elif code in [1, 10, 11, 12, 20, 21]:
-                        raise GeneralError(code, message)
-
-                    elif 3 <= code <= 9:
-                        raise AuthenticationError(code, message)
-
-                    elif 101 <= code <= 108:
-                        raise ParameterError(code, message)
-
-                    elif 201 <= code <= 207:
-                        raise ApplicationError(code, message)
-
-                # All other response options
-                elif key == "success":
-                    return True
-
-                elif key == "foods":
-                    return response.json()[key]["food"]
-
-                elif key == "suggestions":
-                    return response.json()[key]
-
-                elif key == "recipes":
-                    return response.json()[key]["recipe"]
-
-                elif key == "saved_meals":
-                    return response.json()[key]["saved_meal"]
-
-                elif key == "saved_meal_items":
-                    return response.json()[key]["saved_meal_item"]
-
-                elif key == "exercise_types":
-                    return response.json()[key]["exercise"]
-
-                elif key == "food_entries":
-                    if response.json()[key] is None:
-                        return []
-                    entries = response.json()[key]["food_entry"]
-                    if isinstance(entries, dict):
-                        return [entries]
-                    elif isinstance(entries, list):
-                        return entries
-
-                elif key == "month":
-                    return response.json()[key]["day"]
-
-                elif key == "profile":
-                    if "auth_token" in response.json()[key]:
-                        return (
-                            response.json()[key]["auth_token"],
-                            response.json()[key]["auth_secret"],
-                        )
-                    else:
-                        return response.json()[key]
-
-                elif key in (
-                    "food",
-                    "recipe",
-                    "recipe_types",
-                    "saved_meal_id",
-                    "saved_meal_item_id",
-                    "food_entry_id",
-                ):
-                    return response.json()[key]
+        """Validate a JSON API response and extract its data or raise an error.
+
+        The body is decoded a single time; see :mod:`fatsecret.responses`.
+        """
+        return responses.extract(responses.loads(response.content))
@@ -1,3 +1,6 @@
+from .barcodes import normalize_barcode
+
+
 class FoodsMixin:
 
     def food_add_favorite(self, food_id, serving_id=None, number_of_units=None):
@@ -17,8 +20,7 @@ class FoodsMixin:
             params["serving_id"] = serving_id
             params["number_of_units"] = number_of_units
 
-        response = self.session.get(self.api_url, params=params)
-        return self.valid_response(response)
+        return self._request(params)
 
     def food_delete_favorite(self, food_id, serving_id=None, number_of_units=None):
         """Delete the food to a user's favorite according to the parameters specified.
@@ -41,8 +43,7 @@ class FoodsMixin:
             params["serving_id"] = serving_id
             params["number_of_units"] = number_of_units
 
-        response = self.session.get(self.api_url, params=params)
-        return self.valid_response(response)
+        return self._request(params)
 
     def food_get(self, food_id):
         """Returns detailed nutritional information for the specified food.
@@ -55,8 +56,7 @@ class FoodsMixin:
 
         params = {"method": "food.get", "food_id": food_id, "format": "json"}
 
-        response = self.session.get(self.api_url, params=params)
-        return self.valid_response(response)
+        return self._request(params)
 
     def food_get_v2(self, food_id, region=None, language=None):
         """Returns detailed nutritional information for the specified food.
@@ -75,25 +75,28 @@ class FoodsMixin:
         if language:
             params["language"] = language
 
-        response = self.session.get(self.api_url, params=params)
-        return self.valid_response(response)
+        return self._request(params)
 
-    def food_find_id_for_barcode(self, barcode, region=None, language=None):
+    def food_find_id_for_barcode(self, barcode, region=None, language=None, kind=None):
         """Returns the food_id matching the barcode specified.
 
-        Barcodes must be specified as GTIN-13 numbers - a 13-digit number filled in with
-        zeros for the spaces to the left.
-
-        UPC-A, EAN-13 and EAN-8 barcodes may be specified.
-
-        UPC-E barcodes should be converted to their UPC-A equivalent (and then specified
-        as GTIN-13 numbers).
+        UPC-A, UPC-E, EAN-8, EAN-13 and GTIN-14 barcodes may be specified; they are
+        converted to GTIN-13 and their check digit is validated before any request.
+        When the client has a ``barcode_index`` it is consulted first.
 
-        :param barcode: The 13-digit GTIN-13 formated sequence of digits representing
-        the barcode to search against.
-        :type food_id: str
+        :param barcode: The barcode digits to search against.
+        :type barcode: str
+        :param kind: ``"upc-e"`` or ``"ean-8"``, required for 8-digit barcodes
+        :type kind: str
+        :raises InvalidBarcode: if the barcode is malformed or its check digit is wrong
         """
 
+        barcode = normalize_barcode(barcode, kind)
+        if self.barcode_index is not None:
+            food_id = self.barcode_index.get(barcode)
+            if food_id is not None:
+                return food_id
+
         params = {
             "method": "food.find_id_for_barcode",
             "barcode": barcode,
@@ -106,16 +109,14 @@ class FoodsMixin:
         if language:
             params["language"] = language
 
-        response = self.session.get(self.api_url, params=params)
-        return self.valid_response(response)
+        return self._request(params)
 
     def foods_get_favorites(self):
         """Returns the favorite foods for the authenticated user."""
 
         params = {"method": "foods.get_favorites", "format": "json"}
 
-        response = self.session.get(self.api_url, params=params)
-        return self.valid_response(response)
+        return self._request(params)
 
     def foods_get_most_eaten(self, meal=None):
         """Returns the most eaten foods for the user according to the meal specified.
@@ -128,8 +129,7 @@ class FoodsMixin:
         if meal in ["breakfast", "lunch", "dinner", "other"]:
             params["meal"] = meal
 
-        response = self.session.get(self.api_url, params=params)
-        return self.valid_response(response)
+        return self._request(params)
 
     def foods_get_recently_eaten(self, meal=None):
         """Returns the recently eaten foods for the user according to the meal specified
@@ -142,8 +142,7 @@ class FoodsMixin:
         if meal in ["breakfast", "lunch", "dinner", "other"]:
             params["meal"] = meal
 
-        response = self.session.get(self.api_url, params=params)
-        return self.valid_response(response)
+        return self._request(params)
 
     def foods_search(
         self,
@@ -166,14 +165,29 @@ class FoodsMixin:
         :param max_results: total results per page (default 20)
         :type max_results: int
         """
+        params = self._foods_search_params(
+            search_expression, page_number, max_results, region, language
+        )
+        return self._request(params)
+
+    @staticmethod
+    def _foods_search_params(
+        search_expression,
+        page_number=None,
+        max_results=None,
+        region=None,
+        language=None,
+    ):
         params = {
             "method": "foods.search",
             "search_expression": search_expression,
             "format": "json",
         }
 
-        if page_number and max_results:
+        if page_number is not None:
             params["page_number"] = page_number
+
+        if max_results is not None:
             params["max_results"] = max_results
 
         if region:
@@ -182,8 +196,7 @@ class FoodsMixin:
         if language:
             params["language"] = language
 
-        response = self.session.get(self.api_url, params=params)
-        return self.valid_response(response)
+        return params
 
     def foods_autocomplete(
         self, expression, max_results=None, region=None, language=None
@@ -212,8 +225,7 @@ class FoodsMixin:
         if language:
             params["language"] = language
 
-        response = self.session.get(self.api_url, params=params)
-        return self.valid_response(response)
+        return self._request(params)
 
     # profile
 
@@ -239,8 +251,7 @@ class FoodsMixin:
         if meal:
             params["meal"] = meal
 
-        response = self.session.get(self.api_url, params=params)
-        return self.valid_response(response)
+        return self._request(params)
 
     def food_entries_copy_saved_meal(self, meal_id, meal, date=None):
         """Copies the food entries for a specified saved meal to a specified meal.
@@ -263,8 +274,7 @@ class FoodsMixin:
         if date:
             params["date"] = self.unix_time(date)
 
-        response = self.session.get(self.api_url, params=params)
-        return self.valid_response(response)
+        return self._request(params)
 
     def food_entries_get(self, food_entry_id=None, date=None):
         """Returns saved food diary entries for the user according to the filter specified.
@@ -289,8 +299,7 @@ class FoodsMixin:
         else:
             return  # exit without running as no valid parameter was provided
 
-        response = self.session.get(self.api_url, params=params)
-        return self.valid_response(response)
+        return self._request(params)
 
     def food_entries_get_month(self, date=None):
         """Returns summary daily nutritional information for a user's food diary entries for the month specified.
@@ -306,8 +315,7 @@ class FoodsMixin:
         if date:
             params["date"] = self.unix_time(date)
 
-        response = self.session.get(self.api_url, params=params)
-        return self.valid_response(response)
+        return self._request(params)
 
     def food_entry_create(
         self, food_id, food_entry_name, serving_id, number_of_units, meal, date=None
@@ -341,8 +349,7 @@ class FoodsMixin:
         if date:
             params["date"] = self.unix_time(date)
 
-        response = self.session.get(self.api_url, params=params)
-        return self.valid_response(response)
+        return self._request(params)
 
     def food_entry_delete(self, food_entry_id):
         """Deletes the specified food entry for the user.
@@ -357,8 +364,7 @@ class FoodsMixin:
             "food_entry_id": food_entry_id,
         }
 
-        response = self.session.get(self.api_url, params=params)
-        return self.valid_response(response)
+        return self._request(params)
 
     def food_entry_edit(
         self, food_entry_id, entry_name=None, serving_id=None, num_units=None, meal=None
@@ -399,5 +405,4 @@ class FoodsMixin:
         if meal:
             params["meal"] = meal
 
-        response = self.session.get(self.api_url, params=params)
-        return self.valid_response(response)
+        return self._request(params)
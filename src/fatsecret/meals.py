@@ -22,8 +22,7 @@ class MealsMixin:
         if meals:
             params["meals"] = ",".join(meals)
 
-        response = self.session.get(self.api_url, params=params)
-        return self.valid_response(response)
+        return self._request(params)
 
     def saved_meal_delete(self, meal_id):
         """Deletes the specified saved meal for the user.
@@ -38,8 +37,7 @@ class MealsMixin:
             "saved_meal_id": meal_id,
         }
 
-        response = self.session.get(self.api_url, params=params)
-        return self.valid_response(response)
+        return self._request(params)
 
     def saved_meal_edit(self, meal_id, new_name=None, meal_desc=None, meals=None):
         """Records a change to a user's saved meal.
@@ -68,8 +66,7 @@ class MealsMixin:
         if meals:
             params["meals"] = ",".join(meals)
 
-        response = self.session.get(self.api_url, params=params)
-        return self.valid_response(response)
+        return self._request(params)
 
     def saved_meal_get(self, meal=None):
         """Returns saved meals for the authenticated user
@@ -83,8 +80,7 @@ class MealsMixin:
         if meal:
             params["meal"] = meal
 
-        response = self.session.get(self.api_url, params)
-        return self.valid_response(response)
+        return self._request(params)
 
     def saved_meal_item_add(
         self, meal_id, food_id, food_entry_name, serving_id, num_units
@@ -112,8 +108,7 @@ class MealsMixin:
             "number_of_units": num_units,
         }
 
-        response = self.session.get(self.api_url, params)
-        return self.valid_response(response)
+        return self._request(params)
 
     def saved_meal_item_delete(self, meal_item_id):
         """Deletes the specified saved meal item for the user.
@@ -128,8 +123,7 @@ class MealsMixin:
             "saved_meal_item_id": meal_item_id,
         }
 
-        response = self.session.get(self.api_url, params)
-        return self.valid_response(response)
+        return self._request(params)
 
     def saved_meal_item_edit(self, meal_item_id, item_name=None, num_units=None):
         """Records a change to a user's saved meal item.
@@ -157,8 +151,7 @@ class MealsMixin:
         if num_units:
             params["number_of_units"] = num_units
 
-        response = self.session.get(self.api_url, params=params)
-        return self.valid_response(response)
+        return self._request(params)
 
     def saved_meal_items_get(self, meal_id):
         """Returns saved meal items for a specified saved meal.
@@ -173,5 +166,4 @@ class MealsMixin:
             "saved_meal_id": meal_id,
         }
 
-        response = self.session.get(self.api_url, params=params)
-        return self.valid_response(response)
+        return self._request(params)
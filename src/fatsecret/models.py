@@ -0,0 +1,391 @@
+"""
+fatsecret.models
+----------------
+
+Compact typed records for API results.
+
+The client returns the API's nested dicts of strings. When many results are
+kept in memory, convert them with ``from_dict`` (one record) or ``many``
+(a result that may be a dict, a list or ``None``) into these models instead:
+
+* fields live in ``__slots__``, so records carry no per-instance ``__dict__``;
+* numbers are parsed once, IDs become ``int`` and ``date_int`` a
+  :class:`datetime.date`;
+* nutrient values are packed into one ``array('d')`` (8 bytes each, ``NaN``
+  for values the API left out) and read back as ``float`` or ``None``;
+* short categorical strings such as meal names, food types and serving
+  units are interned, so every record shares one copy.
+"""
+
+from array import array
+from typing import Iterable, List, Optional
+import datetime
+import math
+import sys
+
+from .sync import from_date_int
+
+#: Nutrients reported for servings, food entries and recipes, in storage order.
+NUTRIENTS = (
+    "calories",
+    "carbohydrate",
+    "protein",
+    "fat",
+    "saturated_fat",
+    "polyunsaturated_fat",
+    "monounsaturated_fat",
+    "trans_fat",
+    "cholesterol",
+    "sodium",
+    "potassium",
+    "fiber",
+    "sugar",
+    "added_sugars",
+    "vitamin_a",
+    "vitamin_c",
+    "vitamin_d",
+    "calcium",
+    "iron",
+)
+
+_MISSING = float("nan")
+
+
+def _present(value) -> bool:
+    return value is not None and value != ""
+
+
+def _text(value) -> Optional[str]:
+    return str(value) if _present(value) else None
+
+
+def _label(value) -> Optional[str]:
+    return sys.intern(str(value)) if _present(value) else None
+
+
+def _float(value) -> Optional[float]:
+    return float(value) if _present(value) else None
+
+
+def _int(value) -> Optional[int]:
+    return int(value) if _present(value) else None
+
+
+def _flag(value) -> Optional[bool]:
+    return str(value) == "1" if _present(value) else None
+
+
+def _date(value) -> Optional[datetime.date]:
+    return from_date_int(value) if _present(value) else None
+
+
+def _listed(value, name: Optional[str] = None) -> list:
+    """Return the items of a result that may be ``None``, one dict or a list."""
+    if isinstance(value, dict) and name is not None and name in value:
+        value = value[name]
+    if not value:
+        return []
+    if isinstance(value, (dict, str)):
+        return [value]
+    return list(value)
+
+
+class Record:
+    """Base class of the models.
+
+    Subclasses list their fields in ``__slots__`` and in ``_FIELDS`` as
+    ``(name, parser)`` pairs applied to the API value of the same key.
+    """
+
+    __slots__ = ()
+    _FIELDS = ()
+
+    def __init__(self, **values):
+        for name in self._names():
+            setattr(self, name, values.pop(name, None))
+        if values:
+            raise TypeError(f"Unknown {type(self).__name__} fields: {sorted(values)}")
+
+    @classmethod
+    def _names(cls):
+        return [name for name, _ in cls._FIELDS]
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """Build a record from one API result, ignoring unknown keys."""
+        record = cls.__new__(cls)
+        for name, parse in cls._FIELDS:
+            setattr(record, name, parse(data.get(name)))
+        return record
+
+    @classmethod
+    def many(cls, value) -> List["Record"]:
+        """Build records from a result that may be ``None``, one dict or a list."""
+        return [cls.from_dict(item) for item in _listed(value)]
+
+    def to_dict(self) -> dict:
+        """Return the fields that are set, with parsed values."""
+        data = {}
+        for name in self._names():
+            value = getattr(self, name)
+            if value is not None:
+                data[name] = value
+        return data
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        fields = ", ".join(f"{k}={v!r}" for k, v in self.to_dict().items())
+        return f"{type(self).__name__}({fields})"
+
+
+class NutrientRecord(Record):
+    """Record whose :data:`NUTRIENTS` are stored in one packed ``array('d')``."""
+
+    __slots__ = ("_nutrients",)
+
+    def __init__(self, **values):
+        nutrients = array("d", [_MISSING]) * len(NUTRIENTS)
+        for index, name in enumerate(NUTRIENTS):
+            value = values.pop(name, None)
+            if value is not None:
+                nutrients[index] = value
+        self._nutrients = nutrients
+        super().__init__(**values)
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        record = super().from_dict(data)
+        record._nutrients = _pack_nutrients(data)
+        return record
+
+    def nutrients(self) -> dict:
+        """Return ``{nutrient: value}`` for the nutrients the API reported."""
+        return {
+            name: value
+            for name, value in zip(NUTRIENTS, self._nutrients)
+            if not math.isnan(value)
+        }
+
+    def to_dict(self) -> dict:
+        data = super().to_dict()
+        data.update(self.nutrients())
+        return data
+
+
+def _pack_nutrients(data: dict) -> array:
+    return array(
+        "d",
+        [
+            float(data[name]) if _present(data.get(name)) else _MISSING
+            for name in NUTRIENTS
+        ],
+    )
+
+
+def _nutrient(index: int):
+    def get(self) -> Optional[float]:
+        value = self._nutrients[index]
+        return None if math.isnan(value) else value
+
+    return property(get)
+
+
+for _index, _name in enumerate(NUTRIENTS):
+    setattr(NutrientRecord, _name, _nutrient(_index))
+del _index, _name
+
+
+class Serving(NutrientRecord):
+    """One serving of a food from ``food.get``."""
+
+    __slots__ = (
+        "is_default",
+        "measurement_description",
+        "metric_serving_amount",
+        "metric_serving_unit",
+        "number_of_units",
+        "serving_description",
+        "serving_id",
+        "serving_url",
+    )
+    _FIELDS = (
+        ("serving_id", _int),
+        ("serving_description", _label),
+        ("serving_url", _text),
+        ("metric_serving_amount", _float),
+        ("metric_serving_unit", _label),
+        ("number_of_units", _float),
+        ("measurement_description", _label),
+        ("is_default", _flag),
+    )
+
+
+class Food(Record):
+    """A food from ``food.get`` or ``foods.search``, with its servings."""
+
+    __slots__ = (
+        "brand_name",
+        "food_description",
+        "food_id",
+        "food_name",
+        "food_type",
+        "food_url",
+        "servings",
+    )
+    _FIELDS = (
+        ("food_id", _int),
+        ("food_name", _text),
+        ("food_type", _label),
+        ("brand_name", _label),
+        ("food_url", _text),
+        ("food_description", _text),
+    )
+
+    def __init__(self, servings: Iterable[Serving] = (), **values):
+        super().__init__(**values)
+        self.servings = tuple(servings)
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        food = super().from_dict(data)
+        food.servings = tuple(
+            Serving.from_dict(serving)
+            for serving in _listed(data.get("servings"), "serving")
+        )
+        return food
+
+    def to_dict(self) -> dict:
+        data = super().to_dict()
+        if self.servings:
+            data["servings"] = [serving.to_dict() for serving in self.servings]
+        return data
+
+    def default_serving(self) -> Optional[Serving]:
+        """Return the serving flagged as default, or else the first one."""
+        for serving in self.servings:
+            if serving.is_default:
+                return serving
+        return self.servings[0] if self.servings else None
+
+
+class FoodEntry(NutrientRecord):
+    """A diary entry from ``food_entries.get``."""
+
+    __slots__ = (
+        "date_int",
+        "food_entry_description",
+        "food_entry_id",
+        "food_entry_name",
+        "food_id",
+        "meal",
+        "number_of_units",
+        "serving_id",
+    )
+    _FIELDS = (
+        ("food_entry_id", _int),
+        ("food_entry_name", _label),
+        ("food_entry_description", _text),
+        ("food_id", _int),
+        ("serving_id", _int),
+        ("number_of_units", _float),
+        ("meal", _label),
+        ("date_int", _date),
+    )
+
+
+class Recipe(NutrientRecord):
+    """A recipe from ``recipe.get`` or ``recipes.search``.
+
+    Nutrients are those of one serving, read from ``serving_sizes`` or, for
+    search results, ``recipe_nutrition``.
+    """
+
+    __slots__ = (
+        "cooking_time_min",
+        "number_of_servings",
+        "preparation_time_min",
+        "rating",
+        "recipe_description",
+        "recipe_id",
+        "recipe_name",
+        "recipe_types",
+        "recipe_url",
+    )
+    _FIELDS = (
+        ("recipe_id", _int),
+        ("recipe_name", _text),
+        ("recipe_description", _text),
+        ("recipe_url", _text),
+        ("number_of_servings", _float),
+        ("preparation_time_min", _int),
+        ("cooking_time_min", _int),
+        ("rating", _float),
+    )
+
+    def __init__(self, recipe_types: Iterable[str] = (), **values):
+        super().__init__(**values)
+        self.recipe_types = tuple(recipe_types)
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        recipe = super().from_dict(data)
+        servings = _listed(data.get("serving_sizes"), "serving")
+        nutrition = servings[0] if servings else data.get("recipe_nutrition")
+        recipe._nutrients = _pack_nutrients(nutrition or {})
+        recipe.recipe_types = tuple(
+            sys.intern(name)
+            for name in _listed(data.get("recipe_types"), "recipe_type")
+        )
+        return recipe
+
+    def to_dict(self) -> dict:
+        data = super().to_dict()
+        if self.recipe_types:
+            data["recipe_types"] = list(self.recipe_types)
+        return data
+
+
+class SavedMeal(Record):
+    """A saved meal from ``saved_meals.get``."""
+
+    __slots__ = ("meals", "saved_meal_description", "saved_meal_id", "saved_meal_name")
+    _FIELDS = (
+        ("saved_meal_id", _int),
+        ("saved_meal_name", _text),
+        ("saved_meal_description", _text),
+    )
+
+    def __init__(self, meals: Iterable[str] = (), **values):
+        super().__init__(**values)
+        self.meals = tuple(meals)
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        meal = super().from_dict(data)
+        meal.meals = tuple(
+            sys.intern(name.strip())
+            for name in (data.get("meals") or "").split(",")
+            if name.strip()
+        )
+        return meal
+
+    def to_dict(self) -> dict:
+        data = super().to_dict()
+        if self.meals:
+            data["meals"] = list(self.meals)
+        return data
+
+
+class WeightDay(Record):
+    """A day of ``weights.get_month``."""
+
+    __slots__ = ("date_int", "weight_comment", "weight_kg")
+    _FIELDS = (
+        ("date_int", _date),
+        ("weight_kg", _float),
+        ("weight_comment", _text),
+    )
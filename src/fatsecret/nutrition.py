@@ -0,0 +1,176 @@
+"""
+fatsecret.nutrition
+-------------------
+
+Vectorized nutrient totals over a matrix of food servings.
+
+A :class:`NutritionEngine` packs the servings of the foods it has seen into
+a NumPy matrix with one row per serving and one column per nutrient of
+:data:`~fatsecret.models.NUTRIENTS`, scaled to one unit of the serving's
+measurement. Totals of saved meal items, food entries and recipe
+ingredients are then a product of their ``number_of_units`` vector with the
+matching rows, and per-day totals of a diary are one weighted ``bincount``
+per nutrient rather than a Python loop over dicts.
+
+Nutrients a serving does not report count as zero. Requires NumPy (the
+``nutrition`` extra).
+"""
+
+from typing import Dict, Iterable
+import datetime
+import threading
+
+from .models import NUTRIENTS, Food, _listed, _present
+from .sync import from_date_int
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - optional dependency
+    numpy = None
+
+
+class NutritionEngine:
+    """Nutrient matrix of food servings with vectorized totals.
+
+    :param client: Client used to fetch foods whose servings are unknown;
+        give it a :class:`~fatsecret.ResponseCache` so each food is fetched once
+    :type client: ~fatsecret.Fatsecret
+    :param capacity: Initial number of matrix rows; the matrix grows as needed
+    :type capacity: int
+    """
+
+    def __init__(self, client=None, capacity: int = 1024):
+        if numpy is None:
+            raise ImportError(
+                "NutritionEngine requires numpy; install the 'nutrition' extra"
+            )
+        self.client = client
+        self._matrix = numpy.zeros((max(capacity, 1), len(NUTRIENTS)))
+        self._rows = {}
+        self._foods = set()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, serving_id) -> bool:
+        return int(serving_id) in self._rows
+
+    @property
+    def matrix(self):
+        """Read-only view of the rows filled so far, one unit of each serving."""
+        view = self._matrix[: len(self._rows)]
+        view.flags.writeable = False
+        return view
+
+    def add_food(self, food) -> None:
+        """Add the servings of a ``food_get`` result or :class:`~fatsecret.Food`."""
+        if not isinstance(food, Food):
+            food = Food.from_dict(food)
+        with self._lock:
+            for serving in food.servings:
+                units = serving.number_of_units or 1.0
+                values = numpy.nan_to_num(
+                    numpy.frombuffer(serving._nutrients, dtype=numpy.float64)
+                )
+                row = self._rows.get(serving.serving_id)
+                if row is None:
+                    row = self._rows[serving.serving_id] = len(self._rows)
+                    if row == len(self._matrix):
+                        grown = numpy.zeros((2 * row, len(NUTRIENTS)))
+                        grown[:row] = self._matrix
+                        self._matrix = grown
+                self._matrix[row] = values / units
+            if food.food_id is not None:
+                self._foods.add(food.food_id)
+
+    def _load(self, items) -> None:
+        """Fetch the foods of servings not in the matrix yet."""
+        missing = {
+            int(item["food_id"])
+            for item in items
+            if int(item["serving_id"]) not in self._rows
+            and _present(item.get("food_id"))
+        }
+        for food_id in sorted(missing - self._foods):
+            if self.client is None:
+                raise KeyError(f"Unknown food {food_id} and no client to fetch it")
+            self.add_food(self.client.food_get(food_id))
+
+    def _vectors(self, items):
+        """Return the matrix rows and ``number_of_units`` of ``items``."""
+        items = list(items)
+        self._load(items)
+        count = len(items)
+        try:
+            rows = numpy.fromiter(
+                (self._rows[int(item["serving_id"])] for item in items),
+                dtype=numpy.intp,
+                count=count,
+            )
+        except KeyError as error:
+            raise KeyError(f"Unknown serving {error.args[0]}") from None
+        units = numpy.fromiter(
+            (float(item.get("number_of_units") or 1) for item in items),
+            dtype=numpy.float64,
+            count=count,
+        )
+        return items, rows, units
+
+    def _named(self, values) -> Dict[str, float]:
+        return dict(zip(NUTRIENTS, values.tolist()))
+
+    def totals(self, items: Iterable[dict]) -> Dict[str, float]:
+        """Return the summed nutrients of items holding ``serving_id`` and ``number_of_units``.
+
+        Works for saved meal items, food entries and recipe ingredients.
+        Servings of unknown foods are fetched through the client first.
+        """
+        _, rows, units = self._vectors(items)
+        return self._named(units @ self._matrix[rows])
+
+    def daily_totals(
+        self, entries: Iterable[dict]
+    ) -> Dict[datetime.date, Dict[str, float]]:
+        """Return ``{date: nutrients}`` for food entries grouped by ``date_int``."""
+        entries, rows, units = self._vectors(entries)
+        days, groups = numpy.unique(
+            numpy.fromiter(
+                (int(entry["date_int"]) for entry in entries),
+                dtype=numpy.int64,
+                count=len(entries),
+            ),
+            return_inverse=True,
+        )
+        columns = [
+            numpy.bincount(
+                groups, weights=units * self._matrix[rows, column], minlength=len(days)
+            )
+            for column in range(len(NUTRIENTS))
+        ]
+        table = numpy.column_stack(columns)
+        return {
+            from_date_int(day): self._named(values)
+            for day, values in zip(days.tolist(), table)
+        }
+
+    def saved_meal_totals(self, meal_id) -> Dict[str, float]:
+        """Return the nutrients of a saved meal from ``saved_meal_items_get``."""
+        return self.totals(_listed(self.client.saved_meal_items_get(meal_id)))
+
+    def recipe_totals(self, recipe, per_serving: bool = False) -> Dict[str, float]:
+        """Return the nutrients of a recipe's ingredients.
+
+        :param recipe: ``recipe_get`` result or recipe ID
+        :type recipe: dict
+        :param per_serving: Divide by the recipe's ``number_of_servings``
+        :type per_serving: bool
+        """
+        if not isinstance(recipe, dict):
+            recipe = self.client.recipe_get(recipe)
+        ingredients = _listed(recipe.get("ingredients"), "ingredient")
+        totals = self.totals(ingredients)
+        servings = recipe.get("number_of_servings")
+        if per_serving and _present(servings) and float(servings):
+            totals = {name: value / float(servings) for name, value in totals.items()}
+        return totals
@@ -0,0 +1,273 @@
+"""
+fatsecret.pagination
+--------------------
+
+Lazy iteration over every page of ``foods.search`` and ``recipes.search``.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import math
+
+from . import responses
+from .bulk import async_fan_out, fan_out
+
+#: Largest page size accepted by the search endpoints.
+MAX_PAGE_SIZE = 50
+
+
+def _check_page_size(page_size):
+    if not 1 <= page_size <= MAX_PAGE_SIZE:
+        raise ValueError(f"page_size must be between 1 and {MAX_PAGE_SIZE}")
+
+
+def _has_next(page, page_number, page_size):
+    """Whether another page exists after ``page_number`` according to ``total_results``."""
+    return bool(page.items) and (page_number + 1) * page_size < page.total_results
+
+
+def _page_count(first_page, page_size, max_total):
+    total = first_page.total_results
+    if max_total is not None:
+        total = min(total, max_total)
+    return total, math.ceil(total / page_size)
+
+
+def fan_out_pages(fetch_page, page_size, max_concurrency, max_total=None):
+    """Fetch page 0, then every remaining page concurrently, yielding items in page order.
+
+    :param fetch_page: Callable taking a zero-based page number and returning a
+        :class:`~fatsecret.responses.SearchPage`
+    :param page_size: Results requested per page
+    :type page_size: int
+    :param max_concurrency: Maximum number of pages in flight
+    :type max_concurrency: int
+    :param max_total: Stop after this many results
+    :type max_total: int
+    """
+    first = fetch_page(0)
+    total, pages = _page_count(first, page_size, max_total)
+    yield from first.items[:total]
+    emitted = min(len(first.items), total)
+    for result in fan_out(fetch_page, range(1, pages), max_concurrency, ordered=True):
+        if not result.ok:
+            raise result.error
+        items = result.value.items[: total - emitted]
+        emitted += len(items)
+        yield from items
+
+
+async def afan_out_pages(fetch_page, page_size, max_concurrency, max_total=None):
+    """Asynchronous counterpart of :func:`fan_out_pages`."""
+    first = await fetch_page(0)
+    total, pages = _page_count(first, page_size, max_total)
+    for item in first.items[:total]:
+        yield item
+    emitted = min(len(first.items), total)
+    results = async_fan_out(fetch_page, range(1, pages), max_concurrency, ordered=True)
+    async for result in results:
+        if not result.ok:
+            raise result.error
+        items = result.value.items[: total - emitted]
+        emitted += len(items)
+        for item in items:
+            yield item
+
+
+async def aiter_pages(fetch_page, page_size):
+    """Asynchronously yield the items of successive pages, prefetching one ahead.
+
+    :param fetch_page: Coroutine function taking a zero-based page number and
+        returning a :class:`~fatsecret.responses.SearchPage`
+    :param page_size: Results requested per page
+    :type page_size: int
+    """
+    page_number = 0
+    pending = asyncio.ensure_future(fetch_page(page_number))
+    try:
+        while pending is not None:
+            page = await pending
+            if _has_next(page, page_number, page_size):
+                page_number += 1
+                pending = asyncio.ensure_future(fetch_page(page_number))
+            else:
+                pending = None
+            for item in page.items:
+                yield item
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+class PaginationMixin:
+
+    def foods_search_page(
+        self,
+        search_expression,
+        page_number=0,
+        max_results=MAX_PAGE_SIZE,
+        region=None,
+        language=None,
+    ):
+        """Return one page of food search results together with its totals.
+
+        :param search_expression: term or phrase to search
+        :type search_expression: str
+        :param page_number: zero-based page to return
+        :type page_number: int
+        :param max_results: results per page (at most 50)
+        :type max_results: int
+        :rtype: fatsecret.responses.SearchPage
+        """
+        params = self._foods_search_params(
+            search_expression, page_number, max_results, region, language
+        )
+        return self._request(params, responses.extract_page)
+
+    def recipes_search_page(
+        self,
+        search_expression,
+        recipe_type=None,
+        page_number=0,
+        max_results=MAX_PAGE_SIZE,
+    ):
+        """Return one page of recipe search results together with its totals.
+
+        :param search_expression: phrase to search on
+        :type search_expression: str
+        :param recipe_type: type of recipe to filter
+        :type recipe_type: str
+        :param page_number: zero-based page to return
+        :type page_number: int
+        :param max_results: results per page (at most 50)
+        :type max_results: int
+        :rtype: fatsecret.responses.SearchPage
+        """
+        params = self._recipes_search_params(
+            search_expression, recipe_type, page_number, max_results
+        )
+        return self._request(params, responses.extract_page)
+
+    def iter_foods_search(
+        self, search_expression, page_size=MAX_PAGE_SIZE, region=None, language=None
+    ):
+        """Yield every food matching ``search_expression``, one page at a time.
+
+        The next page is requested in the background while the current one is
+        consumed, and iteration stops once ``total_results`` is reached.
+
+        :param search_expression: term or phrase to search
+        :type search_expression: str
+        :param page_size: results requested per page (at most 50)
+        :type page_size: int
+        """
+        _check_page_size(page_size)
+        return self._iter_pages(
+            lambda page_number: self.foods_search_page(
+                search_expression, page_number, page_size, region, language
+            ),
+            page_size,
+        )
+
+    def iter_recipes_search(
+        self, search_expression, recipe_type=None, page_size=MAX_PAGE_SIZE
+    ):
+        """Yield every recipe matching ``search_expression``, one page at a time.
+
+        See :meth:`iter_foods_search` for the prefetching behaviour.
+
+        :param search_expression: phrase to search on
+        :type search_expression: str
+        :param recipe_type: type of recipe to filter
+        :type recipe_type: str
+        :param page_size: results requested per page (at most 50)
+        :type page_size: int
+        """
+        _check_page_size(page_size)
+        return self._iter_pages(
+            lambda page_number: self.recipes_search_page(
+                search_expression, recipe_type, page_number, page_size
+            ),
+            page_size,
+        )
+
+    def foods_search_all(
+        self,
+        search_expression,
+        page_size=MAX_PAGE_SIZE,
+        max_concurrency=4,
+        max_total=None,
+        region=None,
+        language=None,
+    ):
+        """Yield every matching food, fetching all pages after the first concurrently.
+
+        Page 0 is read to learn ``total_results``; the remaining pages are then
+        requested together with at most ``max_concurrency`` in flight. Foods
+        are yielded in page order. The first failing page raises its error.
+
+        :param search_expression: term or phrase to search
+        :type search_expression: str
+        :param page_size: results requested per page (at most 50)
+        :type page_size: int
+        :param max_concurrency: maximum number of pages in flight
+        :type max_concurrency: int
+        :param max_total: stop after this many results
+        :type max_total: int
+        """
+        _check_page_size(page_size)
+        return fan_out_pages(
+            lambda page_number: self.foods_search_page(
+                search_expression, page_number, page_size, region, language
+            ),
+            page_size,
+            max_concurrency,
+            max_total,
+        )
+
+    def recipes_search_all(
+        self,
+        search_expression,
+        recipe_type=None,
+        page_size=MAX_PAGE_SIZE,
+        max_concurrency=4,
+        max_total=None,
+    ):
+        """Yield every matching recipe, fetching all pages after the first concurrently.
+
+        See :meth:`foods_search_all`.
+
+        :param search_expression: phrase to search on
+        :type search_expression: str
+        :param recipe_type: type of recipe to filter
+        :type recipe_type: str
+        :param page_size: results requested per page (at most 50)
+        :type page_size: int
+        :param max_concurrency: maximum number of pages in flight
+        :type max_concurrency: int
+        :param max_total: stop after this many results
+        :type max_total: int
+        """
+        _check_page_size(page_size)
+        return fan_out_pages(
+            lambda page_number: self.recipes_search_page(
+                search_expression, recipe_type, page_number, page_size
+            ),
+            page_size,
+            max_concurrency,
+            max_total,
+        )
+
+    @staticmethod
+    def _iter_pages(fetch_page, page_size):
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            page_number = 0
+            pending = executor.submit(fetch_page, page_number)
+            while pending is not None:
+                page = pending.result()
+                if _has_next(page, page_number, page_size):
+                    page_number += 1
+                    pending = executor.submit(fetch_page, page_number)
+                else:
+                    pending = None
+                yield from page.items
@@ -0,0 +1,102 @@
+"""
+fatsecret.pool
+--------------
+
+Cheap per-user clients for multi-tenant services.
+"""
+
+from collections import OrderedDict
+from typing import Optional, Tuple
+import copy
+import threading
+
+from .fatsecret import Fatsecret
+
+
+class FatsecretPool:
+    """Hands out per-user :class:`~fatsecret.Fatsecret` handles sharing one connection pool.
+
+    Handles are shallow copies of a single template client: they share its
+    HTTP session, response cache and rate limiting, and differ only in the
+    access token they sign with. The most recently used handles are kept in
+    an LRU so hot users do not rebuild their signer on every request.
+
+    :param consumer_key: API consumer key
+    :type consumer_key: str
+    :param consumer_secret: API consumer secret
+    :type consumer_secret: str
+    :param max_handles: Number of user handles kept in the LRU
+    :type max_handles: int
+    :param pool_maxsize: Connections kept open per host in the shared pool
+    :type pool_maxsize: int
+    :param kwargs: Further options for the template :class:`~fatsecret.Fatsecret`
+    """
+
+    def __init__(
+        self,
+        consumer_key: str,
+        consumer_secret: str,
+        max_handles: int = 1024,
+        pool_maxsize: int = 32,
+        **kwargs,
+    ):
+        self.client = Fatsecret(
+            consumer_key, consumer_secret, pool_maxsize=pool_maxsize, **kwargs
+        )
+
+        self.max_handles = max_handles
+        self.hits = 0
+        self.misses = 0
+        self._handles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._handles)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get(self, session_token: Optional[Tuple[str, str]] = None) -> Fatsecret:
+        """Return a client bound to ``session_token``.
+
+        Without a token the shared, unauthenticated template client is returned.
+
+        :param session_token: (access_token, access_token_secret) of a user
+        :type session_token: tuple
+        """
+        if session_token is None:
+            return self.client
+
+        key = tuple(session_token)
+        with self._lock:
+            handle = self._handles.get(key)
+            if handle is not None:
+                self._handles.move_to_end(key)
+                self.hits += 1
+                return handle
+            self.misses += 1
+
+        handle = copy.copy(self.client)
+        handle._owns_session = False
+        handle._use_token(key)
+
+        with self._lock:
+            self._handles[key] = handle
+            self._handles.move_to_end(key)
+            while len(self._handles) > self.max_handles:
+                self._handles.popitem(last=False)
+        return handle
+
+    def discard(self, session_token: Tuple[str, str]) -> None:
+        """Forget the handle of a user, e.g. after their token was revoked."""
+        with self._lock:
+            self._handles.pop(tuple(session_token), None)
+
+    def close(self) -> None:
+        """Drop every handle and close the shared HTTP session."""
+        with self._lock:
+            self._handles.clear()
+        self.client.close()
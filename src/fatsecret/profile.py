@@ -17,17 +17,13 @@ class ProfileMixin:
         if user_id:
             params["user_id"] = user_id
 
-        response = self.session.get(self.api_url, params=params)
-
-        return self.valid_response(response)
+        return self._request(params)
 
     def profile_get(self):
         """Returns general status information for a nominated user."""
 
         params = {"method": "profile.get", "format": "json"}
-        response = self.session.get(self.api_url, params=params)
-
-        return self.valid_response(response)
+        return self._request(params)
 
     def profile_get_auth(self, user_id):
         """Returns the authentication information for a nominated user.
@@ -38,5 +34,4 @@ class ProfileMixin:
 
         params = {"method": "profile.get_auth", "format": "json", "user_id": user_id}
 
-        response = self.session.get(self.api_url, params=params)
-        return self.valid_response(response)
+        return self._request(params)
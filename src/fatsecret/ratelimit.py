@@ -0,0 +1,242 @@
+"""
+fatsecret.ratelimit
+-------------------
+
+Client-side token bucket that keeps request bursts under the API quota.
+
+The bucket state lives either in the process (shared by its threads) or in a
+small file guarded by ``fcntl.flock`` so that every worker process pointing at
+the same path draws from one bucket.
+"""
+
+from contextlib import contextmanager
+from typing import Optional
+import asyncio
+import os
+import struct
+import threading
+import time
+
+from .errors import RateLimitExceeded
+
+DAY = 24 * 60 * 60
+
+
+class _LocalState:
+    """Bucket state kept in memory and shared by the threads of one process."""
+
+    def __init__(self, capacity):
+        self.values = [float(capacity), time.time(), 0.0, 0.0]
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            yield self.values
+
+
+class _FileState:
+    """Bucket state stored in a file and locked with ``flock`` for cross-process use."""
+
+    _FORMAT = struct.Struct("4d")
+
+    def __init__(self, path, capacity):
+        import fcntl
+
+        self._fcntl = fcntl
+        self._path = path
+        self._capacity = capacity
+        self._lock = threading.Lock()
+        self._fd = None
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            if self._fd is None:
+                self._fd = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o600)
+            self._fcntl.flock(self._fd, self._fcntl.LOCK_EX)
+            try:
+                raw = os.pread(self._fd, self._FORMAT.size, 0)
+                if len(raw) == self._FORMAT.size:
+                    values = list(self._FORMAT.unpack(raw))
+                else:
+                    values = [float(self._capacity), time.time(), 0.0, 0.0]
+                yield values
+                os.pwrite(self._fd, self._FORMAT.pack(*values), 0)
+            finally:
+                self._fcntl.flock(self._fd, self._fcntl.LOCK_UN)
+
+    def close(self):
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+
+class RateLimiter:
+    """Token bucket limiting requests per second and per day.
+
+    Pass an instance as the ``rate_limiter`` argument of
+    :class:`~fatsecret.Fatsecret`; every request sent to the API (cache hits
+    excluded) then takes one token first.
+
+    :param rate: Sustained requests per second
+    :type rate: float
+    :param burst: Bucket capacity, i.e. requests allowed back to back (default ``rate``)
+    :type burst: float
+    :param daily_quota: Maximum requests per UTC day
+    :type daily_quota: int
+    :param path: File holding the bucket so that several processes share it
+    :type path: str
+    :param block: Wait for a token instead of raising :class:`~fatsecret.RateLimitExceeded`
+    :type block: bool
+    :param timeout: Longest a blocking call may wait before raising
+    :type timeout: float
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        daily_quota: Optional[int] = None,
+        path: Optional[str] = None,
+        block: bool = True,
+        timeout: Optional[float] = None,
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = max(1.0, float(burst if burst is not None else rate))
+        self.daily_quota = daily_quota
+        self.block = block
+        self.timeout = timeout
+        self.path = path
+        if path is None:
+            self._state = _LocalState(self.capacity)
+        else:
+            self._state = _FileState(path, self.capacity)
+
+        self.waiting = 0
+        self.acquired = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._metrics_lock = threading.Lock()
+
+    def _try_acquire(self):
+        """Take a token if possible; otherwise return the seconds until one is available."""
+        now = time.time()
+        today = float(now // DAY)
+        with self._state.transaction() as state:
+            tokens, updated, day, used = state
+            tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+            if day != today:
+                day, used = today, 0.0
+            if self.daily_quota is not None and used >= self.daily_quota:
+                state[:] = [tokens, now, day, used]
+                raise RateLimitExceeded("Daily request quota exhausted")
+            if tokens >= 1:
+                state[:] = [tokens - 1, now, day, used + 1]
+                return 0.0
+            state[:] = [tokens, now, day, used]
+            return (1 - tokens) / self.rate
+
+    def _next_wait(self, started, block, timeout):
+        try:
+            delay = self._try_acquire()
+        except RateLimitExceeded:
+            self._record(rejected=True)
+            raise
+        if delay == 0:
+            self._record(waited=time.monotonic() - started)
+            return 0
+        elapsed = time.monotonic() - started
+        if not block or (timeout is not None and elapsed + delay > timeout):
+            self._record(rejected=True)
+            raise RateLimitExceeded("Request rate limit reached", retry_after=delay)
+        return delay
+
+    def acquire(self, block: Optional[bool] = None, timeout: Optional[float] = None):
+        """Take one token, sleeping until it is available when blocking.
+
+        :param block: Override the limiter's ``block`` setting
+        :param timeout: Override the limiter's ``timeout`` setting
+        :raises RateLimitExceeded: when not blocking, on timeout, or when the
+            daily quota is used up
+        """
+        block = self.block if block is None else block
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        self._enter()
+        try:
+            while True:
+                delay = self._next_wait(started, block, timeout)
+                if not delay:
+                    return
+                time.sleep(delay)
+        finally:
+            self._leave()
+
+    async def acquire_async(
+        self, block: Optional[bool] = None, timeout: Optional[float] = None
+    ):
+        """Awaitable counterpart of :meth:`acquire`."""
+        block = self.block if block is None else block
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        loop = asyncio.get_running_loop()
+        self._enter()
+        try:
+            while True:
+                if self.path is None:
+                    delay = self._next_wait(started, block, timeout)
+                else:
+                    # flock waits for other processes; keep it off the event loop
+                    delay = await loop.run_in_executor(
+                        None, self._next_wait, started, block, timeout
+                    )
+                if not delay:
+                    return
+                await asyncio.sleep(delay)
+        finally:
+            self._leave()
+
+    def _enter(self):
+        with self._metrics_lock:
+            self.waiting += 1
+
+    def _leave(self):
+        with self._metrics_lock:
+            self.waiting -= 1
+
+    def _record(self, waited=0.0, rejected=False):
+        with self._metrics_lock:
+            if rejected:
+                self.rejected += 1
+                return
+            self.acquired += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+
+    def used_today(self) -> int:
+        """Requests counted against today's quota (across processes when file-backed)."""
+        today = float(time.time() // DAY)
+        with self._state.transaction() as state:
+            return int(state[3]) if state[2] == today else 0
+
+    def close(self) -> None:
+        """Close the bucket file, if any; it is reopened by the next request."""
+        if self.path is not None:
+            self._state.close()
+
+    def stats(self) -> dict:
+        """Return queue depth and wait-time metrics of this process."""
+        with self._metrics_lock:
+            return {
+                "waiting": self.waiting,
+                "acquired": self.acquired,
+                "rejected": self.rejected,
+                "total_wait": self.total_wait,
+                "max_wait": self.max_wait,
+                "mean_wait": self.total_wait / self.acquired if self.acquired else 0.0,
+            }
@@ -13,8 +13,7 @@ class RecipesMixin:
             "recipe_id": recipe_id,
         }
 
-        response = self.session.get(self.api_url, params=params)
-        return self.valid_response(response)
+        return self._request(params)
 
     def recipes_delete_favorite(self, recipe_id):
         """Delete a recipe to a user's favorite.
@@ -29,8 +28,7 @@ class RecipesMixin:
             "recipe_id": recipe_id,
         }
 
-        response = self.session.get(self.api_url, params=params)
-        return self.valid_response(response)
+        return self._request(params)
 
     def recipe_get(self, recipe_id):
         """Returns detailed information for the specified recipe.
@@ -41,16 +39,14 @@ class RecipesMixin:
 
         params = {"method": "recipe.get", "format": "json", "recipe_id": recipe_id}
 
-        response = self.session.get(self.api_url, params=params)
-        return self.valid_response(response)
+        return self._request(params)
 
     def recipes_get_favorites(self):
         """Returns the favorite recipes for the specified user."""
 
         params = {"method": "recipes.get_favorites", "format": "json"}
 
-        response = self.session.get(self.api_url, params=params)
-        return self.valid_response(response)
+        return self._request(params)
 
     def recipes_search(
         self, search_expression, recipe_type=None, page_number=None, max_results=None
@@ -71,6 +67,15 @@ class RecipesMixin:
         :type max_results: int
         """
 
+        params = self._recipes_search_params(
+            search_expression, recipe_type, page_number, max_results
+        )
+        return self._request(params)
+
+    @staticmethod
+    def _recipes_search_params(
+        search_expression, recipe_type=None, page_number=None, max_results=None
+    ):
         params = {
             "method": "recipes.search",
             "search_expression": search_expression,
@@ -79,17 +84,16 @@ class RecipesMixin:
 
         if recipe_type:
             params["recipe_type"] = recipe_type
-        if page_number and max_results:
+        if page_number is not None:
             params["page_number"] = page_number
+        if max_results is not None:
             params["max_results"] = max_results
 
-        response = self.session.get(self.api_url, params=params)
-        return self.valid_response(response)
+        return params
 
     def recipe_types_get(self):
         """This is a utility method, returning the full list of all supported recipe type names."""
 
         params = {"method": "recipe_types.get", "format": "json"}
 
-        response = self.session.get(self.api_url, params=params)
-        return self.valid_response(response)
+        return self._request(params)
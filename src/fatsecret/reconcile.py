@@ -0,0 +1,215 @@
+"""
+fatsecret.reconcile
+-------------------
+
+Bring a day of the food diary to a desired state with the fewest writes.
+
+:func:`plan_food_entries` compares the entries a day holds with the desired
+ones. Identical entries are left alone, an existing entry of the same food
+is edited into a desired one (``food_entry.edit`` can change the name,
+serving, number of units and meal but not the food), and only the rest is
+created or deleted. :meth:`ReconcileMixin.food_entries_reconcile` reads the
+day, plans and runs the operations concurrently.
+"""
+
+from typing import Iterable, List, NamedTuple, Optional
+import datetime
+
+from .bulk import BulkResult, fan_out
+
+#: Fields ``food_entry.edit`` can change, with its keyword for each.
+EDITABLE_FIELDS = (
+    ("food_entry_name", "entry_name"),
+    ("serving_id", "serving_id"),
+    ("number_of_units", "num_units"),
+    ("meal", "meal"),
+)
+
+#: Fields a desired entry needs when it has to be created.
+CREATE_FIELDS = ("food_id", "food_entry_name", "serving_id", "number_of_units", "meal")
+
+
+class Operation(NamedTuple):
+    """One write of a :class:`ReconcilePlan`.
+
+    ``action`` is ``"create"``, ``"edit"`` or ``"delete"``. ``desired`` is the
+    target entry (``None`` for deletes), ``current`` the existing one
+    (``None`` for creates) and ``changes`` the keyword arguments of
+    ``food_entry_edit``.
+    """
+
+    action: str
+    desired: Optional[dict] = None
+    current: Optional[dict] = None
+    changes: Optional[dict] = None
+
+
+class ReconcilePlan(NamedTuple):
+    """Operations turning the current entries of a day into the desired ones."""
+
+    creates: List[Operation]
+    edits: List[Operation]
+    deletes: List[Operation]
+    unchanged: List[dict]
+
+    @property
+    def operations(self) -> List[Operation]:
+        return self.deletes + self.edits + self.creates
+
+    def __bool__(self):
+        return bool(self.creates or self.edits or self.deletes)
+
+
+class ReconcileResult(NamedTuple):
+    """Plan and per-operation outcomes of a reconciliation.
+
+    ``results`` holds one :class:`~fatsecret.BulkResult` per operation of
+    ``plan.operations``, in the same order, with the operation as ``key``.
+    """
+
+    plan: ReconcilePlan
+    results: List[BulkResult]
+
+    @property
+    def ok(self) -> bool:
+        return all(result.ok for result in self.results)
+
+    @property
+    def failed(self) -> List[BulkResult]:
+        return [result for result in self.results if not result.ok]
+
+
+def _entry(entry) -> dict:
+    return entry.to_dict() if hasattr(entry, "to_dict") else entry
+
+
+def _value(entry: dict, field: str):
+    """Comparable form of an entry field; the API returns every value as text."""
+    value = entry.get(field)
+    if value is None or value == "":
+        return None
+    if field == "number_of_units":
+        return round(float(value), 6)
+    if field == "meal":
+        return str(value).lower()
+    return str(value)
+
+
+def _changes(current: dict, desired: dict) -> dict:
+    return {
+        keyword: desired[field]
+        for field, keyword in EDITABLE_FIELDS
+        if _value(desired, field) is not None
+        and _value(desired, field) != _value(current, field)
+    }
+
+
+def plan_food_entries(current: Iterable, desired: Iterable) -> ReconcilePlan:
+    """Return the minimal plan turning ``current`` entries into ``desired`` ones.
+
+    Desired entries need ``food_id``, ``food_entry_name``, ``serving_id``,
+    ``number_of_units`` and ``meal``, like the arguments of
+    :meth:`~fatsecret.Fatsecret.food_entry_create`; a desired entry without a
+    ``food_entry_name`` keeps the existing name when it is edited. Entries are
+    matched within the same food, exact matches first and then by the number
+    of fields that already agree.
+
+    :raises ValueError: if a desired entry that must be created lacks one of
+        :data:`CREATE_FIELDS`
+
+    :param current: Entries of the day from ``food_entries_get``
+    :type current: list
+    :param desired: Entries the day should hold
+    :type desired: list
+    """
+    remaining = [_entry(entry) for entry in current or []]
+    creates, edits, unchanged, pending = [], [], [], []
+
+    for wanted in (_entry(entry) for entry in desired):
+        for position, entry in enumerate(remaining):
+            if _value(entry, "food_id") == _value(wanted, "food_id") and not _changes(
+                entry, wanted
+            ):
+                unchanged.append(remaining.pop(position))
+                break
+        else:
+            pending.append(wanted)
+
+    for wanted in pending:
+        candidates = [
+            (len(_changes(entry, wanted)), position)
+            for position, entry in enumerate(remaining)
+            if _value(entry, "food_id") == _value(wanted, "food_id")
+        ]
+        if not candidates:
+            missing = [
+                field for field in CREATE_FIELDS if _value(wanted, field) is None
+            ]
+            if missing:
+                raise ValueError(
+                    f"Cannot create an entry of food {wanted.get('food_id')} "
+                    f"without {', '.join(missing)}"
+                )
+            creates.append(Operation("create", desired=wanted))
+            continue
+        _, position = min(candidates)
+        entry = remaining.pop(position)
+        edits.append(Operation("edit", wanted, entry, _changes(entry, wanted)))
+
+    deletes = [Operation("delete", current=entry) for entry in remaining]
+    return ReconcilePlan(creates, edits, deletes, unchanged)
+
+
+class ReconcileMixin:
+
+    def _apply(self, operation: Operation, date: datetime.datetime):
+        if operation.action == "delete":
+            return self.food_entry_delete(operation.current["food_entry_id"])
+        if operation.action == "edit":
+            return self.food_entry_edit(
+                operation.current["food_entry_id"], **operation.changes
+            )
+        entry = operation.desired
+        return self.food_entry_create(
+            entry["food_id"],
+            entry["food_entry_name"],
+            entry["serving_id"],
+            entry["number_of_units"],
+            entry["meal"],
+            date,
+        )
+
+    def food_entries_plan(self, date: datetime.datetime, desired) -> ReconcilePlan:
+        """Read a day's food entries and plan the writes reaching ``desired``.
+
+        :param date: Day to reconcile
+        :type date: datetime.datetime
+        :param desired: Entries the day should hold; see :func:`plan_food_entries`
+        :type desired: list
+        """
+        return plan_food_entries(self.food_entries_get(date=date), desired)
+
+    def food_entries_reconcile(
+        self, date: datetime.datetime, desired, max_concurrency: int = 4
+    ) -> ReconcileResult:
+        """Make a day's food diary hold exactly ``desired`` with the fewest writes.
+
+        The day is read with ``food_entries_get``, the plan of
+        :func:`plan_food_entries` is run concurrently, and every operation's
+        outcome is reported; a failed write does not stop the others.
+
+        :param date: Day to reconcile
+        :type date: datetime.datetime
+        :param desired: Entries the day should hold
+        :type desired: list
+        :param max_concurrency: Maximum number of writes in flight
+        :type max_concurrency: int
+        """
+        plan = self.food_entries_plan(date, desired)
+        results = fan_out(
+            lambda operation: self._apply(operation, date),
+            plan.operations,
+            max_concurrency=max_concurrency,
+            ordered=True,
+        )
+        return ReconcileResult(plan, list(results))
@@ -0,0 +1,181 @@
+"""
+fatsecret.responses
+-------------------
+
+Decoding of FatSecret JSON payloads into the values returned by the client.
+
+The body is parsed exactly once and the top-level keys are then dispatched
+through a table of extractors. ``orjson`` is used when it is installed.
+"""
+
+from typing import NamedTuple
+import json
+
+from .errors import ApplicationError, AuthenticationError, GeneralError, ParameterError
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+def loads(content):
+    """Parse a JSON document from ``bytes`` or ``str``.
+
+    :param content: Raw response body
+    :type content: bytes
+    """
+    if not content:
+        return None
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def dumps(value):
+    """Serialize a decoded value back to JSON ``bytes``.
+
+    :param value: Value returned by :func:`extract`
+    """
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+def raise_for_error(error):
+    """Raise the exception matching a FatSecret ``error`` object.
+
+    Unknown codes are ignored so that the remaining keys are still inspected.
+
+    :param error: The value of the ``error`` key of a response
+    :type error: dict
+    """
+    code = error["code"]
+    message = error["message"]
+    if code == 2:
+        raise AuthenticationError(2, "This api call requires an authenticated session")
+    elif code in (1, 10, 11, 12, 20, 21):
+        raise GeneralError(code, message)
+    elif 3 <= code <= 9:
+        raise AuthenticationError(code, message)
+    elif 101 <= code <= 108:
+        raise ParameterError(code, message)
+    elif 201 <= code <= 207:
+        raise ApplicationError(code, message)
+
+
+def _entry_list(name):
+    def extract(value):
+        if value is None:
+            return []
+        entries = value[name]
+        if isinstance(entries, dict):
+            return [entries]
+        elif isinstance(entries, list):
+            return entries
+
+    return extract
+
+
+def _profile(value):
+    if "auth_token" in value:
+        return value["auth_token"], value["auth_secret"]
+    return value
+
+
+def _identity(value):
+    return value
+
+
+def _child(name):
+    # Containers without results, such as a month with no diary entries,
+    # omit the child key altogether.
+    def extract(value):
+        return value.get(name)
+
+    return extract
+
+
+EXTRACTORS = {
+    "success": lambda value: True,
+    "foods": _child("food"),
+    "suggestions": _identity,
+    "recipes": _child("recipe"),
+    "saved_meals": _child("saved_meal"),
+    "saved_meal_items": _child("saved_meal_item"),
+    "exercise_types": _child("exercise"),
+    "food_entries": _entry_list("food_entry"),
+    "exercise_entries": _entry_list("exercise_entry"),
+    "month": _child("day"),
+    "profile": _profile,
+    "food": _identity,
+    "recipe": _identity,
+    "recipe_types": _identity,
+    "saved_meal_id": _identity,
+    "saved_meal_item_id": _identity,
+    "food_entry_id": _identity,
+    "food_id": _child("value"),
+}
+
+
+class SearchPage(NamedTuple):
+    """One page of ``foods.search`` or ``recipes.search`` results with its totals."""
+
+    items: list
+    total_results: int
+    max_results: int
+    page_number: int
+
+
+_SEARCH_CONTAINERS = (("foods", "food"), ("recipes", "recipe"))
+
+
+def extract_page(data):
+    """Return a :class:`SearchPage` for a decoded search payload or raise its API error.
+
+    Unlike :func:`extract`, the paging totals are kept, a single result is
+    wrapped in a list and an empty page yields no items.
+
+    :param data: Decoded JSON document
+    :type data: dict
+    """
+    if not data:
+        return SearchPage([], 0, 0, 0)
+
+    error = data.get("error")
+    if error is not None:
+        raise_for_error(error)
+
+    for key, item_key in _SEARCH_CONTAINERS:
+        container = data.get(key)
+        if container is None:
+            continue
+        items = container.get(item_key, [])
+        if isinstance(items, dict):
+            items = [items]
+        return SearchPage(
+            items,
+            int(container.get("total_results") or 0),
+            int(container.get("max_results") or 0),
+            int(container.get("page_number") or 0),
+        )
+    return SearchPage([], 0, 0, 0)
+
+
+def extract(data):
+    """Return the useful part of a decoded payload or raise its API error.
+
+    :param data: Decoded JSON document
+    :type data: dict
+    """
+    if not data:
+        return None
+
+    error = data.get("error")
+    if error is not None:
+        raise_for_error(error)
+
+    for key, value in data.items():
+        extractor = EXTRACTORS.get(key)
+        if extractor is not None:
+            return extractor(value)
@@ -0,0 +1,194 @@
+"""
+fatsecret.retry
+---------------
+
+Retrying of failed API calls with decorrelated-jitter backoff.
+
+Failures are sorted into three groups:
+
+* *not processed* - the API or the client refused the request before acting
+  on it (rate limiting, stale timestamp or nonce, connection never opened).
+  Retrying is always safe.
+* *transient* - the outcome is unknown (timeouts, dropped connections,
+  server errors, API error 1). Only read methods are retried by default.
+* anything else is fatal and raised immediately.
+"""
+
+from typing import Optional
+import asyncio
+import random
+import sys
+import time
+
+import requests
+
+from .errors import BaseFatsecretError, RateLimitExceeded
+
+#: API methods that change user data. Every other method is treated as a read.
+WRITE_METHODS = frozenset(
+    {
+        "exercise_entries.commit_day",
+        "exercise_entries.save_template",
+        "exercise_entry.edit",
+        "food.add_favorite",
+        "food.delete_favorite",
+        "food_entries.copy",
+        "food_entries.copy_saved_meal",
+        "food_entry.create",
+        "food_entry.delete",
+        "food_entry.edit",
+        "profile.create",
+        "recipes.add_favorites",
+        "recipes.delete_favorites",
+        "saved_meal.create",
+        "saved_meal.delete",
+        "saved_meal.edit",
+        "saved_meal_item.add",
+        "saved_meal_item.delete",
+        "saved_meal_item.edit",
+        "weight.update",
+    }
+)
+
+#: API error codes returned for requests the API rejected without processing:
+#: invalid timestamp, invalid nonce and too many actions.
+NOT_PROCESSED_CODES = frozenset({6, 7, 12})
+
+#: API error codes that may succeed when tried again.
+TRANSIENT_CODES = frozenset({1})
+
+NOT_PROCESSED = "not_processed"
+TRANSIENT = "transient"
+
+
+def classify(error: BaseException) -> Optional[str]:
+    """Return :data:`NOT_PROCESSED`, :data:`TRANSIENT` or ``None`` for a fatal error."""
+    if isinstance(error, RateLimitExceeded):
+        return NOT_PROCESSED if error.retry_after is not None else None
+    if isinstance(error, BaseFatsecretError):
+        if error.code in NOT_PROCESSED_CODES:
+            return NOT_PROCESSED
+        if error.code in TRANSIENT_CODES:
+            return TRANSIENT
+        return None
+    if isinstance(error, requests.ConnectTimeout):
+        return NOT_PROCESSED
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return TRANSIENT
+    if isinstance(error, requests.HTTPError):
+        response = error.response
+        return (
+            TRANSIENT if response is not None and response.status_code >= 500 else None
+        )
+    # An aiohttp error can only exist once aiohttp is imported.
+    aiohttp = sys.modules.get("aiohttp")
+    if aiohttp is not None:
+        if isinstance(error, aiohttp.ClientConnectorError):
+            return NOT_PROCESSED
+        if isinstance(error, aiohttp.ClientResponseError):
+            return TRANSIENT if error.status >= 500 else None
+        if isinstance(error, aiohttp.ClientError):
+            return TRANSIENT
+    if isinstance(error, asyncio.TimeoutError):
+        return TRANSIENT
+    return None
+
+
+class RetryPolicy:
+    """Decides whether and when a failed call is attempted again.
+
+    Pass an instance as the ``retry`` argument of :class:`~fatsecret.Fatsecret`.
+
+    :param max_attempts: Total attempts per call, including the first
+    :type max_attempts: int
+    :param base_delay: Smallest backoff delay in seconds
+    :type base_delay: float
+    :param max_delay: Largest backoff delay in seconds
+    :type max_delay: float
+    :param deadline: Seconds a call may take across all attempts; also bounds
+        the timeout of each attempt
+    :type deadline: float
+    :param retry_writes: Retry write methods after transient failures too,
+        accepting that the write may be applied twice
+    :type retry_writes: bool
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        base_delay: float = 0.1,
+        max_delay: float = 10.0,
+        deadline: Optional[float] = None,
+        retry_writes: bool = False,
+    ):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.retry_writes = retry_writes
+        self.retries = 0
+
+    def should_retry(self, method: str, error: BaseException) -> bool:
+        """Whether ``error`` raised by API ``method`` may be retried."""
+        kind = classify(error)
+        if kind == NOT_PROCESSED:
+            return True
+        if kind == TRANSIENT:
+            return self.retry_writes or method not in WRITE_METHODS
+        return False
+
+    def backoff(self, previous: float) -> float:
+        """Next decorrelated-jitter delay after sleeping ``previous`` seconds."""
+        return min(self.max_delay, random.uniform(self.base_delay, previous * 3))
+
+    def _next_delay(self, method, error, attempt, delay, started):
+        """Return the delay before the next attempt or re-raise ``error``."""
+        if attempt >= self.max_attempts or not self.should_retry(method, error):
+            raise error
+        delay = self.backoff(delay)
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        if self.deadline is not None:
+            if time.monotonic() - started + delay >= self.deadline:
+                raise error
+        self.retries += 1
+        return delay
+
+    def _timeout(self, started, default):
+        if self.deadline is None:
+            return default
+        return max(0.001, min(default, self.deadline - (time.monotonic() - started)))
+
+    def call(self, method: str, send, default_timeout: float):
+        """Run ``send(timeout)`` until it succeeds or may not be retried.
+
+        :param method: API method name, used to tell reads from writes
+        :param send: Callable performing one attempt with the given timeout
+        :param default_timeout: Per-attempt timeout when no deadline applies
+        """
+        started = time.monotonic()
+        delay = self.base_delay
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return send(self._timeout(started, default_timeout))
+            except Exception as error:
+                delay = self._next_delay(method, error, attempt, delay, started)
+            time.sleep(delay)
+
+    async def call_async(self, method: str, send, default_timeout: float):
+        """Awaitable counterpart of :meth:`call` for a coroutine function ``send``."""
+        started = time.monotonic()
+        delay = self.base_delay
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return await send(self._timeout(started, default_timeout))
+            except Exception as error:
+                delay = self._next_delay(method, error, attempt, delay, started)
+            await asyncio.sleep(delay)
@@ -0,0 +1,304 @@
+"""
+fatsecret.search
+----------------
+
+Local full-text search over the foods the API has returned.
+
+A :class:`FoodSearchIndex` is an inverted index of the ``food_name`` and
+``brand_name`` tokens of every food it is given, ranked with BM25 and
+filtered by the region and language the food was seen in. A
+:class:`LocalSearch` feeds it from ``foods_search`` and ``food_get``
+results and answers ``foods_search`` locally when it has enough fresh
+matches, falling back to the API otherwise.
+"""
+
+from typing import Dict, Iterable, List, NamedTuple, Optional
+import math
+import re
+import threading
+import time
+import unicodedata
+
+from .models import _listed
+
+_TOKEN = re.compile(r"\w+")
+
+#: Fields of a food that are tokenized.
+INDEXED_FIELDS = ("food_name", "brand_name")
+
+#: Default page size of ``foods.search``.
+DEFAULT_MAX_RESULTS = 20
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split ``text`` into case-folded tokens without accents."""
+    if not text:
+        return []
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _TOKEN.findall(stripped)
+
+
+class SearchHit(NamedTuple):
+    """A ranked food returned by :meth:`FoodSearchIndex.search`."""
+
+    food: dict
+    score: float
+    updated: float
+
+
+class _Document:
+    __slots__ = ("food", "length", "locales", "terms", "updated")
+
+    def __init__(self, food, terms, locales, updated):
+        self.food = food
+        self.terms = terms
+        self.length = sum(terms.values())
+        self.locales = locales
+        self.updated = updated
+
+
+class FoodSearchIndex:
+    """Inverted index of foods ranked with BM25.
+
+    :param k1: BM25 term frequency saturation
+    :type k1: float
+    :param b: BM25 document length normalization
+    :type b: float
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._documents: Dict[str, _Document] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._documents)
+
+    def __contains__(self, food_id) -> bool:
+        return str(food_id) in self._documents
+
+    def add(
+        self,
+        food: dict,
+        region: Optional[str] = None,
+        language: Optional[str] = None,
+        now: Optional[float] = None,
+    ) -> None:
+        """Index or refresh a food from ``foods_search``, ``food_get`` or ``food_get_v2``.
+
+        Servings are not kept. Fields of an already indexed food are updated
+        and the locale is added to those it was seen in.
+        """
+        food_id = str(food["food_id"])
+        now = time.time() if now is None else now
+        fields = {key: value for key, value in food.items() if key != "servings"}
+        with self._lock:
+            previous = self._documents.pop(food_id, None)
+            locales = {(region, language)}
+            if previous is not None:
+                self._unpost(food_id, previous)
+                fields = dict(previous.food, **fields)
+                locales |= previous.locales
+
+            terms = {}
+            for field in INDEXED_FIELDS:
+                for token in tokenize(fields.get(field)):
+                    terms[token] = terms.get(token, 0) + 1
+            document = _Document(fields, terms, locales, now)
+            self._documents[food_id] = document
+            for term, count in terms.items():
+                self._postings.setdefault(term, {})[food_id] = count
+            self._total_length += document.length
+
+    def update(self, foods: Iterable[dict], region=None, language=None) -> None:
+        for food in foods:
+            self.add(food, region, language)
+
+    def _unpost(self, food_id, document):
+        for term in document.terms:
+            postings = self._postings[term]
+            del postings[food_id]
+            if not postings:
+                del self._postings[term]
+        self._total_length -= document.length
+
+    def remove(self, food_id) -> None:
+        with self._lock:
+            document = self._documents.pop(str(food_id), None)
+            if document is not None:
+                self._unpost(str(food_id), document)
+
+    def search(
+        self,
+        expression: str,
+        region: Optional[str] = None,
+        language: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[SearchHit]:
+        """Return the foods holding every token of ``expression``, best first.
+
+        Only foods seen in the given region and language are considered.
+
+        :param limit: Maximum number of hits (default all)
+        :type limit: int
+        """
+        terms = list(dict.fromkeys(tokenize(expression)))
+        if not terms:
+            return []
+        locale = (region, language)
+        with self._lock:
+            postings = [self._postings.get(term) for term in terms]
+            if not all(postings):
+                return []
+            postings.sort(key=len)
+            candidates = [
+                food_id
+                for food_id in postings[0]
+                if locale in self._documents[food_id].locales
+                and all(food_id in other for other in postings[1:])
+            ]
+            count = len(self._documents)
+            average = self._total_length / count
+            weights = [
+                math.log(1 + (count - len(p) + 0.5) / (len(p) + 0.5)) for p in postings
+            ]
+            hits = []
+            for food_id in candidates:
+                document = self._documents[food_id]
+                norm = self.k1 * (1 - self.b + self.b * document.length / average)
+                score = 0.0
+                for weight, term_postings in zip(weights, postings):
+                    frequency = term_postings[food_id]
+                    score += weight * frequency * (self.k1 + 1) / (frequency + norm)
+                hits.append(SearchHit(dict(document.food), score, document.updated))
+        hits.sort(key=lambda hit: (-hit.score, hit.food.get("food_name") or ""))
+        return hits if limit is None else hits[:limit]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._documents.clear()
+            self._postings.clear()
+            self._total_length = 0
+
+
+class LocalSearch:
+    """``foods_search`` answered from a :class:`FoodSearchIndex` when possible.
+
+    Every food returned through :meth:`foods_search`, :meth:`food_get` and
+    :meth:`food_get_v2` is indexed. A search is answered locally when the
+    index holds at least ``min_results`` matches for it and every food on the
+    requested page was refreshed within ``max_age`` seconds.
+
+    :param client: Client used for searches the index cannot answer
+    :type client: ~fatsecret.Fatsecret
+    :param index: Search index, shareable between clients
+    :type index: FoodSearchIndex
+    :param min_results: Matches required to answer locally
+    :type min_results: int
+    :param max_age: Maximum age in seconds of foods served locally
+    :type max_age: float
+    """
+
+    def __init__(
+        self,
+        client,
+        index: Optional[FoodSearchIndex] = None,
+        min_results: int = DEFAULT_MAX_RESULTS,
+        max_age: float = 7 * 24 * 3600,
+    ):
+        self.client = client
+        self.index = index if index is not None else FoodSearchIndex()
+        self.min_results = min_results
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+
+    def _local(self, search_expression, page_number, max_results, region, language):
+        """Return the page of local results, or ``None`` if the API must answer."""
+        matches = self.index.search(search_expression, region, language)
+        if len(matches) < self.min_results:
+            return None
+        offset = (page_number or 0) * (max_results or DEFAULT_MAX_RESULTS)
+        page = matches[offset : offset + (max_results or DEFAULT_MAX_RESULTS)]
+        oldest = time.time() - self.max_age
+        if not page or any(hit.updated < oldest for hit in page):
+            return None
+        return [hit.food for hit in page]
+
+    def foods_search(
+        self,
+        search_expression,
+        page_number=None,
+        max_results=None,
+        region=None,
+        language=None,
+    ):
+        """Search locally or through :meth:`Fatsecret.foods_search`.
+
+        Local answers are lists of food dicts like the client's results.
+        """
+        foods = self._local(
+            search_expression, page_number, max_results, region, language
+        )
+        if foods is not None:
+            self.hits += 1
+            return foods
+        self.misses += 1
+        result = self.client.foods_search(
+            search_expression, page_number, max_results, region, language
+        )
+        self.index.update(_listed(result), region, language)
+        return result
+
+    def food_get(self, food_id):
+        food = self.client.food_get(food_id)
+        if food:
+            self.index.add(food)
+        return food
+
+    def food_get_v2(self, food_id, region=None, language=None):
+        food = self.client.food_get_v2(food_id, region, language)
+        if food:
+            self.index.add(food, region, language)
+        return food
+
+
+class AsyncLocalSearch(LocalSearch):
+    """:class:`LocalSearch` over :class:`~fatsecret.AsyncFatsecret`."""
+
+    async def foods_search(
+        self,
+        search_expression,
+        page_number=None,
+        max_results=None,
+        region=None,
+        language=None,
+    ):
+        foods = self._local(
+            search_expression, page_number, max_results, region, language
+        )
+        if foods is not None:
+            self.hits += 1
+            return foods
+        self.misses += 1
+        result = await self.client.foods_search(
+            search_expression, page_number, max_results, region, language
+        )
+        self.index.update(_listed(result), region, language)
+        return result
+
+    async def food_get(self, food_id):
+        food = await self.client.food_get(food_id)
+        if food:
+            self.index.add(food)
+        return food
+
+    async def food_get_v2(self, food_id, region=None, language=None):
+        food = await self.client.food_get_v2(food_id, region, language)
+        if food:
+            self.index.add(food, region, language)
+        return food
@@ -0,0 +1,142 @@
+"""
+fatsecret.signing
+-----------------
+
+HMAC-SHA1 request signing as specified by OAuth 1.0 (RFC 5849).
+
+The signing key is percent-encoded and loaded into an HMAC object once per
+credential set; each request only copies that object. The encoded
+``METHOD&url&`` prefix of the signature base string is cached per endpoint,
+parameter names and values are percent-encoded through a small LRU, and the
+second encoding of the normalized parameter string is a few ``str.replace``
+calls instead of a per-character ``quote``.
+"""
+
+from functools import lru_cache
+from typing import Optional
+from urllib.parse import quote, urlsplit, urlunsplit
+import base64
+import hashlib
+import hmac
+import time
+import uuid
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+@lru_cache(maxsize=4096)
+def percent_encode(value: str) -> str:
+    """Percent-encode a string per RFC 5849 section 3.6."""
+    return quote(value, safe="~")
+
+
+def token_key(token: str) -> str:
+    """Return an opaque key for the user of ``token``, safe to store in place of it."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def normalize_url(url: str) -> str:
+    """Return the base string URI of ``url`` (RFC 5849 section 3.4.1.2)."""
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = parts.hostname.lower() if parts.hostname else ""
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    return urlunsplit((scheme, host, parts.path or "/", "", ""))
+
+
+class OAuth1Signer:
+    """Signs requests for one consumer and optional token credential pair.
+
+    :param consumer_key: API consumer key
+    :type consumer_key: str
+    :param consumer_secret: API consumer secret
+    :type consumer_secret: str
+    :param token: Access or request token
+    :type token: str
+    :param token_secret: Secret belonging to ``token``
+    :type token_secret: str
+    :param version: Value sent as ``oauth_version``; ``None`` omits it
+    :type version: str
+    """
+
+    SIGNATURE_METHOD = "HMAC-SHA1"
+
+    def __init__(
+        self,
+        consumer_key: str,
+        consumer_secret: str,
+        token: Optional[str] = None,
+        token_secret: Optional[str] = None,
+        version: Optional[str] = "1.0",
+    ):
+        self.consumer_key = consumer_key
+        self.token = token
+        self.version = version
+        key = f"{percent_encode(consumer_secret)}&{percent_encode(token_secret or '')}"
+        self._hmac = hmac.new(key.encode("utf-8"), digestmod=hashlib.sha1)
+        self._prefixes = {}
+
+    def _prefix(self, method: str, url: str) -> bytes:
+        cache_key = (method, url)
+        prefix = self._prefixes.get(cache_key)
+        if prefix is None:
+            prefix = f"{method.upper()}&{percent_encode(normalize_url(url))}&"
+            prefix = self._prefixes[cache_key] = prefix.encode("ascii")
+        return prefix
+
+    def base_string(self, method: str, url: str, params) -> bytes:
+        """Return the signature base string (RFC 5849 section 3.4.1).
+
+        :param params: Request and ``oauth_`` parameters as a dict or a list of pairs
+        """
+        items = params.items() if isinstance(params, dict) else params
+        encoded = sorted(
+            (percent_encode(str(k)), percent_encode(str(v))) for k, v in items
+        )
+        normalized = "&".join([f"{k}={v}" for k, v in encoded])
+        # Every pair is already percent-encoded, so encoding the joined string
+        # again only has to escape the "%", "=" and "&" characters.
+        normalized = (
+            normalized.replace("%", "%25").replace("=", "%3D").replace("&", "%26")
+        )
+        return self._prefix(method, url) + normalized.encode("ascii")
+
+    def signature(self, method: str, url: str, params) -> str:
+        """Return the base64 HMAC-SHA1 signature for a request."""
+        mac = self._hmac.copy()
+        mac.update(self.base_string(method, url, params))
+        return base64.b64encode(mac.digest()).decode("ascii")
+
+    def oauth_params(self, nonce=None, timestamp=None) -> dict:
+        """Return the protocol parameters for a new request, without signature."""
+        params = {
+            "oauth_consumer_key": self.consumer_key,
+            "oauth_nonce": nonce or uuid.uuid4().hex,
+            "oauth_signature_method": self.SIGNATURE_METHOD,
+            "oauth_timestamp": str(timestamp or int(time.time())),
+        }
+        if self.token is not None:
+            params["oauth_token"] = self.token
+        if self.version is not None:
+            params["oauth_version"] = self.version
+        return params
+
+    def sign(self, method: str, url: str, params: dict, nonce=None, timestamp=None):
+        """Return a copy of ``params`` with the OAuth parameters and signature added.
+
+        All values of the returned dict are strings, exactly as they were signed.
+        Parameters whose value is ``None`` are left out, as ``requests`` would
+        not send them.
+
+        :param method: HTTP method
+        :type method: str
+        :param url: Request URL without query string
+        :type url: str
+        :param params: Query or form parameters of the request
+        :type params: dict
+        """
+        signed = {k: str(v) for k, v in params.items() if v is not None}
+        signed.update(self.oauth_params(nonce, timestamp))
+        signed["oauth_signature"] = self.signature(method, url, signed)
+        return signed
@@ -0,0 +1,241 @@
+"""
+fatsecret.similar
+-----------------
+
+Local nearest-neighbour index of foods by nutrient profile.
+
+Each food added to a :class:`SimilarFoods` index is reduced to its nutrients
+per 100 g (or 100 ml) taken from a metric serving, and every nutrient is
+divided by a reference daily amount so that grams of protein and milligrams
+of sodium weigh comparably. Queries are answered by Euclidean distance over
+the whole matrix at once, batched for several foods, so substitutes are
+found without any API call. Requires NumPy (the ``nutrition`` extra).
+"""
+
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Union
+import os
+import threading
+
+from .models import NUTRIENTS, Food
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - optional dependency
+    numpy = None
+
+#: Reference daily amounts (in the API's units) that nutrients are divided by.
+REFERENCE_AMOUNTS = {
+    "calories": 2000.0,
+    "carbohydrate": 275.0,
+    "protein": 50.0,
+    "fat": 78.0,
+    "saturated_fat": 20.0,
+    "polyunsaturated_fat": 22.0,
+    "monounsaturated_fat": 44.0,
+    "trans_fat": 2.0,
+    "cholesterol": 300.0,
+    "sodium": 2300.0,
+    "potassium": 4700.0,
+    "fiber": 28.0,
+    "sugar": 50.0,
+    "added_sugars": 50.0,
+    "vitamin_a": 900.0,
+    "vitamin_c": 90.0,
+    "vitamin_d": 20.0,
+    "calcium": 1300.0,
+    "iron": 18.0,
+}
+
+METRIC_UNITS = ("g", "ml")
+
+if numpy is not None:
+    _SCALE = numpy.array([REFERENCE_AMOUNTS[name] for name in NUTRIENTS])
+
+#: Queries compared with the matrix at once; bounds the distance buffer.
+QUERY_BLOCK = 256
+
+
+class Neighbour(NamedTuple):
+    """A food returned by :meth:`SimilarFoods.nearest`."""
+
+    food_id: int
+    food_name: Optional[str]
+    distance: float
+
+
+def profile(food) -> Optional["numpy.ndarray"]:
+    """Return the scaled per-100 g nutrient vector of a food, or ``None``.
+
+    :param food: ``food_get_v2`` result or :class:`~fatsecret.Food`
+    :returns: ``None`` when no serving has a metric amount
+    """
+    if not isinstance(food, Food):
+        food = Food.from_dict(food)
+    for serving in food.servings:
+        amount = serving.metric_serving_amount
+        if amount and serving.metric_serving_unit in METRIC_UNITS:
+            values = numpy.nan_to_num(
+                numpy.frombuffer(serving._nutrients, dtype=numpy.float64)
+            )
+            return (values * (100.0 / amount) / _SCALE).astype(numpy.float32)
+    return None
+
+
+class SimilarFoods:
+    """Incremental nearest-neighbour index of foods over nutrient vectors.
+
+    :param capacity: Initial number of foods; the matrix grows as needed
+    :type capacity: int
+    """
+
+    def __init__(self, capacity: int = 1024):
+        if numpy is None:
+            raise ImportError(
+                "SimilarFoods requires numpy; install the 'nutrition' extra"
+            )
+        capacity = max(capacity, 1)
+        self._vectors = numpy.zeros((capacity, len(NUTRIENTS)), dtype=numpy.float32)
+        self._norms = numpy.zeros(capacity, dtype=numpy.float32)
+        self._ids = numpy.zeros(capacity, dtype=numpy.int64)
+        self._names = []
+        self._rows = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, food_id) -> bool:
+        return int(food_id) in self._rows
+
+    def _grow(self):
+        size = len(self._ids)
+        self._vectors = numpy.concatenate(
+            [self._vectors, numpy.zeros_like(self._vectors)]
+        )
+        self._norms = numpy.concatenate([self._norms, numpy.zeros(size, numpy.float32)])
+        self._ids = numpy.concatenate([self._ids, numpy.zeros(size, numpy.int64)])
+
+    def add(self, food) -> bool:
+        """Insert or replace a food; return ``False`` if it has no metric serving.
+
+        :param food: ``food_get_v2`` result or :class:`~fatsecret.Food`
+        """
+        if not isinstance(food, Food):
+            food = Food.from_dict(food)
+        vector = profile(food)
+        if vector is None or food.food_id is None:
+            return False
+        with self._lock:
+            row = self._rows.get(food.food_id)
+            if row is None:
+                row = len(self._rows)
+                if row == len(self._ids):
+                    self._grow()
+                self._rows[food.food_id] = row
+                self._names.append(food.food_name)
+            else:
+                self._names[row] = food.food_name
+            self._vectors[row] = vector
+            self._norms[row] = vector @ vector
+            self._ids[row] = food.food_id
+        return True
+
+    def update(self, foods: Iterable) -> int:
+        """Add several foods and return how many were indexed."""
+        return sum(self.add(food) for food in foods)
+
+    def _query(self, food):
+        if isinstance(food, (int, str)):
+            row = self._rows.get(int(food))
+            if row is None:
+                raise KeyError(f"Food {food} is not in the index")
+            return self._vectors[row], int(food)
+        vector = profile(food)
+        if vector is None:
+            raise ValueError("The food has no serving with a metric amount")
+        food_id = food.food_id if isinstance(food, Food) else food.get("food_id")
+        return vector, None if food_id is None else int(food_id)
+
+    def nearest(self, food, k: int = 10) -> List[Neighbour]:
+        """Return the ``k`` foods closest to ``food``, nearest first.
+
+        :param food: Indexed food ID, ``food_get_v2`` result or :class:`~fatsecret.Food`;
+            the food itself is never returned
+        :type food: int
+        :param k: Number of neighbours
+        :type k: int
+        """
+        return self.nearest_many([food], k)[0]
+
+    def nearest_many(
+        self, foods: Sequence[Union[int, str, dict, Food]], k: int = 10
+    ) -> List[List[Neighbour]]:
+        """Batched :meth:`nearest`: one list of neighbours per food."""
+        queries = [self._query(food) for food in foods]
+        with self._lock:
+            count = len(self._rows)
+            vectors, norms = self._vectors[:count], self._norms[:count]
+            ids, names = self._ids[:count], list(self._names)
+            excluded = [self._rows.get(food_id) for _, food_id in queries]
+        results = []
+        for start in range(0, len(queries), QUERY_BLOCK):
+            block = queries[start : start + QUERY_BLOCK]
+            matrix = numpy.stack([vector for vector, _ in block])
+            distances = (
+                norms[None, :]
+                - 2 * matrix @ vectors.T
+                + numpy.einsum("ij,ij->i", matrix, matrix)[:, None]
+            )
+            for exclude, row in zip(excluded[start:], distances):
+                results.append(self._top(row, k, exclude, ids, names))
+        return results
+
+    @staticmethod
+    def _top(distances, k, exclude, ids, names):
+        if exclude is not None:
+            distances[exclude] = numpy.inf
+        limit = min(k, len(distances) - (exclude is not None))
+        if limit <= 0:
+            return []
+        best = numpy.argpartition(distances, limit - 1)[:limit]
+        best = best[numpy.argsort(distances[best], kind="stable")]
+        return [
+            Neighbour(
+                int(ids[row]), names[row], float(numpy.sqrt(max(distances[row], 0)))
+            )
+            for row in best
+        ]
+
+    def save(self, path: str) -> None:
+        """Write the index to ``path`` (a ``.npz`` file) atomically."""
+        with self._lock:
+            count = len(self._rows)
+            arrays = {
+                "ids": self._ids[:count],
+                "vectors": self._vectors[:count],
+                "names": numpy.array(
+                    ["" if name is None else name for name in self._names], dtype=str
+                ),
+                "named": numpy.array([name is not None for name in self._names]),
+            }
+            temporary = f"{path}.tmp"
+            with open(temporary, "wb") as handle:
+                numpy.savez(handle, **arrays)
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: str) -> "SimilarFoods":
+        """Read an index written by :meth:`save`; more foods can then be added."""
+        with numpy.load(path) as data:
+            ids, vectors = data["ids"], data["vectors"]
+            names, named = data["names"].tolist(), data["named"].tolist()
+        index = cls(capacity=len(ids))
+        count = len(ids)
+        index._ids[:count] = ids
+        index._vectors[:count] = vectors
+        index._norms[:count] = numpy.einsum("ij,ij->i", vectors, vectors)
+        index._names = [name if flag else None for name, flag in zip(names, named)]
+        index._rows = {int(food_id): row for row, food_id in enumerate(ids.tolist())}
+        return index
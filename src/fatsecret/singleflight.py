@@ -0,0 +1,87 @@
+"""
+fatsecret.singleflight
+----------------------
+
+Coalescing of identical in-flight read requests.
+
+While a request is on the wire, further callers asking for exactly the same
+thing wait for it and receive the same parsed result instead of sending a
+request of their own. Callers therefore must not mutate the returned objects.
+"""
+
+from concurrent.futures import Future
+import asyncio
+import threading
+
+
+def request_key(client, params: dict, extractor) -> tuple:
+    """Identify a request by endpoint, access token, extractor and parameters."""
+    items = tuple(sorted((k, str(v)) for k, v in params.items()))
+    return (client.api_url, client.signer.token, extractor, items)
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time across threads.
+
+    :attr:`collapsed` counts the callers that were served by another caller's
+    request.
+    """
+
+    def __init__(self):
+        self.collapsed = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._calls)
+
+    def do(self, key, func, *args):
+        """Return ``func(*args)``, sharing the call with concurrent callers of ``key``."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+            else:
+                self.collapsed += 1
+        if not leader:
+            return future.result()
+
+        try:
+            value = func(*args)
+        except BaseException as error:
+            self._finish(key)
+            future.set_exception(error)
+            raise
+        self._finish(key)
+        future.set_result(value)
+        return value
+
+    def _finish(self, key):
+        with self._lock:
+            del self._calls[key]
+
+
+class AsyncSingleFlight:
+    """asyncio counterpart of :class:`SingleFlight` for one event loop.
+
+    The shared request runs as its own task, so a cancelled caller does not
+    cancel it for the others.
+    """
+
+    def __init__(self):
+        self.collapsed = 0
+        self._calls = {}
+
+    def __len__(self):
+        return len(self._calls)
+
+    async def do(self, key, func, *args):
+        """Await ``func(*args)``, sharing the call with concurrent callers of ``key``."""
+        task = self._calls.get(key)
+        if task is not None:
+            self.collapsed += 1
+        else:
+            task = self._calls[key] = asyncio.ensure_future(func(*args))
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        return await asyncio.shield(task)
@@ -0,0 +1,319 @@
+"""
+fatsecret.sync
+--------------
+
+Incremental mirroring of users' diaries into a local SQLite database.
+
+Each sync reads the monthly summaries (``food_entries.get_month``,
+``exercise_entries.get_month`` and ``weights.get_month``) and compares every
+day's totals with those stored by the previous sync. Only days whose totals
+changed are fetched again; days that vanished from a summary are deleted.
+Weights are fully described by their monthly summary and need no further
+requests. Every completed month advances a per-user checkpoint, so an
+interrupted sync resumes where it stopped.
+"""
+
+from typing import Iterator, List, NamedTuple, Optional, Union
+import datetime
+import json
+import sqlite3
+import threading
+import time
+
+from .signing import token_key
+
+EPOCH = datetime.date(1970, 1, 1)
+
+DateLike = Union[datetime.date, datetime.datetime]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS day_summaries (
+    user TEXT NOT NULL, kind TEXT NOT NULL, date_int INTEGER NOT NULL,
+    summary TEXT NOT NULL, PRIMARY KEY (user, kind, date_int));
+CREATE TABLE IF NOT EXISTS food_entries (
+    user TEXT NOT NULL, date_int INTEGER NOT NULL, food_entry_id TEXT NOT NULL,
+    data TEXT NOT NULL, PRIMARY KEY (user, food_entry_id));
+CREATE INDEX IF NOT EXISTS food_entries_day ON food_entries (user, date_int);
+CREATE TABLE IF NOT EXISTS exercise_entries (
+    user TEXT NOT NULL, date_int INTEGER NOT NULL, position INTEGER NOT NULL,
+    data TEXT NOT NULL, PRIMARY KEY (user, date_int, position));
+CREATE TABLE IF NOT EXISTS weights (
+    user TEXT NOT NULL, date_int INTEGER NOT NULL, weight_kg REAL,
+    comment TEXT, PRIMARY KEY (user, date_int));
+CREATE TABLE IF NOT EXISTS checkpoints (
+    user TEXT PRIMARY KEY, synced_through INTEGER NOT NULL, updated REAL NOT NULL);
+"""
+
+
+def date_int(day: datetime.date) -> int:
+    """Days since the Epoch, the ``date_int`` used by the API."""
+    return (day - EPOCH).days
+
+
+def _as_date(value: DateLike) -> datetime.date:
+    return value.date() if isinstance(value, datetime.datetime) else value
+
+
+def from_date_int(value) -> datetime.date:
+    """Inverse of :func:`date_int`."""
+    return EPOCH + datetime.timedelta(days=int(value))
+
+
+def months(start: datetime.date, end: datetime.date) -> Iterator[datetime.date]:
+    """Yield the first day of every month from ``start`` to ``end`` inclusive."""
+    month = start.replace(day=1)
+    while month <= end:
+        yield month
+        month = (month + datetime.timedelta(days=32)).replace(day=1)
+
+
+def months_end(month: datetime.date) -> datetime.date:
+    """Last day of the month containing ``month``."""
+    following = (month.replace(day=1) + datetime.timedelta(days=32)).replace(day=1)
+    return following - datetime.timedelta(days=1)
+
+
+def month_days(value) -> List[dict]:
+    """Return the ``day`` list of a monthly summary, which the API may give as one dict."""
+    if not value:
+        return []
+    if isinstance(value, dict):
+        return [value]
+    return list(value)
+
+
+class SyncResult(NamedTuple):
+    """Work done by :meth:`DiarySync.sync`."""
+
+    months: int
+    days_fetched: int
+    days_deleted: int
+
+
+class _DayChanges(NamedTuple):
+    kind: str
+    summaries: dict
+    changed: list
+    removed: list
+
+
+def _canonical(day: dict) -> str:
+    return json.dumps(day, sort_keys=True, separators=(",", ":"))
+
+
+class DiarySync:
+    """Mirror of users' food, exercise and weight diaries in SQLite.
+
+    :param path: Database file
+    :type path: str
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @staticmethod
+    def _user(client, user):
+        if user is not None:
+            return user
+        if client.access_token is None:
+            raise ValueError("Diary sync requires an authenticated client")
+        return token_key(client.access_token)
+
+    def checkpoint(self, user: str) -> Optional[datetime.date]:
+        """Last day covered by a completed sync of ``user``, or ``None``."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT synced_through FROM checkpoints WHERE user = ?", (user,)
+            ).fetchone()
+        return from_date_int(row[0]) if row else None
+
+    def sync(
+        self,
+        client,
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None,
+        user: Optional[str] = None,
+    ) -> SyncResult:
+        """Bring the local copy of the client's user up to date.
+
+        :param client: Client authenticated as the user
+        :type client: ~fatsecret.Fatsecret
+        :param start: First day to sync (default: the month of the checkpoint,
+            or the current month on the first sync)
+        :type start: datetime.date or datetime.datetime
+        :param end: Last day to sync (default today)
+        :type end: datetime.date or datetime.datetime
+        :param user: Key the user's rows are stored under (default
+            :func:`~fatsecret.signing.token_key` of the access token)
+        :type user: str
+        """
+        user = self._user(client, user)
+        end = _as_date(end or datetime.date.today())
+        start = _as_date(start or self.checkpoint(user) or end)
+
+        fetched = deleted = count = 0
+        for month in months(start, end):
+            when = datetime.datetime(month.year, month.month, month.day)
+            food = self._changed_days(
+                user, "food", month, month_days(client.food_entries_get_month(when))
+            )
+            exercise = self._changed_days(
+                user,
+                "exercise",
+                month,
+                month_days(client.exercise_entries_get_month(when)),
+            )
+            weights = month_days(client.weights_get_month(when))
+
+            food_entries = {
+                day: client.food_entries_get(date=self._datetime(day))
+                for day in food.changed
+            }
+            exercise_entries = {
+                day: client.exercise_entries_get(date=self._datetime(day))
+                for day in exercise.changed
+            }
+
+            with self._lock, self._conn:
+                self._store_food(user, food, food_entries)
+                self._store_exercise(user, exercise, exercise_entries)
+                self._store_weights(user, month, weights)
+                covered = min(end, months_end(month))
+                # Re-syncing an older range must not move the checkpoint back.
+                self._conn.execute(
+                    "INSERT INTO checkpoints VALUES (?, ?, ?) ON CONFLICT(user) "
+                    "DO UPDATE SET synced_through = "
+                    "MAX(synced_through, excluded.synced_through), "
+                    "updated = excluded.updated",
+                    (user, date_int(covered), time.time()),
+                )
+            count += 1
+            fetched += len(food.changed) + len(exercise.changed)
+            deleted += len(food.removed) + len(exercise.removed)
+        return SyncResult(count, fetched, deleted)
+
+    @staticmethod
+    def _datetime(day: int) -> datetime.datetime:
+        return datetime.datetime.combine(from_date_int(day), datetime.time())
+
+    def _changed_days(self, user, kind, month, days):
+        """Compare a month's day totals with the stored ones."""
+        summaries = {int(day["date_int"]): _canonical(day) for day in days}
+        with self._lock:
+            stored = dict(
+                self._conn.execute(
+                    "SELECT date_int, summary FROM day_summaries "
+                    "WHERE user = ? AND kind = ? AND date_int BETWEEN ? AND ?",
+                    (user, kind, date_int(month), date_int(months_end(month))),
+                )
+            )
+        changed = [
+            day for day, summary in summaries.items() if stored.get(day) != summary
+        ]
+        removed = [day for day in stored if day not in summaries]
+        return _DayChanges(kind, summaries, sorted(changed), sorted(removed))
+
+    def _replace_summaries(self, user, changes):
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO day_summaries VALUES (?, ?, ?, ?)",
+            [
+                (user, changes.kind, day, changes.summaries[day])
+                for day in changes.changed
+            ],
+        )
+        self._conn.executemany(
+            "DELETE FROM day_summaries WHERE user = ? AND kind = ? AND date_int = ?",
+            [(user, changes.kind, day) for day in changes.removed],
+        )
+
+    def _store_food(self, user, changes, entries):
+        self._replace_summaries(user, changes)
+        for day in changes.changed + changes.removed:
+            self._conn.execute(
+                "DELETE FROM food_entries WHERE user = ? AND date_int = ?", (user, day)
+            )
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO food_entries VALUES (?, ?, ?, ?)",
+            [
+                (user, day, str(entry["food_entry_id"]), json.dumps(entry))
+                for day, day_entries in entries.items()
+                for entry in day_entries or []
+            ],
+        )
+
+    def _store_exercise(self, user, changes, entries):
+        self._replace_summaries(user, changes)
+        for day in changes.changed + changes.removed:
+            self._conn.execute(
+                "DELETE FROM exercise_entries WHERE user = ? AND date_int = ?",
+                (user, day),
+            )
+        self._conn.executemany(
+            "INSERT INTO exercise_entries VALUES (?, ?, ?, ?)",
+            [
+                (user, day, position, json.dumps(entry))
+                for day, day_entries in entries.items()
+                for position, entry in enumerate(day_entries or [])
+            ],
+        )
+
+    def _store_weights(self, user, month, days):
+        self._conn.execute(
+            "DELETE FROM weights WHERE user = ? AND date_int BETWEEN ? AND ?",
+            (user, date_int(month), date_int(months_end(month))),
+        )
+        self._conn.executemany(
+            "INSERT INTO weights VALUES (?, ?, ?, ?)",
+            [
+                (
+                    user,
+                    int(day["date_int"]),
+                    float(day["weight_kg"]) if day.get("weight_kg") else None,
+                    day.get("weight_comment"),
+                )
+                for day in days
+            ],
+        )
+
+    def food_entries(self, user: str, start: DateLike, end: DateLike) -> List[dict]:
+        """Return the stored food entries of ``user`` between two days inclusive."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM food_entries WHERE user = ? "
+                "AND date_int BETWEEN ? AND ? ORDER BY date_int, food_entry_id",
+                (user, date_int(_as_date(start)), date_int(_as_date(end))),
+            ).fetchall()
+        return [json.loads(data) for data, in rows]
+
+    def exercise_entries(self, user: str, start: DateLike, end: DateLike) -> List[dict]:
+        """Return the stored exercise entries of ``user`` between two days inclusive."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM exercise_entries WHERE user = ? "
+                "AND date_int BETWEEN ? AND ? ORDER BY date_int, position",
+                (user, date_int(_as_date(start)), date_int(_as_date(end))),
+            ).fetchall()
+        return [json.loads(data) for data, in rows]
+
+    def weights(self, user: str, start: DateLike, end: DateLike) -> dict:
+        """Return ``{date: weight_kg}`` for ``user`` between two days inclusive."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT date_int, weight_kg FROM weights WHERE user = ? "
+                "AND date_int BETWEEN ? AND ? ORDER BY date_int",
+                (user, date_int(_as_date(start)), date_int(_as_date(end))),
+            ).fetchall()
+        return {from_date_int(day): weight for day, weight in rows}
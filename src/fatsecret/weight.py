@@ -48,8 +48,7 @@ class WeightMixin:
         if comment:
             params["comment"] = comment
 
-        response = self.session.get(self.api_url, params=params)
-        return self.valid_response(response)
+        return self._request(params)
 
     def weights_get_month(self, date=None):
         """Returns the recorded weights for a user for the month specified. Use this call to display a user's
@@ -64,5 +63,4 @@ class WeightMixin:
         if date:
             params["date"] = self.unix_time(date)
 
-        response = self.session.get(self.api_url, params=params)
-        return self.valid_response(response)
+        return self._request(params)
@@ -0,0 +1,334 @@
+"""
+fatsecret.writequeue
+--------------------
+
+Write-behind queue for diary mutations.
+
+:meth:`WriteQueue.submit` records a call such as ``food_entry_create`` in a
+SQLite journal and returns a :class:`WriteHandle` at once, so request
+handlers do not wait for the API. Writes of one user run one at a time in
+submission order, while different users are served in parallel by a thread
+pool. A write leaves the journal only once it has finished, so after a
+crash the writes still pending are replayed in their original order. The
+journal holds a key for each user, never their OAuth credentials.
+"""
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+import asyncio
+import datetime
+import inspect
+import json
+import sqlite3
+import threading
+import time
+
+from .signing import token_key
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pending_writes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT, user TEXT NOT NULL,
+    method TEXT NOT NULL, arguments TEXT NOT NULL, created REAL NOT NULL);
+"""
+
+#: Client methods accepted by :meth:`WriteQueue.submit`: the user data writes.
+QUEUEABLE_METHODS = frozenset(
+    {
+        "exercise_entries_commit_day",
+        "exercise_entries_save_template",
+        "exercise_entry_edit",
+        "food_add_favorite",
+        "food_delete_favorite",
+        "food_entries_copy",
+        "food_entries_copy_saved_meal",
+        "food_entry_create",
+        "food_entry_delete",
+        "food_entry_edit",
+        "recipes_add_favorite",
+        "recipes_delete_favorite",
+        "saved_meal_create",
+        "saved_meal_delete",
+        "saved_meal_edit",
+        "saved_meal_item_add",
+        "saved_meal_item_delete",
+        "saved_meal_item_edit",
+        "weight_update",
+    }
+)
+
+
+def _encode(value):
+    if isinstance(value, datetime.datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"__date__": value.isoformat()}
+    raise TypeError(f"Cannot journal {type(value).__name__} arguments")
+
+
+def _decode(value: dict):
+    if "__datetime__" in value:
+        return datetime.datetime.fromisoformat(value["__datetime__"])
+    if "__date__" in value:
+        return datetime.date.fromisoformat(value["__date__"])
+    return value
+
+
+class WriteHandle:
+    """Outcome of a queued write.
+
+    Block on :meth:`result` or ``await`` the handle from a coroutine.
+    """
+
+    __slots__ = ("_future", "method", "seq", "user")
+
+    def __init__(self, seq: int, user: str, method: str):
+        self.seq = seq
+        self.user = user
+        self.method = method
+        self._future = Future()
+
+    def done(self) -> bool:
+        return self._future.done()
+
+    def result(self, timeout: Optional[float] = None):
+        """Return the API result, re-raising the write's error if it failed."""
+        return self._future.result(timeout)
+
+    def exception(self, timeout: Optional[float] = None):
+        return self._future.exception(timeout)
+
+    def __await__(self):
+        return asyncio.wrap_future(self._future).__await__()
+
+    def __repr__(self):
+        state = "done" if self.done() else "pending"
+        return f"<WriteHandle {self.seq} {self.method} {state}>"
+
+
+class _Write:
+    __slots__ = ("args", "client", "handle", "kwargs")
+
+    def __init__(self, handle, client, args, kwargs):
+        self.handle = handle
+        self.client = client
+        self.args = args
+        self.kwargs = kwargs
+
+
+class WriteQueue:
+    """Journaled write-behind queue with per-user ordering.
+
+    :param path: SQLite journal file
+    :type path: str
+    :param client_factory: Called as ``client_factory(user)`` with the
+        ``user`` key given to :meth:`submit` to obtain a client for writes
+        replayed from the journal; without it, journaled writes wait until
+        :meth:`replay` is called
+    :type client_factory: callable
+    :param max_workers: Number of users whose writes run at once
+    :type max_workers: int
+    """
+
+    def __init__(
+        self,
+        path: str,
+        client_factory: Optional[Callable] = None,
+        max_workers: int = 4,
+    ):
+        self.path = path
+        self.completed = 0
+        self.failed = 0
+        self.recovered = []
+
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._queues: Dict[str, deque] = {}
+        self._active = set()
+        self._depth = 0
+        self._unfinished = set()
+        self._closed = False
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+        if client_factory is not None:
+            self.replay(client_factory)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def depth(self) -> int:
+        """Writes submitted but not finished yet, including the running ones."""
+        return self._depth
+
+    def depth_by_user(self) -> Dict[str, int]:
+        """Return ``{user: writes not finished}`` for users with pending writes."""
+        with self._lock:
+            return {
+                user: len(queue) + (user in self._active)
+                for user, queue in self._queues.items()
+                if queue or user in self._active
+            }
+
+    def journaled(self) -> int:
+        """Number of writes in the journal, including those not replayed yet."""
+        with self._lock:
+            (count,) = self._conn.execute(
+                "SELECT COUNT(*) FROM pending_writes"
+            ).fetchone()
+        return count
+
+    def submit(
+        self, client, method: str, *args, user: Optional[str] = None, **kwargs
+    ) -> WriteHandle:
+        """Queue ``getattr(client, method)(*args, **kwargs)`` and return its handle.
+
+        The write is journaled before this returns. Arguments must be JSON
+        serializable apart from dates and datetimes.
+
+        :param client: Synchronous client authenticated as the user
+        :type client: ~fatsecret.Fatsecret
+        :param method: Name of a write method such as ``"food_entry_create"``
+        :type method: str
+        :param user: Key the writes are ordered and journaled under, passed to
+            ``client_factory`` on replay (default a SHA-256 digest of the
+            access token)
+        :type user: str
+        """
+        function = getattr(client, method, None)
+        if method not in QUEUEABLE_METHODS or not callable(function):
+            raise ValueError(f"{method} is not a queueable write method")
+        if inspect.iscoroutinefunction(function):
+            raise ValueError("Queued writes require a synchronous Fatsecret client")
+        if client.access_token is None:
+            raise ValueError("Queued writes require an authenticated client")
+        arguments = json.dumps({"args": args, "kwargs": kwargs}, default=_encode)
+        if user is None:
+            user = token_key(client.access_token)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The write queue is closed")
+            with self._conn:
+                cursor = self._conn.execute(
+                    "INSERT INTO pending_writes (user, method, arguments, created) "
+                    "VALUES (?, ?, ?, ?)",
+                    (user, method, arguments, time.time()),
+                )
+            handle = WriteHandle(cursor.lastrowid, user, method)
+            self._enqueue(_Write(handle, client, args, kwargs))
+        return handle
+
+    def replay(self, client_factory: Callable) -> list:
+        """Queue the journaled writes left by a previous process.
+
+        Returns their handles, also kept in :attr:`recovered`.
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The write queue is closed")
+            rows = self._conn.execute(
+                "SELECT seq, user, method, arguments FROM pending_writes ORDER BY seq"
+            ).fetchall()
+            clients = {}
+            handles = []
+            for seq, user, method, arguments in rows:
+                if seq in self._unfinished:
+                    continue
+                if user not in clients:
+                    clients[user] = client_factory(user)
+                decoded = json.loads(arguments, object_hook=_decode)
+                handle = WriteHandle(seq, user, method)
+                self._enqueue(
+                    _Write(handle, clients[user], decoded["args"], decoded["kwargs"])
+                )
+                handles.append(handle)
+            self.recovered.extend(handles)
+        return handles
+
+    def _enqueue(self, write: _Write) -> None:
+        """Append a write to its user's queue; the caller holds the lock."""
+        user = write.handle.user
+        self._queues.setdefault(user, deque()).append(write)
+        self._unfinished.add(write.handle.seq)
+        self._depth += 1
+        if user not in self._active:
+            self._active.add(user)
+            self._executor.submit(self._drain, user)
+
+    def _drain(self, user: str) -> None:
+        """Run the writes of one user in order until its queue is empty."""
+        while True:
+            with self._lock:
+                queue = self._queues.get(user)
+                if not queue:
+                    self._active.discard(user)
+                    self._queues.pop(user, None)
+                    return
+                write = queue.popleft()
+            self._run(write)
+
+    def _run(self, write: _Write) -> None:
+        handle = write.handle
+        try:
+            value = getattr(write.client, handle.method)(*write.args, **write.kwargs)
+            if inspect.isawaitable(value):
+                # A replayed write given an async client: nothing was sent.
+                getattr(value, "close", lambda: None)()
+                raise TypeError("Queued writes require a synchronous Fatsecret client")
+        except Exception as error:
+            outcome, failed = error, True
+        else:
+            outcome, failed = value, False
+
+        with self._lock:
+            # A failed write is not retried here (the client's RetryPolicy
+            # already has); it leaves the journal and its error is reported.
+            with self._conn:
+                self._conn.execute(
+                    "DELETE FROM pending_writes WHERE seq = ?", (handle.seq,)
+                )
+            self._unfinished.discard(handle.seq)
+            self._depth -= 1
+            if failed:
+                self.failed += 1
+            else:
+                self.completed += 1
+            if self._depth == 0:
+                self._idle.notify_all()
+        if failed:
+            handle._future.set_exception(outcome)
+        else:
+            handle._future.set_result(outcome)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued write has finished.
+
+        Returns ``False`` if ``timeout`` seconds passed first.
+        """
+        with self._lock:
+            return self._idle.wait_for(lambda: self._depth == 0, timeout)
+
+    def close(self, wait: bool = True) -> None:
+        """Stop accepting writes; with ``wait``, finish the queued ones first.
+
+        Writes not run remain in the journal for the next process.
+        """
+        with self._lock:
+            self._closed = True
+            if not wait:
+                for queue in self._queues.values():
+                    for write in queue:
+                        write.handle._future.cancel()
+                        self._unfinished.discard(write.handle.seq)
+                    self._depth -= len(queue)
+                    queue.clear()
+                if self._depth == 0:
+                    self._idle.notify_all()
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            self._conn.close()
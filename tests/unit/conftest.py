@@ -0,0 +1,60 @@
+import json
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class StubApi:
+    """Local stand-in for the FatSecret REST endpoint.
+
+    ``routes`` maps an API method name (``foods.search``) to either a JSON
+    payload or a callable receiving the flattened query parameters.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        self.lock = threading.Lock()
+        self.url = None
+
+    def calls(self, method):
+        return [params for params in self.requests if params.get("method") == method]
+
+    def respond(self, params):
+        with self.lock:
+            self.requests.append(params)
+        route = self.routes.get(params.get("method"))
+        if route is None:
+            return {"error": {"code": 13, "message": "Unknown method"}}
+        return route(params) if callable(route) else route
+
+
+@pytest.fixture
+def stub_api():
+    api = StubApi()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = urllib.parse.urlsplit(self.path).query
+            params = dict(urllib.parse.parse_qsl(query, keep_blank_values=True))
+            body = json.dumps(api.respond(params)).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    )
+    thread.start()
+    api.url = f"http://127.0.0.1:{server.server_address[1]}/rest/server.api"
+    yield api
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,118 @@
+import asyncio
+import inspect
+import os
+import subprocess
+import sys
+
+import pytest
+from rauth.oauth import HmacSha1Signature
+
+from fatsecret import AsyncFatsecret, Fatsecret, ParameterError
+from fatsecret.async_client import ENDPOINT_MIXINS
+
+pytest.importorskip("aiohttp")
+
+
+def make_client(stub_api, **kwargs):
+    client = AsyncFatsecret(
+        "key", "secret", session_token=("token", "tsecret"), **kwargs
+    )
+    client.oauth.base_url = stub_api.url
+    return client
+
+
+def test_package_import_does_not_load_aiohttp():
+    code = "import fatsecret, sys; assert 'aiohttp' not in sys.modules"
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    subprocess.run([sys.executable, "-c", code], check=True, env=env)
+
+
+def test_every_endpoint_is_a_coroutine():
+    for mixin in ENDPOINT_MIXINS:
+        for name, method in vars(mixin).items():
+            if name.startswith("_") or not inspect.isfunction(method):
+                continue
+            assert inspect.iscoroutinefunction(getattr(AsyncFatsecret, name)), name
+            assert not inspect.iscoroutinefunction(getattr(Fatsecret, name)), name
+
+
+def test_food_get_against_stub(stub_api):
+    stub_api.routes["food.get"] = lambda params: {
+        "food": {"food_id": params["food_id"], "food_name": "Banana"}
+    }
+
+    async def run():
+        async with make_client(stub_api) as client:
+            return await client.food_get("4380")
+
+    assert asyncio.run(run()) == {"food_id": "4380", "food_name": "Banana"}
+
+    params = dict(stub_api.calls("food.get")[0])
+    assert params["oauth_token"] == "token"
+    signature = params.pop("oauth_signature")
+    oauth_params = {k: v for k, v in params.items() if k.startswith("oauth_")}
+    request_params = {k: v for k, v in params.items() if not k.startswith("oauth_")}
+    expected = HmacSha1Signature().sign(
+        "secret",
+        "tsecret",
+        "GET",
+        stub_api.url,
+        oauth_params,
+        {"params": request_params},
+    )
+    assert signature == expected
+
+
+def test_concurrent_calls_share_pool(stub_api):
+    stub_api.routes["foods.search"] = lambda params: {
+        "foods": {"food": [{"food_name": params["search_expression"]}]}
+    }
+
+    async def run():
+        async with make_client(stub_api, max_connections=4) as client:
+            results = await asyncio.gather(
+                *(client.foods_search(f"term{i}") for i in range(10))
+            )
+            return results, client.http.connector.limit
+
+    results, limit = asyncio.run(run())
+    assert [r[0]["food_name"] for r in results] == [f"term{i}" for i in range(10)]
+    assert limit == 4
+
+
+def test_api_errors_are_raised(stub_api):
+    stub_api.routes["food.get"] = {"error": {"code": 106, "message": "Invalid ID"}}
+
+    async def run():
+        async with make_client(stub_api) as client:
+            await client.food_get("nope")
+
+    with pytest.raises(ParameterError):
+        asyncio.run(run())
+
+
+def test_early_return_endpoints_resolve_to_none(stub_api):
+    async def run():
+        async with make_client(stub_api) as client:
+            return await client.food_entries_get()
+
+    assert asyncio.run(run()) is None
+    assert stub_api.requests == []
+
+
+def test_shared_http_session_is_not_closed(stub_api):
+    import aiohttp
+
+    stub_api.routes["recipe_types.get"] = {"recipe_types": {"recipe_type": ["Soup"]}}
+
+    async def run():
+        async with aiohttp.ClientSession() as http:
+            async with make_client(stub_api, http_session=http) as first:
+                await first.recipe_types_get()
+            async with make_client(stub_api, http_session=http) as second:
+                result = await second.recipe_types_get()
+            return result, http.closed
+
+    result, closed = asyncio.run(run())
+    assert result == {"recipe_type": ["Soup"]}
+    assert closed is False
@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+
+from fatsecret import (
+    AsyncAutocompleter,
+    AsyncFatsecret,
+    Autocompleter,
+    Fatsecret,
+    SuggestionTrie,
+)
+
+WORDS = [
+    "chicken",
+    "chicken breast",
+    "chicken soup",
+    "chickpeas",
+    "chicory",
+    "chili",
+    "chips",
+]
+
+
+def _suggest(params):
+    expression = params["expression"].lower()
+    matches = [word for word in WORDS if expression in word]
+    limit = int(params.get("max_results", 4))
+    return {"suggestions": {"suggestion": matches[:limit]}}
+
+
+def test_trie_answers_longer_prefixes_from_complete_results():
+    trie = SuggestionTrie()
+    trie.insert("chic", ["chicken", "chicory"], 4)
+    assert trie.lookup("chic") == ["chicken", "chicory"]
+    assert trie.lookup("Chick") == ["chicken"]
+    assert trie.lookup("chicx") == []
+    assert trie.lookup("chic", region="FR") is None
+    assert trie.lookup("ch") is None
+
+
+def test_trie_only_filters_truncated_results_when_enough_match():
+    trie = SuggestionTrie()
+    trie.insert("ch", ["chicken", "chicken soup", "chili", "chips"], 4)
+    assert trie.lookup("ch", 2) == ["chicken", "chicken soup"]
+    assert trie.lookup("ch", 10) is None
+    assert trie.lookup("chicken", 2) == ["chicken", "chicken soup"]
+    assert trie.lookup("chick") is None
+
+
+def test_trie_matches_like_the_api():
+    # foods.autocomplete returns suggestions containing the expression.
+    trie = SuggestionTrie()
+    trie.insert("a", ["apple", "pineapple", "banana"], 4)
+    assert trie.lookup("app") == ["apple", "pineapple"]
+
+
+def test_trie_evicts_oldest_prefixes():
+    trie = SuggestionTrie(max_entries=2)
+    trie.insert("a", [], 4)
+    trie.insert("ab", [], 4)
+    trie.insert("xyz", [], 4)
+    assert len(trie) == 2
+    assert trie.lookup("a") is None
+    assert trie.lookup("ab") == []
+    assert trie.lookup("xyz") == []
+
+
+def test_autocompleter_calls_api_for_cold_prefixes_only(stub_api):
+    stub_api.routes["foods.autocomplete"] = _suggest
+    fs = Fatsecret("key", "secret")
+    fs.oauth.base_url = stub_api.url
+    completer = Autocompleter(fs)
+
+    assert completer.suggest("chi") == [
+        "chicken",
+        "chicken breast",
+        "chicken soup",
+        "chickpeas",
+    ]
+    assert completer.suggest("chick") == [
+        "chicken",
+        "chicken breast",
+        "chicken soup",
+        "chickpeas",
+    ]
+    assert completer.suggest("chicke") == ["chicken", "chicken breast", "chicken soup"]
+    assert completer.suggest("chicken s") == ["chicken soup"]
+    assert completer.suggest("") == []
+    assert [call["expression"] for call in stub_api.calls("foods.autocomplete")] == [
+        "chi",
+        "chicke",
+    ]
+    assert (completer.hits, completer.misses) == (2, 2)
+
+
+def test_async_debounce_and_cancel(stub_api):
+    pytest.importorskip("aiohttp")
+    stub_api.routes["foods.autocomplete"] = _suggest
+
+    async def run():
+        async with AsyncFatsecret("key", "secret") as fs:
+            fs.oauth.base_url = stub_api.url
+            completer = AsyncAutocompleter(fs, delay=0.05)
+            typed = ["c", "ch", "chi"]
+            results = []
+            for expression in typed:
+                results.append(asyncio.ensure_future(completer.suggest(expression)))
+                await asyncio.sleep(0.01)
+            results = await asyncio.gather(*results)
+            warm = await completer.suggest("chick")
+
+            pending = asyncio.ensure_future(completer.suggest("pea"))
+            await asyncio.sleep(0)
+            completer.cancel()
+            return results, warm, await pending, completer.superseded
+
+    results, warm, cancelled, superseded = asyncio.run(run())
+    assert results[:2] == [None, None]
+    assert results[2] == ["chicken", "chicken breast", "chicken soup", "chickpeas"]
+    assert warm == results[2]
+    assert cancelled is None
+    assert superseded == 3
+    assert [call["expression"] for call in stub_api.calls("foods.autocomplete")] == [
+        "chi"
+    ]
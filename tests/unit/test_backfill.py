@@ -0,0 +1,111 @@
+import datetime
+
+import pytest
+
+from fatsecret import BackfillJob, Fatsecret
+from fatsecret.sync import date_int, from_date_int
+
+DAYS = [
+    datetime.date(2023, 11, 2),
+    datetime.date(2023, 11, 20),
+    datetime.date(2023, 12, 24),
+    datetime.date(2024, 1, 1),
+    datetime.date(2024, 1, 15),
+    datetime.date(2024, 2, 29),
+]
+START, END = datetime.date(2023, 11, 1), datetime.date(2024, 2, 29)
+
+
+@pytest.fixture
+def client(stub_api):
+    def month(params):
+        first = from_date_int(params["date"])
+        days = [
+            {"date_int": str(date_int(day)), "calories": "1"}
+            for day in DAYS
+            if (day.year, day.month) == (first.year, first.month)
+        ]
+        return {"month": {"day": days}}
+
+    stub_api.routes["food_entries.get_month"] = month
+    stub_api.routes["food_entries.get"] = lambda params: {
+        "food_entries": {"food_entry": [{"food_entry_id": params["date"]}]}
+    }
+    fs = Fatsecret("key", "secret", session_token=("token", "secret"))
+    fs.oauth.base_url = stub_api.url
+    return fs
+
+
+def test_backfill_delivers_every_day_and_reports_progress(client, tmp_path):
+    delivered, progress = [], []
+    with BackfillJob(
+        client,
+        str(tmp_path / "backfill.db"),
+        START,
+        END,
+        on_day=lambda day, entries: delivered.append((day, entries)),
+        on_progress=progress.append,
+    ) as job:
+        result = job.run()
+        assert len(job.completed_months()) == 4
+
+    assert sorted(day for day, _ in delivered) == DAYS
+    assert all(len(entries) == 1 for _, entries in delivered)
+    assert (result.months_done, result.months_total) == (4, 4)
+    assert (result.days_done, result.entries) == (6, 6)
+    assert result.days_per_second > 0
+    assert len(progress) == 6 + 4
+    assert progress[-1].months_done == 4
+    with open(tmp_path / "backfill.db", "rb") as handle:
+        assert b"token" not in handle.read()
+
+
+def test_backfill_resumes_after_failure(stub_api, client, tmp_path):
+    path = str(tmp_path / "backfill.db")
+    delivered = []
+
+    def flaky(day, entries):
+        if day == DAYS[4] and DAYS[4] not in failed:
+            failed.append(day)
+            raise RuntimeError("disk full")
+        delivered.append(day)
+
+    failed = []
+    job = BackfillJob(client, path, START, END, on_day=flaky, max_concurrency=1)
+    with pytest.raises(RuntimeError):
+        job.run()
+    first_run = list(delivered)
+    assert DAYS[4] not in first_run
+
+    stub_api.requests.clear()
+    result = BackfillJob(client, path, START, END, on_day=flaky).run()
+    assert sorted(delivered) == DAYS
+    assert len(delivered) == len(DAYS)
+    assert result.months_done == 4
+    assert result.days_done == len(DAYS) - len(first_run)
+    fetched = {call["date"] for call in stub_api.calls("food_entries.get")}
+    assert fetched == {str(date_int(day)) for day in DAYS if day not in first_run}
+
+
+def test_backfill_stop_and_reset(client, tmp_path):
+    path = str(tmp_path / "backfill.db")
+    delivered = []
+    job = BackfillJob(
+        client,
+        path,
+        START,
+        END,
+        on_day=lambda day, entries: (delivered.append(day), job.stop()),
+        max_concurrency=1,
+    )
+    result = job.run()
+    assert len(delivered) == 1
+    assert result.months_done == 0
+
+    job.on_day = lambda day, entries: delivered.append(day)
+    job.run()
+    assert sorted(delivered) == DAYS
+
+    job.reset()
+    assert job.completed_months() == set()
+    job.close()
@@ -0,0 +1,84 @@
+import pytest
+
+from fatsecret import Fatsecret, GtinIndex, InvalidBarcode, ParameterError
+from fatsecret.barcodes import check_digit, normalize_barcode
+
+
+@pytest.mark.parametrize(
+    "barcode, gtin",
+    [
+        ("036000291452", "0036000291452"),  # UPC-A
+        ("4006381333931", "4006381333931"),  # EAN-13
+        ("0425261", "0042100005264"),  # UPC-E with number system
+        ("425261", "0042100005264"),  # bare UPC-E
+        ("0123456", "0012345000065"),  # UPC-E ending in 5-9
+        ("00036000291452", "0036000291452"),  # GTIN-14
+        (" 0 36000-29145 2 ", "0036000291452"),
+        (36000291452, "0036000291452"),
+    ],
+)
+def test_normalize_barcode(barcode, gtin):
+    assert normalize_barcode(barcode) == gtin
+
+
+def test_eight_digit_codes_need_a_kind():
+    assert normalize_barcode("96385074", kind="ean-8") == "0000096385074"
+    assert normalize_barcode("04252614", kind="upc-e") == "0042100005264"
+    # Valid both as EAN-8 and as UPC-E.
+    assert normalize_barcode("01234565", kind="ean-8") == "0000001234565"
+    assert normalize_barcode("01234565", kind="upc-e") == "0012345000065"
+    with pytest.raises(ValueError, match="kind"):
+        normalize_barcode("01234565")
+    with pytest.raises(InvalidBarcode):
+        normalize_barcode("96385074", kind="upc-e")
+
+
+@pytest.mark.parametrize(
+    "barcode", ["036000291453", "4006381333932", "12345", "abc", "10036000291452"]
+)
+def test_invalid_barcodes(barcode):
+    with pytest.raises(InvalidBarcode) as excinfo:
+        normalize_barcode(barcode)
+    assert isinstance(excinfo.value, ParameterError)
+
+
+def test_check_digit():
+    assert check_digit("03600029145") == 2
+    assert check_digit("400638133393") == 1
+
+
+def test_gtin_index(tmp_path):
+    path = str(tmp_path / "gtin.idx")
+    pairs = [
+        (str(n).zfill(12) + str(check_digit(str(n).zfill(12))), n * 7)
+        for n in range(0, 5000, 3)
+    ]
+    with GtinIndex.build(path, reversed(pairs)) as index:
+        assert len(index) == len(pairs)
+        for barcode, food_id in pairs[::50]:
+            assert index.get(barcode) == str(food_id)
+        assert index.get("0000000000017") is None
+        assert next(index.items()) == (pairs[0][0], str(pairs[0][1]))
+
+
+def test_gtin_index_rejects_other_files(tmp_path):
+    path = tmp_path / "other"
+    path.write_bytes(b"nope")
+    with pytest.raises(ValueError):
+        GtinIndex(str(path))
+
+
+def test_client_normalizes_and_consults_index(stub_api, tmp_path):
+    stub_api.routes["food.find_id_for_barcode"] = {"food_id": {"value": "99"}}
+    index = GtinIndex.build(str(tmp_path / "gtin.idx"), [("036000291452", 42)])
+    fs = Fatsecret("key", "secret", barcode_index=index)
+    fs.oauth.base_url = stub_api.url
+
+    assert fs.food_find_id_for_barcode("036000291452") == "42"
+    assert fs.food_find_id_for_barcode("04252614", kind="upc-e") == "99"
+    with pytest.raises(InvalidBarcode):
+        fs.food_find_id_for_barcode("036000291453")
+
+    calls = stub_api.calls("food.find_id_for_barcode")
+    assert [call["barcode"] for call in calls] == ["0042100005264"]
+    index.close()
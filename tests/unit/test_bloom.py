@@ -0,0 +1,82 @@
+import time
+
+import pytest
+
+from fatsecret import BloomFilter
+from fatsecret.bloom import main
+
+
+def test_members_are_found():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    codes = [f"{n:013d}" for n in range(1000)]
+    bloom.update(codes)
+    assert all(code in bloom for code in codes)
+    # Items whose bits were all set already are not counted again.
+    assert 990 <= len(bloom) <= 1000
+
+
+def test_false_positive_rate_within_budget():
+    bloom = BloomFilter.build((f"{n:013d}" for n in range(5000)), error_rate=0.01)
+    false_positives = sum(f"{n:013d}" in bloom for n in range(5000, 25000))
+    assert false_positives / 20000 < 0.02
+    assert not bloom.over_budget
+
+
+def test_over_budget_when_overfilled():
+    bloom = BloomFilter(capacity=100, error_rate=0.01)
+    bloom.update(str(n) for n in range(1000))
+    assert bloom.over_budget
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "misses.bloom")
+    bloom = BloomFilter(capacity=100)
+    bloom.add("0000000000017")
+    bloom.save(path)
+    loaded = BloomFilter.load(path)
+    assert "0000000000017" in loaded
+    assert "0000000000024" not in loaded
+    assert (loaded.bits, loaded.hashes, len(loaded)) == (bloom.bits, bloom.hashes, 1)
+    assert loaded.created == bloom.created
+
+
+def test_clear_restarts_the_filter():
+    bloom = BloomFilter(capacity=100)
+    bloom.add("0000000000017")
+    bloom.created -= 60
+    bloom.clear()
+    assert "0000000000017" not in bloom
+    assert len(bloom) == 0
+    assert bloom.created > time.time() - 5
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "other"
+    path.write_bytes(b"not a filter")
+    with pytest.raises(ValueError):
+        BloomFilter.load(str(path))
+
+
+def test_rebuild_tool(tmp_path, capsys):
+    source = tmp_path / "misses.txt"
+    source.write_text("0000000000017\n\n0000000000024\n0000000000017\n")
+    output = str(tmp_path / "misses.bloom")
+    main([str(source), output, "--error-rate", "0.001", "--headroom", "10"])
+    bloom = BloomFilter.load(output)
+    assert "0000000000024" in bloom
+    assert (len(bloom), bloom.capacity) == (2, 20)
+    assert "2 barcodes" in capsys.readouterr().out
+
+
+def test_rebuild_tool_normalizes_barcodes(tmp_path, capsys):
+    source = tmp_path / "misses.txt"
+    source.write_text("036000291452\n036000291453\n 4006381333931 \n")
+    output = str(tmp_path / "misses.bloom")
+    main([str(source), output])
+    bloom = BloomFilter.load(output)
+    assert "0036000291452" in bloom
+    assert "036000291452" not in bloom
+    assert "4006381333931" in bloom
+    assert len(bloom) == 2
+    error = capsys.readouterr().err
+    assert error.startswith("line 2: ") and "Invalid check digit" in error
@@ -0,0 +1,98 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from fatsecret import AsyncFatsecret, Fatsecret, ParameterError
+from fatsecret.bulk import async_fan_out, fan_out
+
+
+def food_route(params):
+    if params["food_id"] == "bad":
+        return {"error": {"code": 106, "message": "Invalid ID"}}
+    return {"food": {"food_id": params["food_id"]}}
+
+
+def test_fan_out_ordered_matches_input():
+    def slow_double(n):
+        time.sleep(0.001 * (10 - n))
+        return n * 2
+
+    results = list(fan_out(slow_double, range(10), max_concurrency=4, ordered=True))
+    assert [r.index for r in results] == list(range(10))
+    assert [r.value for r in results] == [n * 2 for n in range(10)]
+
+
+def test_fan_out_captures_errors():
+    def maybe_fail(n):
+        if n == 3:
+            raise RuntimeError("boom")
+        return n
+
+    results = sorted(fan_out(maybe_fail, range(6), max_concurrency=2))
+    assert [r.ok for r in results] == [True, True, True, False, True, True]
+    assert isinstance(results[3].error, RuntimeError)
+
+
+def test_fan_out_respects_max_concurrency():
+    lock = threading.Lock()
+    active = []
+    peak = []
+
+    def track(n):
+        with lock:
+            active.append(n)
+            peak.append(len(active))
+        time.sleep(0.005)
+        with lock:
+            active.remove(n)
+        return n
+
+    assert len(list(fan_out(track, range(20), max_concurrency=3))) == 20
+    assert max(peak) <= 3
+
+
+def test_fan_out_rejects_zero_concurrency():
+    with pytest.raises(ValueError):
+        fan_out(str, [1], max_concurrency=0)
+
+
+def test_food_get_many_against_stub(stub_api):
+    stub_api.routes["food.get.v2"] = food_route
+    fs = Fatsecret("key", "secret", pool_maxsize=2)
+    fs.oauth.base_url = stub_api.url
+
+    ids = ["1", "bad", "3", "4"]
+    results = list(fs.food_get_many(ids, region="US", max_concurrency=2, ordered=True))
+
+    assert [r.key for r in results] == ids
+    assert results[0].value == {"food_id": "1"}
+    assert isinstance(results[1].error, ParameterError)
+    assert all(call["region"] == "US" for call in stub_api.calls("food.get.v2"))
+    adapter = fs.session.get_adapter("http://")
+    assert adapter.poolmanager.connection_pool_kw["maxsize"] == 2
+
+
+def test_async_fan_out_ordered():
+    async def double(n):
+        await asyncio.sleep(0.001 * (5 - n))
+        return n * 2
+
+    async def run():
+        return [r async for r in async_fan_out(double, range(5), 2, ordered=True)]
+
+    assert [r.value for r in asyncio.run(run())] == [0, 2, 4, 6, 8]
+
+
+def test_async_food_get_many_against_stub(stub_api):
+    pytest.importorskip("aiohttp")
+    stub_api.routes["food.get.v2"] = food_route
+
+    async def run():
+        async with AsyncFatsecret("key", "secret") as fs:
+            fs.oauth.base_url = stub_api.url
+            return [r async for r in fs.food_get_many(["1", "bad", "3"])]
+
+    results = sorted(asyncio.run(run()))
+    assert [r.ok for r in results] == [True, False, True]
@@ -0,0 +1,266 @@
+import math
+import multiprocessing
+import time
+
+import pytest
+
+from fatsecret import (
+    BloomFilter,
+    Fatsecret,
+    MemoryBackend,
+    ParameterError,
+    ResponseCache,
+    SharedMemoryBackend,
+    SQLiteBackend,
+)
+from fatsecret.cache import DAY
+
+
+@pytest.fixture(params=["memory", "sqlite", "shared"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        yield MemoryBackend(max_entries=3, max_bytes=1000)
+    elif request.param == "sqlite":
+        backend = SQLiteBackend(str(tmp_path / "cache.db"), max_entries=3)
+        yield backend
+        backend.close()
+    else:
+        yield SharedMemoryBackend(slots=3, slot_size=512, ways=3)
+
+
+def test_backend_roundtrip_and_delete(backend):
+    backend.set("a", b"1", time.time() + 60)
+    assert backend.get("a")[1] == b"1"
+    backend.delete("a")
+    assert backend.get("a") is None
+
+
+def test_backend_evicts_least_recently_used(backend):
+    expires = time.time() + 60
+    for key in ("a", "b", "c"):
+        backend.set(key, key.encode(), expires)
+        time.sleep(0.001)
+    backend.get("a")
+    time.sleep(0.001)
+    backend.set("d", b"d", expires)
+
+    assert backend.get("b") is None
+    assert backend.get("a")[1] == b"a"
+    assert backend.get("d")[1] == b"d"
+    assert len(backend) == 3
+
+
+def test_memory_backend_evicts_by_bytes():
+    backend = MemoryBackend(max_entries=100, max_bytes=10)
+    backend.set("a", b"12345", time.time() + 60)
+    backend.set("b", b"12345", time.time() + 60)
+    backend.set("c", b"12345", time.time() + 60)
+    assert backend.get("a") is None
+    assert backend.size == 10
+
+
+def test_sqlite_backend_evicts_by_bytes(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.db"), max_bytes=10)
+    for key in ("a", "b", "c"):
+        backend.set(key, b"12345", time.time() + 60)
+        time.sleep(0.001)
+    assert backend.get("a") is None
+    assert backend.size == 10
+
+
+def test_sqlite_backend_persists(tmp_path):
+    path = str(tmp_path / "cache.db")
+    SQLiteBackend(path).set("a", b"1", time.time() + 60)
+    assert SQLiteBackend(path).get("a")[1] == b"1"
+
+
+def _child_write(backend):
+    backend.set("from-child", b"hello", time.time() + 60)
+
+
+def test_shared_memory_backend_is_shared_with_forked_workers():
+    ctx = multiprocessing.get_context("fork")
+    backend = SharedMemoryBackend(slots=16, slot_size=256)
+    worker = ctx.Process(target=_child_write, args=(backend,))
+    worker.start()
+    worker.join(10)
+    assert backend.get("from-child")[1] == b"hello"
+
+
+def test_shared_memory_backend_skips_oversized_values():
+    backend = SharedMemoryBackend(slots=4, slot_size=64)
+    backend.set("big", b"x" * 64, time.time() + 60)
+    assert backend.get("big") is None
+
+
+def test_cache_key_includes_region_and_language():
+    base = {"method": "food.get.v2", "food_id": "1", "format": "json"}
+    keys = {
+        ResponseCache.key(base),
+        ResponseCache.key(dict(base, region="US")),
+        ResponseCache.key(dict(base, region="FR", language="fr")),
+    }
+    assert len(keys) == 3
+
+
+def test_cache_only_accepts_configured_methods():
+    cache = ResponseCache(ttls={"recipe.get": 0})
+    assert cache.accepts({"method": "food.get"})
+    assert not cache.accepts({"method": "recipe.get"})
+    assert not cache.accepts({"method": "food_entry.create"})
+
+
+def test_expired_entries_are_misses():
+    cache = ResponseCache(ttls={"food.get": 60})
+    params = {"method": "food.get", "food_id": "1"}
+    cache.store(params, {"food_id": "1"})
+    assert cache.lookup(params) == (True, {"food_id": "1"})
+    cache.backend.set(cache.key(params), b"{}", time.time() - 1)
+    assert cache.lookup(params) == (False, None)
+
+
+def test_client_serves_reference_calls_from_cache(stub_api, tmp_path):
+    stub_api.routes["food.get.v2"] = lambda params: {
+        "food": {"food_id": params["food_id"], "region": params.get("region")}
+    }
+    stub_api.routes["foods.search"] = {"foods": {"food": []}}
+    cache = ResponseCache(SQLiteBackend(str(tmp_path / "cache.db")))
+    fs = Fatsecret("key", "secret", cache=cache)
+    fs.oauth.base_url = stub_api.url
+
+    assert fs.food_get_v2("1") == {"food_id": "1", "region": None}
+    assert fs.food_get_v2("1") == {"food_id": "1", "region": None}
+    assert fs.food_get_v2("1", region="FR") == {"food_id": "1", "region": "FR"}
+    fs.foods_search("apple")
+    fs.foods_search("apple")
+
+    assert len(stub_api.calls("food.get.v2")) == 2
+    assert len(stub_api.calls("foods.search")) == 2
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["by_method"]["food.get.v2"] == {"hits": 1, "misses": 2}
+    assert stats["entries"] == 2
+
+
+def test_api_errors_are_not_cached(stub_api):
+    stub_api.routes["recipe.get"] = {"error": {"code": 106, "message": "bad"}}
+    fs = Fatsecret("key", "secret", cache=ResponseCache())
+    fs.oauth.base_url = stub_api.url
+
+    for _ in range(2):
+        with pytest.raises(ParameterError):
+            fs.recipe_get("1")
+    assert len(stub_api.calls("recipe.get")) == 2
+
+
+def test_stale_entries_served_within_grace_with_one_refresh():
+    cache = ResponseCache(ttls={"food.get": 60}, grace=30, early_expiration=0)
+    params = {"method": "food.get", "food_id": "1"}
+    cache.backend.set(cache.key(params), b'{"food_id": "old"}', time.time() - 1)
+    refreshes = []
+
+    assert cache.lookup(params) == (False, None)
+    for _ in range(3):
+        hit, value = cache.lookup(params, lambda: refreshes.append(1))
+        assert (hit, value) == (True, {"food_id": "old"})
+    assert refreshes == [1]
+    assert cache.stats()["stale"] == 3
+
+    cache.store(params, {"food_id": "new"})
+    assert cache.lookup(params) == (True, {"food_id": "new"})
+
+    cache.backend.set(cache.key(params), b"{}", time.time() - 31)
+    assert cache.lookup(params, lambda: refreshes.append(1)) == (False, None)
+    assert refreshes == [1]
+
+
+def test_early_expired_entry_is_refetched_without_grace(monkeypatch):
+    monkeypatch.setattr("fatsecret.cache.random.random", lambda: 0.999999)
+    refreshes = []
+    params = {"method": "food.get", "food_id": "1"}
+    for grace, expected in ((0, (False, None)), (30, (True, {}))):
+        cache = ResponseCache(ttls={"food.get": 100}, grace=grace, early_expiration=1)
+        cache.backend.set(cache.key(params), b"{}", time.time() + 50)
+        assert cache.lookup(params, lambda: refreshes.append(grace)) == expected
+    assert refreshes == [30]
+
+
+def test_negative_entries_expire_early_within_their_own_ttl(monkeypatch):
+    # exp(-1): an entry is expired once within one window of its expiry
+    monkeypatch.setattr("fatsecret.cache.random.random", lambda: 1 - math.exp(-1))
+    cache = ResponseCache(ttls={"food.find_id_for_barcode": 100 * DAY})
+    params = {"method": "food.find_id_for_barcode", "barcode": "0036000291452"}
+    expires = time.time() + 0.02 * DAY
+    cache.backend.set(cache.key(params), b'"0"', expires)
+    assert cache.lookup(params) == (True, "0")
+    cache.backend.set(cache.key(params), b'"4380"', expires)
+    assert cache.lookup(params) == (False, None)
+
+
+def test_early_expiration_spreads_expiry():
+    cache = ResponseCache(ttls={"food.get": 100}, early_expiration=0.01)
+    params = {"method": "food.get", "food_id": "1"}
+    cache.backend.set(cache.key(params), b"{}", time.time() + 1)
+    near = sum(not cache.lookup(params)[0] for _ in range(200))
+    cache.backend.set(cache.key(params), b"{}", time.time() + 90)
+    far = sum(not cache.lookup(params)[0] for _ in range(200))
+    assert 30 < near < 130
+    assert far == 0
+
+
+def test_client_refreshes_stale_entry_in_background(stub_api):
+    versions = iter(["1", "2"])
+    stub_api.routes["recipe_types.get"] = lambda params: {
+        "recipe_types": [next(versions)]
+    }
+    cache = ResponseCache(grace=60, early_expiration=0)
+    fs = Fatsecret("key", "secret", cache=cache)
+    fs.oauth.base_url = stub_api.url
+
+    assert fs.recipe_types_get() == ["1"]
+    params = {"method": "recipe_types.get", "format": "json"}
+    _, data = cache.backend.get(cache.key(params))
+    cache.backend.set(cache.key(params), data, time.time() - 1)
+
+    assert fs.recipe_types_get() == ["1"]
+    deadline = time.time() + 2
+    while cache.lookup(params) != (True, ["2"]) and time.time() < deadline:
+        time.sleep(0.01)
+    assert fs.recipe_types_get() == ["2"]
+    assert len(stub_api.calls("recipe_types.get")) == 2
+
+
+def test_barcode_misses_use_negative_ttl_and_filter(stub_api):
+    stub_api.routes["food.find_id_for_barcode"] = lambda params: {
+        "food_id": {"value": "42" if params["barcode"] == "0000000000017" else "0"}
+    }
+    bloom = BloomFilter(capacity=100)
+    cache = ResponseCache(
+        negative_ttls={"food.find_id_for_barcode": 60}, miss_filter=bloom
+    )
+    fs = Fatsecret("key", "secret", cache=cache)
+    fs.oauth.base_url = stub_api.url
+
+    assert fs.food_find_id_for_barcode("0000000000017") == "42"
+    assert fs.food_find_id_for_barcode("0000000000024") == "0"
+    assert "0000000000024" in bloom
+    assert "0000000000017" not in bloom
+
+    expires, _ = cache.backend.get(
+        cache.key({"method": "food.find_id_for_barcode", "barcode": "0000000000024"})
+    )
+    assert expires < time.time() + 61
+
+    cache.clear()
+    assert fs.food_find_id_for_barcode("0000000000024") == "0"
+    assert len(stub_api.calls("food.find_id_for_barcode")) == 2
+    assert cache.stats()["filtered"] == 1
+
+    # Misses older than the negative TTL are looked up again.
+    cache.clear()
+    bloom.created -= 61
+    assert fs.food_find_id_for_barcode("0000000000024") == "0"
+    assert len(stub_api.calls("food.find_id_for_barcode")) == 3
+    assert cache.stats()["filtered"] == 1
+    assert "0000000000024" in bloom
@@ -0,0 +1,118 @@
+import asyncio
+import datetime
+import time
+
+import pytest
+
+from fatsecret import AsyncFatsecret, Fatsecret, ParameterError
+from fatsecret.sync import date_int, from_date_int
+
+FOOD_DAYS = [
+    datetime.date(2024, 1, 30),
+    datetime.date(2024, 2, 1),
+    datetime.date(2024, 2, 14),
+    datetime.date(2024, 3, 3),
+    datetime.date(2024, 3, 20),
+]
+
+
+def _month_route(days, record):
+    def route(params):
+        month = from_date_int(params["date"])
+        matching = [
+            dict(record(day), date_int=str(date_int(day)))
+            for day in days
+            if (day.year, day.month) == (month.year, month.month)
+        ]
+        return {"month": {"day": matching}}
+
+    return route
+
+
+def _food_day(params):
+    time.sleep(0.02)
+    return {"food_entries": {"food_entry": {"food_entry_id": params["date"]}}}
+
+
+@pytest.fixture
+def client(stub_api):
+    stub_api.routes["food_entries.get_month"] = _month_route(
+        FOOD_DAYS, lambda day: {"calories": "10"}
+    )
+    stub_api.routes["food_entries.get"] = _food_day
+    stub_api.routes["exercise_entries.get_month"] = _month_route(
+        FOOD_DAYS[:1], lambda day: {"calories": "300"}
+    )
+    stub_api.routes["exercise_entries.get"] = {
+        "exercise_entries": {"exercise_entry": [{"exercise_id": "1"}]}
+    }
+    stub_api.routes["weights.get_month"] = _month_route(
+        FOOD_DAYS[1:3], lambda day: {"weight_kg": "70"}
+    )
+    fs = Fatsecret("key", "secret", session_token=("token", "secret"))
+    fs.oauth.base_url = stub_api.url
+    return fs
+
+
+def test_food_range_fetches_only_days_with_entries(stub_api, client):
+    days = list(
+        client.food_entries_get_range(
+            datetime.date(2024, 1, 31), datetime.datetime(2024, 3, 10)
+        )
+    )
+    assert [date for date, _ in days] == FOOD_DAYS[1:4]
+    assert days[0][1] == [{"food_entry_id": str(date_int(FOOD_DAYS[1]))}]
+    assert len(stub_api.calls("food_entries.get_month")) == 3
+    assert len(stub_api.calls("food_entries.get")) == 3
+
+
+def test_food_range_is_concurrent(client):
+    started = time.monotonic()
+    days = list(
+        client.food_entries_get_range(
+            datetime.date(2024, 1, 1), datetime.date(2024, 3, 31), max_concurrency=5
+        )
+    )
+    assert len(days) == 5
+    assert time.monotonic() - started < 5 * 0.02 + 0.08
+
+
+def test_range_raises_failing_day(stub_api, client):
+    stub_api.routes["food_entries.get"] = {"error": {"code": 106, "message": "bad"}}
+    with pytest.raises(ParameterError):
+        list(
+            client.food_entries_get_range(
+                datetime.date(2024, 1, 1), datetime.date(2024, 1, 31)
+            )
+        )
+
+
+def test_exercise_and_weight_ranges(stub_api, client):
+    start, end = datetime.date(2024, 1, 1), datetime.date(2024, 2, 29)
+    assert list(client.exercise_entries_get_range(start, end)) == [
+        (FOOD_DAYS[0], [{"exercise_id": "1"}])
+    ]
+    weights = list(client.weights_get_range(start, end))
+    assert [(date, day["weight_kg"]) for date, day in weights] == [
+        (FOOD_DAYS[1], "70"),
+        (FOOD_DAYS[2], "70"),
+    ]
+    assert not stub_api.calls("weights.get")
+
+
+def test_async_ranges(stub_api, client):
+    pytest.importorskip("aiohttp")
+
+    async def run():
+        async with AsyncFatsecret(
+            "key", "secret", session_token=("token", "secret")
+        ) as fs:
+            fs.oauth.base_url = stub_api.url
+            start, end = datetime.date(2024, 1, 1), datetime.date(2024, 3, 31)
+            food = [date async for date, _ in fs.food_entries_get_range(start, end)]
+            weights = [date async for date, _ in fs.weights_get_range(start, end)]
+            return food, weights
+
+    food, weights = asyncio.run(run())
+    assert food == FOOD_DAYS
+    assert weights == FOOD_DAYS[1:3]
@@ -0,0 +1,105 @@
+import datetime
+import os
+import subprocess
+import sys
+
+import pytest
+
+pyarrow = pytest.importorskip("pyarrow")
+pyarrow_csv = pytest.importorskip("pyarrow.csv")
+pyarrow_ipc = pytest.importorskip("pyarrow.ipc")
+pyarrow_parquet = pytest.importorskip("pyarrow.parquet")
+
+import fatsecret
+from fatsecret import ColumnarWriter, DiaryExporter, Fatsecret
+from fatsecret.export import FOOD_ENTRY_COLUMNS, WEIGHT_COLUMNS, record_batches
+from fatsecret.sync import date_int, from_date_int
+
+DAYS = [datetime.date(2024, 1, 5), datetime.date(2024, 2, 10)]
+
+
+def _entry(day, number):
+    return {
+        "food_entry_id": f"{date_int(day)}{number}",
+        "food_entry_name": "Apple",
+        "date_int": str(date_int(day)),
+        "calories": "52",
+        "protein": "0.26",
+        "fat": "",
+        "unexpected": "ignored",
+    }
+
+
+@pytest.fixture
+def client(stub_api):
+    def month(params):
+        first = from_date_int(params["date"])
+        days = [
+            {"date_int": str(date_int(day)), "calories": "104", "weight_kg": "70.5"}
+            for day in DAYS
+            if (day.year, day.month) == (first.year, first.month)
+        ]
+        return {"month": {"day": days}}
+
+    stub_api.routes["food_entries.get_month"] = month
+    stub_api.routes["weights.get_month"] = month
+    stub_api.routes["food_entries.get"] = lambda params: {
+        "food_entries": {
+            "food_entry": [_entry(from_date_int(params["date"]), n) for n in (1, 2)]
+        }
+    }
+    fs = Fatsecret("key", "secret", session_token=("token", "secret"))
+    fs.oauth.base_url = stub_api.url
+    return fs
+
+
+def test_package_import_does_not_load_pyarrow():
+    code = "import fatsecret, sys; assert 'pyarrow' not in sys.modules"
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    subprocess.run([sys.executable, "-c", code], check=True, env=env)
+    assert fatsecret.ColumnarWriter is ColumnarWriter
+
+
+def test_record_batches_are_typed_and_bounded():
+    rows = [_entry(DAYS[0], n) for n in range(5)]
+    batches = list(record_batches(rows, FOOD_ENTRY_COLUMNS, batch_size=2))
+    assert [batch.num_rows for batch in batches] == [2, 2, 1]
+
+    table = pyarrow.Table.from_batches(batches)
+    assert table.schema.field("calories").type == pyarrow.float64()
+    assert table.schema.field("date_int").type == pyarrow.date32()
+    assert "unexpected" not in table.schema.names
+    assert table.column("calories").to_pylist() == [52.0] * 5
+    assert table.column("fat").null_count == 5
+    assert {"added_sugars", "vitamin_d"} <= set(table.schema.names)
+    assert table.column("date_int")[0].as_py() == DAYS[0]
+
+
+def test_export_food_entries_to_parquet(client, tmp_path):
+    path = str(tmp_path / "food.parquet")
+    exporter = DiaryExporter(client, batch_size=3)
+    assert exporter.export_food_entries(path, DAYS[0], DAYS[-1]) == 4
+
+    parquet = pyarrow_parquet.ParquetFile(path)
+    assert parquet.metadata.num_row_groups == 2
+    table = parquet.read()
+    assert table.column("date_int").to_pylist() == [DAYS[0]] * 2 + [DAYS[1]] * 2
+    assert table.column("protein").to_pylist() == [0.26] * 4
+
+
+def test_export_weights_to_csv_and_arrow(client, tmp_path):
+    exporter = DiaryExporter(client)
+    csv_path = str(tmp_path / "weights.csv")
+    assert exporter.export_weights(csv_path, DAYS[0], DAYS[-1]) == 2
+    table = pyarrow_csv.read_csv(csv_path)
+    assert table.column("weight_kg").to_pylist() == [70.5, 70.5]
+
+    arrow_path = str(tmp_path / "summaries.data")
+    assert exporter.export_food_summaries(arrow_path, DAYS[0], DAYS[-1], format="arrow")
+    with pyarrow_ipc.open_file(arrow_path) as reader:
+        assert reader.read_all().column("calories").to_pylist() == [104.0, 104.0]
+
+
+def test_writer_rejects_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        ColumnarWriter(str(tmp_path / "weights.txt"), WEIGHT_COLUMNS)
@@ -0,0 +1,107 @@
+import datetime
+import pickle
+
+from fatsecret import Food, FoodEntry, Recipe, SavedMeal, Serving, WeightDay
+
+FOOD = {
+    "food_id": "33691",
+    "food_name": "Apple",
+    "food_type": "Generic",
+    "food_url": "https://www.fatsecret.com/calories-nutrition/generic/apple",
+    "servings": {
+        "serving": [
+            {
+                "serving_id": "1",
+                "serving_description": "1 medium",
+                "metric_serving_amount": "182.000",
+                "metric_serving_unit": "g",
+                "number_of_units": "1.000",
+                "measurement_description": "medium",
+                "calories": "95",
+                "protein": "0.47",
+                "fat": "",
+            },
+            {
+                "serving_id": "2",
+                "serving_description": "100 g",
+                "metric_serving_amount": "100.000",
+                "metric_serving_unit": "g",
+                "is_default": "1",
+                "calories": "52",
+            },
+        ]
+    },
+}
+
+
+def test_food_parses_numbers_once():
+    food = Food.from_dict(FOOD)
+    assert food.food_id == 33691
+    assert [serving.serving_id for serving in food.servings] == [1, 2]
+
+    medium = food.servings[0]
+    assert medium.metric_serving_amount == 182.0
+    assert medium.calories == 95.0
+    assert medium.protein == 0.47
+    assert medium.fat is None
+    assert medium.nutrients() == {"calories": 95.0, "protein": 0.47}
+    assert food.default_serving() is food.servings[1]
+    assert not hasattr(medium, "__dict__")
+
+
+def test_single_serving_and_interned_labels():
+    food = Food.from_dict(
+        dict(FOOD, servings={"serving": FOOD["servings"]["serving"][0]})
+    )
+    other = Food.from_dict(FOOD)
+    assert len(food.servings) == 1
+    assert food.food_type is other.food_type
+    assert food.servings[0].metric_serving_unit is other.servings[1].metric_serving_unit
+
+
+def test_round_trip_and_equality():
+    food = Food.from_dict(FOOD)
+    data = food.to_dict()
+    assert data["servings"][0]["calories"] == 95.0
+    assert "fat" not in data["servings"][0]
+    assert pickle.loads(pickle.dumps(food)) == food
+
+    serving = Serving(serving_id=3, calories=10.0)
+    assert serving.calories == 10.0
+    assert serving.protein is None
+    assert Food(food_id=1, servings=[serving]).servings == (serving,)
+
+
+def test_food_entries_and_weights():
+    entries = FoodEntry.many(
+        {"food_entry_id": "7", "meal": "Lunch", "date_int": "19723", "calories": "52"}
+    )
+    assert len(entries) == 1
+    assert entries[0].date_int == datetime.date(2024, 1, 1)
+    assert entries[0].calories == 52.0
+    assert FoodEntry.many(None) == []
+
+    day = WeightDay.from_dict({"date_int": "19723", "weight_kg": "70.5"})
+    assert day.weight_kg == 70.5
+    assert day.weight_comment is None
+
+
+def test_recipe_and_saved_meal():
+    recipe = Recipe.from_dict(
+        {
+            "recipe_id": "91",
+            "recipe_name": "Soup",
+            "number_of_servings": "4",
+            "recipe_types": {"recipe_type": ["Soup", "Main Dish"]},
+            "serving_sizes": {"serving": {"serving_size": "1 bowl", "calories": "210"}},
+        }
+    )
+    assert recipe.recipe_id == 91
+    assert recipe.recipe_types == ("Soup", "Main Dish")
+    assert recipe.calories == 210.0
+
+    searched = Recipe.from_dict({"recipe_nutrition": {"fat": "3.5"}})
+    assert searched.fat == 3.5
+
+    meal = SavedMeal.from_dict({"saved_meal_id": "3", "meals": "Breakfast,Lunch"})
+    assert meal.meals == ("Breakfast", "Lunch")
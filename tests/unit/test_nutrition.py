@@ -0,0 +1,99 @@
+import datetime
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from fatsecret import Fatsecret, NutritionEngine
+
+APPLE = {
+    "food_id": "1",
+    "servings": {
+        "serving": [
+            {
+                "serving_id": "10",
+                "number_of_units": "1",
+                "calories": "95",
+                "fat": "0.3",
+            },
+            {"serving_id": "11", "number_of_units": "100", "calories": "52"},
+        ]
+    },
+}
+BREAD = {
+    "food_id": "2",
+    "servings": {"serving": {"serving_id": "20", "calories": "80", "protein": "3"}},
+}
+
+
+@pytest.fixture
+def client(stub_api):
+    foods = {"1": APPLE, "2": BREAD}
+    stub_api.routes["food.get"] = lambda params: {"food": foods[params["food_id"]]}
+    stub_api.routes["saved_meal_items.get"] = {
+        "saved_meal_items": {
+            "saved_meal_item": [
+                {"food_id": "1", "serving_id": "10", "number_of_units": "2"},
+                {"food_id": "2", "serving_id": "20", "number_of_units": "1.5"},
+            ]
+        }
+    }
+    fs = Fatsecret("key", "secret", session_token=("token", "secret"))
+    fs.oauth.base_url = stub_api.url
+    return fs
+
+
+def test_totals_scale_by_units():
+    engine = NutritionEngine(capacity=1)
+    engine.add_food(APPLE)
+    engine.add_food(BREAD)
+    assert len(engine) == 3
+    assert engine.matrix.shape[0] == 3
+
+    totals = engine.totals(
+        [
+            {"serving_id": "10", "number_of_units": "2"},
+            {"serving_id": "11", "number_of_units": "150"},
+        ]
+    )
+    assert totals["calories"] == pytest.approx(2 * 95 + 1.5 * 52)
+    assert totals["fat"] == pytest.approx(0.6)
+    assert totals["protein"] == 0
+
+
+def test_unknown_foods_are_fetched_once(stub_api, client):
+    engine = NutritionEngine(client)
+    totals = engine.saved_meal_totals(5)
+    assert totals["calories"] == pytest.approx(2 * 95 + 1.5 * 80)
+    assert totals["protein"] == pytest.approx(4.5)
+
+    engine.saved_meal_totals(5)
+    assert len(stub_api.calls("food.get")) == 2
+
+
+def test_unknown_serving_without_client():
+    engine = NutritionEngine()
+    with pytest.raises(KeyError):
+        engine.totals([{"serving_id": "10", "number_of_units": "1"}])
+
+
+def test_daily_totals_and_recipes():
+    engine = NutritionEngine()
+    engine.add_food(APPLE)
+    engine.add_food(BREAD)
+    entries = [
+        {"serving_id": "10", "number_of_units": "1", "date_int": "19723"},
+        {"serving_id": "20", "number_of_units": "2", "date_int": "19724"},
+        {"serving_id": "20", "number_of_units": "1", "date_int": "19723"},
+    ]
+    daily = engine.daily_totals(entries)
+    assert list(daily) == [datetime.date(2024, 1, 1), datetime.date(2024, 1, 2)]
+    assert daily[datetime.date(2024, 1, 1)]["calories"] == pytest.approx(175)
+    assert daily[datetime.date(2024, 1, 2)]["protein"] == pytest.approx(6)
+
+    recipe = {
+        "number_of_servings": "2",
+        "ingredients": {"ingredient": entries[:2]},
+    }
+    assert engine.recipe_totals(recipe)["calories"] == pytest.approx(255)
+    assert engine.recipe_totals(recipe, per_serving=True)["calories"] == 127.5
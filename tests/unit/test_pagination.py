@@ -0,0 +1,131 @@
+import asyncio
+
+import pytest
+
+from fatsecret import AsyncFatsecret, Fatsecret, GeneralError
+
+TOTAL = 7
+
+
+def search_route(container, item_key):
+    def route(params):
+        page_number = int(params.get("page_number", 0))
+        max_results = int(params.get("max_results", 20))
+        start = page_number * max_results
+        items = [
+            {f"{item_key}_id": str(i)}
+            for i in range(start, min(start + max_results, TOTAL))
+        ]
+        body = {
+            "max_results": str(max_results),
+            "page_number": str(page_number),
+            "total_results": str(TOTAL),
+        }
+        if len(items) == 1:
+            body[item_key] = items[0]
+        elif items:
+            body[item_key] = items
+        return {container: body}
+
+    return route
+
+
+@pytest.fixture
+def client(stub_api):
+    stub_api.routes["foods.search"] = search_route("foods", "food")
+    stub_api.routes["recipes.search"] = search_route("recipes", "recipe")
+    fs = Fatsecret("key", "secret")
+    fs.oauth.base_url = stub_api.url
+    return fs
+
+
+def test_foods_search_sends_page_zero(client, stub_api):
+    client.foods_search("apple", page_number=0, max_results=3)
+    assert stub_api.calls("foods.search")[0]["page_number"] == "0"
+    assert stub_api.calls("foods.search")[0]["max_results"] == "3"
+
+
+def test_foods_search_page_keeps_totals(client):
+    page = client.foods_search_page("apple", page_number=2, max_results=3)
+    assert page.items == [{"food_id": "6"}]
+    assert page.total_results == TOTAL
+    assert page.page_number == 2
+
+
+def test_iter_foods_search_stops_at_total_results(client, stub_api):
+    foods = list(client.iter_foods_search("apple", page_size=3))
+    assert [f["food_id"] for f in foods] == [str(i) for i in range(TOTAL)]
+    assert [c["page_number"] for c in stub_api.calls("foods.search")] == ["0", "1", "2"]
+
+
+def test_iter_foods_search_is_lazy(client, stub_api):
+    foods = client.iter_foods_search("apple", page_size=3)
+    assert stub_api.requests == []
+    next(foods)
+    foods.close()
+    assert len(stub_api.calls("foods.search")) <= 2
+
+
+def test_iter_recipes_search_exact_multiple(client, stub_api):
+    recipes = list(client.iter_recipes_search("soup", recipe_type="Main", page_size=7))
+    assert len(recipes) == TOTAL
+    assert len(stub_api.calls("recipes.search")) == 1
+    assert stub_api.calls("recipes.search")[0]["recipe_type"] == "Main"
+
+
+def test_iter_rejects_oversized_pages(client):
+    with pytest.raises(ValueError):
+        client.iter_foods_search("apple", page_size=51)
+
+
+def test_async_iter_foods_search(stub_api):
+    pytest.importorskip("aiohttp")
+    stub_api.routes["foods.search"] = search_route("foods", "food")
+
+    async def run():
+        async with AsyncFatsecret("key", "secret") as fs:
+            fs.oauth.base_url = stub_api.url
+            return [f async for f in fs.iter_foods_search("apple", page_size=3)]
+
+    assert len(asyncio.run(run())) == TOTAL
+    assert len(stub_api.calls("foods.search")) == 3
+
+
+def test_foods_search_all_returns_page_order(client, stub_api):
+    foods = list(client.foods_search_all("apple", page_size=2, max_concurrency=3))
+    assert [f["food_id"] for f in foods] == [str(i) for i in range(TOTAL)]
+    pages = sorted(int(c["page_number"]) for c in stub_api.calls("foods.search"))
+    assert pages == [0, 1, 2, 3]
+
+
+def test_recipes_search_all_respects_max_total(client, stub_api):
+    recipes = list(client.recipes_search_all("soup", page_size=2, max_total=3))
+    assert [r["recipe_id"] for r in recipes] == ["0", "1", "2"]
+    assert len(stub_api.calls("recipes.search")) == 2
+
+
+def test_foods_search_all_raises_page_errors(client, stub_api):
+    route = search_route("foods", "food")
+
+    def failing(params):
+        if params.get("page_number") == "2":
+            return {"error": {"code": 12, "message": "Too many requests"}}
+        return route(params)
+
+    stub_api.routes["foods.search"] = failing
+    with pytest.raises(GeneralError):
+        list(client.foods_search_all("apple", page_size=2))
+
+
+def test_async_recipes_search_all(stub_api):
+    pytest.importorskip("aiohttp")
+    stub_api.routes["recipes.search"] = search_route("recipes", "recipe")
+
+    async def run():
+        async with AsyncFatsecret("key", "secret") as fs:
+            fs.oauth.base_url = stub_api.url
+            return [r async for r in fs.recipes_search_all("soup", page_size=3)]
+
+    assert [r["recipe_id"] for r in asyncio.run(run())] == [
+        str(i) for i in range(TOTAL)
+    ]
@@ -0,0 +1,52 @@
+from fatsecret import Fatsecret, FatsecretPool, ResponseCache
+
+
+def test_handles_share_session_and_cache():
+    cache = ResponseCache()
+    pool = FatsecretPool("key", "secret", cache=cache, pool_maxsize=16)
+    alice = pool.get(("alice", "a-secret"))
+    bob = pool.get(("bob", "b-secret"))
+
+    assert isinstance(alice, Fatsecret)
+    assert alice.session is bob.session is pool.client.session
+    assert alice.cache is cache
+    assert alice.access_token == "alice"
+    assert bob.signer.token == "bob"
+    assert pool.client.access_token is None
+    adapter = alice.session.get_adapter("https://")
+    assert adapter.poolmanager.connection_pool_kw["maxsize"] == 16
+
+
+def test_handles_are_reused_and_evicted_lru():
+    pool = FatsecretPool("key", "secret", max_handles=2)
+    first = pool.get(("a", "1"))
+    pool.get(("b", "2"))
+    assert pool.get(("a", "1")) is first
+    pool.get(("c", "3"))
+
+    assert len(pool) == 2
+    assert pool.get(("a", "1")) is first
+    assert pool.hits == 2
+    assert pool.misses == 3
+    assert pool.get(("b", "2")) is not None
+    assert pool.misses == 4
+
+
+def test_anonymous_handle_is_template():
+    pool = FatsecretPool("key", "secret")
+    assert pool.get() is pool.client
+
+
+def test_closing_a_handle_keeps_shared_session_open(stub_api):
+    stub_api.routes["profile.get"] = lambda params: {
+        "profile": {"token": params["oauth_token"]}
+    }
+    with FatsecretPool("key", "secret") as pool:
+        pool.client.oauth.base_url = stub_api.url
+        alice = pool.get(("alice", "s"))
+        alice.close()
+        bob = pool.get(("bob", "s"))
+
+        assert bob.profile_get() == {"token": "bob"}
+        assert alice.profile_get() == {"token": "alice"}
+        assert len(stub_api.requests) == 2
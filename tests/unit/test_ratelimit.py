@@ -0,0 +1,146 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+
+import pytest
+
+from fatsecret import Fatsecret, GeneralError, RateLimiter, RateLimitExceeded
+
+
+def test_burst_then_fail_fast():
+    limiter = RateLimiter(rate=1, burst=3, block=False)
+    for _ in range(3):
+        limiter.acquire()
+    with pytest.raises(RateLimitExceeded) as excinfo:
+        limiter.acquire()
+    assert excinfo.value.code == 12
+    assert isinstance(excinfo.value, GeneralError)
+    assert limiter.stats()["rejected"] == 1
+
+
+def test_blocking_waits_for_refill():
+    limiter = RateLimiter(rate=50, burst=1)
+    started = time.monotonic()
+    for _ in range(4):
+        limiter.acquire()
+    elapsed = time.monotonic() - started
+    assert elapsed >= 0.05
+    stats = limiter.stats()
+    assert stats["acquired"] == 4
+    assert stats["max_wait"] > 0
+    assert stats["waiting"] == 0
+
+
+def test_timeout_raises():
+    limiter = RateLimiter(rate=0.1, burst=1, timeout=0.01)
+    limiter.acquire()
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire()
+
+
+def test_daily_quota():
+    limiter = RateLimiter(rate=1000, daily_quota=2)
+    limiter.acquire()
+    limiter.acquire()
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire()
+    assert limiter.used_today() == 2
+
+
+def test_queue_depth_counts_blocked_threads():
+    limiter = RateLimiter(rate=20, burst=1)
+    limiter.acquire()
+    depths = []
+    threads = [threading.Thread(target=limiter.acquire) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.01)
+    depths.append(limiter.stats()["waiting"])
+    for thread in threads:
+        thread.join()
+    assert depths[0] >= 1
+    assert limiter.stats()["waiting"] == 0
+
+
+def _drain(path, results):
+    limiter = RateLimiter(rate=0.001, burst=5, path=path, block=False)
+    taken = 0
+    for _ in range(5):
+        try:
+            limiter.acquire()
+            taken += 1
+        except RateLimitExceeded:
+            pass
+    results.put(taken)
+
+
+def test_file_bucket_is_shared_across_processes(tmp_path):
+    path = str(tmp_path / "bucket")
+    ctx = multiprocessing.get_context("fork")
+    results = ctx.Queue()
+    workers = [ctx.Process(target=_drain, args=(path, results)) for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(10)
+    assert sum(results.get() for _ in workers) == 5
+    assert RateLimiter(rate=1, path=path).used_today() == 5
+
+
+def test_async_acquire():
+    limiter = RateLimiter(rate=100, burst=1)
+
+    async def run():
+        for _ in range(3):
+            await limiter.acquire_async()
+
+    asyncio.run(run())
+    assert limiter.stats()["acquired"] == 3
+
+
+def test_async_acquire_waits_for_file_lock_off_the_loop(tmp_path):
+    fcntl = pytest.importorskip("fcntl")
+    path = str(tmp_path / "bucket")
+    limiter = RateLimiter(rate=10, path=path)
+
+    async def run():
+        ticks = 0
+        with open(path, "wb") as holder:
+            fcntl.flock(holder, fcntl.LOCK_EX)
+            acquire = asyncio.ensure_future(limiter.acquire_async())
+            for _ in range(5):
+                await asyncio.sleep(0.01)
+                ticks += 1
+            assert not acquire.done()
+            fcntl.flock(holder, fcntl.LOCK_UN)
+        await asyncio.wait_for(acquire, 2)
+        return ticks
+
+    assert asyncio.run(run()) == 5
+    assert limiter.used_today() == 1
+
+
+def test_client_close_releases_bucket_file(tmp_path):
+    limiter = RateLimiter(rate=10, path=str(tmp_path / "bucket"))
+    fs = Fatsecret("key", "secret", rate_limiter=limiter)
+    limiter.acquire()
+    assert limiter._state._fd is not None
+
+    fs.close()
+    assert limiter._state._fd is None
+    limiter.acquire()
+    assert limiter.used_today() == 2
+    limiter.close()
+
+
+def test_client_limits_sent_requests_only(stub_api):
+    stub_api.routes["food.get"] = {"food": {"food_id": "1"}}
+    limiter = RateLimiter(rate=0.001, burst=1, block=False)
+    fs = Fatsecret("key", "secret", rate_limiter=limiter)
+    fs.oauth.base_url = stub_api.url
+
+    fs.food_get("1")
+    with pytest.raises(RateLimitExceeded):
+        fs.food_get("1")
+    assert len(stub_api.requests) == 1
@@ -0,0 +1,115 @@
+import asyncio
+import datetime
+
+import pytest
+
+from fatsecret import AsyncFatsecret, Fatsecret
+from fatsecret.reconcile import plan_food_entries
+
+DAY = datetime.datetime(2024, 1, 1)
+
+
+def _entry(food_id, units="1", meal="Breakfast", serving="1", entry_id=None):
+    entry = {
+        "food_id": str(food_id),
+        "food_entry_name": f"Food {food_id}",
+        "serving_id": serving,
+        "number_of_units": units,
+        "meal": meal,
+    }
+    if entry_id is not None:
+        entry["food_entry_id"] = str(entry_id)
+    return entry
+
+
+CURRENT = [
+    _entry(1, "1.000", entry_id=11),
+    _entry(2, "2.000", entry_id=12),
+    _entry(2, "1.000", meal="Dinner", entry_id=13),
+    _entry(3, entry_id=14),
+]
+DESIRED = [
+    _entry(1, "1", meal="breakfast"),
+    _entry(2, "1", meal="Dinner"),
+    _entry(2, "3", meal="Lunch"),
+    _entry(4, "2"),
+]
+
+
+def test_plan_is_minimal():
+    plan = plan_food_entries(CURRENT, DESIRED)
+    assert [entry["food_entry_id"] for entry in plan.unchanged] == ["11", "13"]
+    assert [(op.current["food_entry_id"], op.changes) for op in plan.edits] == [
+        ("12", {"num_units": "3", "meal": "Lunch"})
+    ]
+    assert [op.desired["food_id"] for op in plan.creates] == ["4"]
+    assert [op.current["food_entry_id"] for op in plan.deletes] == ["14"]
+    assert [op.action for op in plan.operations] == ["delete", "edit", "create"]
+
+    assert not plan_food_entries(CURRENT, CURRENT)
+    assert len(plan_food_entries(None, DESIRED).creates) == 4
+
+
+def test_edit_prefers_the_closest_entry():
+    current = [_entry(5, "1", meal="Lunch", entry_id=1), _entry(5, "2", entry_id=2)]
+    plan = plan_food_entries(current, [_entry(5, "3")])
+    assert plan.edits[0].current["food_entry_id"] == "2"
+    assert plan.edits[0].changes == {"num_units": "3"}
+    assert plan.deletes[0].current["food_entry_id"] == "1"
+
+
+def test_creates_need_every_field():
+    unnamed = dict(_entry(4, "2"), food_entry_name="")
+    with pytest.raises(ValueError, match="food_entry_name"):
+        plan_food_entries(CURRENT, [unnamed])
+
+    # An existing entry of the same food is edited and keeps its name.
+    plan = plan_food_entries(CURRENT, [dict(_entry(3, "2"), food_entry_name=None)])
+    assert plan.edits[0].changes == {"num_units": "2"}
+
+
+@pytest.fixture
+def routes(stub_api):
+    stub_api.routes["food_entries.get"] = {"food_entries": {"food_entry": CURRENT}}
+    stub_api.routes["food_entry.create"] = {"food_entry_id": {"value": "99"}}
+    stub_api.routes["food_entry.edit"] = {"success": {"value": "1"}}
+    stub_api.routes["food_entry.delete"] = lambda params: {
+        "error": {"code": 207, "message": "Invalid ID"}
+    }
+    return stub_api
+
+
+def test_reconcile_reports_each_operation(routes):
+    fs = Fatsecret("key", "secret", session_token=("token", "secret"))
+    fs.oauth.base_url = routes.url
+    result = fs.food_entries_reconcile(DAY, DESIRED)
+
+    assert [r.key.action for r in result.results] == ["delete", "edit", "create"]
+    assert not result.ok
+    assert [r.key.action for r in result.failed] == ["delete"]
+    assert result.results[1].value is True
+
+    (edit,) = routes.calls("food_entry.edit")
+    assert (edit["food_entry_id"], edit["number_of_units"], edit["meal"]) == (
+        "12",
+        "3",
+        "Lunch",
+    )
+    (create,) = routes.calls("food_entry.create")
+    assert create["food_id"] == "4"
+    assert len(routes.calls("food_entries.get")) == 1
+
+
+def test_async_reconcile(routes):
+    pytest.importorskip("aiohttp")
+
+    async def scenario():
+        async with AsyncFatsecret(
+            "key", "secret", session_token=("token", "secret")
+        ) as fs:
+            fs.oauth.base_url = routes.url
+            return await fs.food_entries_reconcile(DAY, DESIRED, max_concurrency=2)
+
+    result = asyncio.run(scenario())
+    assert [r.key.action for r in result.results] == ["delete", "edit", "create"]
+    assert [r.ok for r in result.results] == [False, True, True]
@@ -0,0 +1,90 @@
+import json
+
+import pytest
+import requests
+
+from fatsecret import Fatsecret, GeneralError, ParameterError, responses
+
+
+def make_response(json_data):
+    resp = requests.Response()
+    resp.status_code = 200
+    resp._content = json.dumps(json_data).encode("utf-8")
+    return resp
+
+
+def test_loads_empty_body():
+    assert responses.loads(b"") is None
+
+
+def test_loads_bytes_and_str():
+    assert responses.loads(b'{"a": 1}') == {"a": 1}
+    assert responses.loads('{"a": 1}') == {"a": 1}
+
+
+def test_loads_without_orjson(monkeypatch):
+    monkeypatch.setattr(responses, "orjson", None)
+    assert responses.loads(b'{"a": [1, 2]}') == {"a": [1, 2]}
+
+
+def test_extract_foods():
+    data = {"foods": {"food": [{"food_id": "1"}], "total_results": "1"}}
+    assert responses.extract(data) == [{"food_id": "1"}]
+
+
+def test_extract_food_entries_none():
+    assert responses.extract({"food_entries": None}) == []
+
+
+def test_extract_food_entries_single_dict():
+    entry = {"food_entry_id": "9"}
+    assert responses.extract({"food_entries": {"food_entry": entry}}) == [entry]
+
+
+def test_extract_month():
+    assert responses.extract({"month": {"day": [{"date_int": "1"}]}}) == [
+        {"date_int": "1"}
+    ]
+
+
+def test_extract_profile_auth():
+    data = {"profile": {"auth_token": "t", "auth_secret": "s"}}
+    assert responses.extract(data) == ("t", "s")
+
+
+def test_extract_success():
+    assert responses.extract({"success": {"value": "1"}}) is True
+
+
+def test_extract_unknown_key():
+    assert responses.extract({"unexpected": {}}) is None
+
+
+def test_extract_unknown_error_code_falls_through():
+    data = {"error": {"code": 999, "message": "?"}, "food": {"food_id": "1"}}
+    assert responses.extract(data) == {"food_id": "1"}
+
+
+def test_extract_error_codes():
+    with pytest.raises(GeneralError):
+        responses.extract({"error": {"code": 12, "message": "slow down"}})
+    with pytest.raises(ParameterError):
+        responses.extract({"error": {"code": 106, "message": "bad id"}})
+
+
+def test_valid_response_decodes_once(monkeypatch):
+    calls = []
+    original = responses.loads
+
+    def counting_loads(content):
+        calls.append(content)
+        return original(content)
+
+    monkeypatch.setattr(responses, "loads", counting_loads)
+    response = make_response({"recipe": {"recipe_id": "42"}})
+    assert Fatsecret.valid_response(response) == {"recipe_id": "42"}
+    assert len(calls) == 1
+
+
+def test_valid_response_empty_object():
+    assert Fatsecret.valid_response(make_response({})) is None
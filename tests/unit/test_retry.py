@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+import requests
+
+from fatsecret import (
+    AsyncFatsecret,
+    Fatsecret,
+    GeneralError,
+    ParameterError,
+    RateLimitExceeded,
+    RetryPolicy,
+)
+from fatsecret.retry import NOT_PROCESSED, TRANSIENT, classify
+
+
+def _flaky(failures, code, payload):
+    state = {"calls": 0}
+
+    def route(params):
+        state["calls"] += 1
+        if state["calls"] <= failures:
+            return {"error": {"code": code, "message": "try again"}}
+        return payload
+
+    return route
+
+
+def _client(stub_api, **policy):
+    fs = Fatsecret("key", "secret", retry=RetryPolicy(base_delay=0.001, **policy))
+    fs.oauth.base_url = stub_api.url
+    return fs
+
+
+def test_classify():
+    assert classify(GeneralError(12, "busy")) == NOT_PROCESSED
+    assert classify(GeneralError(1, "unknown")) == TRANSIENT
+    assert classify(ParameterError(106, "bad id")) is None
+    assert classify(RateLimitExceeded("slow down", retry_after=0.5)) == NOT_PROCESSED
+    assert classify(RateLimitExceeded("quota")) is None
+    assert classify(requests.ConnectTimeout()) == NOT_PROCESSED
+    assert classify(requests.ReadTimeout()) == TRANSIENT
+    assert classify(ValueError()) is None
+
+
+def test_backoff_is_bounded():
+    policy = RetryPolicy(base_delay=0.1, max_delay=1.0)
+    delay = 0.1
+    for _ in range(50):
+        delay = policy.backoff(delay)
+        assert 0.1 <= delay <= 1.0
+
+
+def test_read_retried_after_transient_error(stub_api):
+    stub_api.routes["food.get"] = _flaky(2, 1, {"food": {"food_id": "1"}})
+    fs = _client(stub_api)
+    assert fs.food_get("1") == {"food_id": "1"}
+    assert len(stub_api.calls("food.get")) == 3
+    assert fs.retry.retries == 2
+
+
+def test_fatal_error_not_retried(stub_api):
+    stub_api.routes["food.get"] = {"error": {"code": 106, "message": "bad id"}}
+    fs = _client(stub_api)
+    with pytest.raises(ParameterError):
+        fs.food_get("1")
+    assert len(stub_api.calls("food.get")) == 1
+
+
+def test_attempts_exhausted(stub_api):
+    stub_api.routes["food.get"] = _flaky(10, 12, {})
+    fs = _client(stub_api, max_attempts=3)
+    with pytest.raises(GeneralError):
+        fs.food_get("1")
+    assert len(stub_api.calls("food.get")) == 3
+
+
+def test_write_only_retried_when_not_processed(stub_api):
+    stub_api.routes["weight.update"] = _flaky(1, 1, {"success": "1"})
+    fs = _client(stub_api)
+    with pytest.raises(GeneralError):
+        fs.weight_update(70)
+    assert len(stub_api.calls("weight.update")) == 1
+
+    stub_api.routes["food_entry.create"] = _flaky(1, 12, {"food_entry_id": "5"})
+    assert fs.food_entry_create(1, "entry", 2, 1, "lunch") == "5"
+    assert len(stub_api.calls("food_entry.create")) == 2
+
+
+def test_retry_writes_opt_in(stub_api):
+    stub_api.routes["weight.update"] = _flaky(1, 1, {"success": "1"})
+    fs = _client(stub_api, retry_writes=True)
+    fs.weight_update(70)
+    assert len(stub_api.calls("weight.update")) == 2
+
+
+def test_deadline_stops_retries(stub_api):
+    stub_api.routes["food.get"] = _flaky(10, 12, {})
+    fs = Fatsecret(
+        "key",
+        "secret",
+        retry=RetryPolicy(max_attempts=100, base_delay=0.05, deadline=0.2),
+    )
+    fs.oauth.base_url = stub_api.url
+    with pytest.raises(GeneralError):
+        fs.food_get("1")
+    assert 1 < len(stub_api.calls("food.get")) < 10
+
+
+def test_async_retry(stub_api):
+    pytest.importorskip("aiohttp")
+    stub_api.routes["food.get"] = _flaky(1, 12, {"food": {"food_id": "1"}})
+
+    async def run():
+        async with AsyncFatsecret(
+            "key", "secret", retry=RetryPolicy(base_delay=0.001)
+        ) as fs:
+            fs.oauth.base_url = stub_api.url
+            return await fs.food_get("1")
+
+    assert asyncio.run(run()) == {"food_id": "1"}
+    assert len(stub_api.calls("food.get")) == 2
@@ -0,0 +1,123 @@
+import asyncio
+import time
+
+import pytest
+
+from fatsecret import AsyncFatsecret, Fatsecret, FoodSearchIndex, LocalSearch
+from fatsecret.search import AsyncLocalSearch, tokenize
+
+
+def _food(food_id, name, brand=None):
+    food = {"food_id": str(food_id), "food_name": name, "food_type": "Generic"}
+    if brand:
+        food.update(brand_name=brand, food_type="Brand")
+    return food
+
+
+FOODS = [
+    _food(1, "Greek Yogurt"),
+    _food(2, "Greek Yogurt with Honey", "Fage"),
+    _food(3, "Plain Yogurt"),
+    _food(4, "Crème Brûlée"),
+    _food(5, "Yogurt Yogurt Smoothie"),
+]
+
+
+def test_tokenize_folds_case_and_accents():
+    assert tokenize("Crème BRÛLÉE, 2%") == ["creme", "brulee", "2"]
+    assert tokenize(None) == []
+
+
+def test_bm25_ranking_and_filters():
+    index = FoodSearchIndex()
+    index.update(FOODS)
+    index.add(_food(6, "Greek Salad"), region="FR", language="fr")
+
+    ranked = [hit.food["food_id"] for hit in index.search("yogurt")]
+    assert ranked[0] == "5"
+    assert ranked[1:3] == ["1", "3"]
+    assert set(ranked) == {"1", "2", "3", "5"}
+
+    assert [hit.food["food_id"] for hit in index.search("greek yogurt")] == ["1", "2"]
+    assert [hit.food["food_id"] for hit in index.search("fage")] == ["2"]
+    assert [hit.food["food_id"] for hit in index.search("creme brulee")] == ["4"]
+    assert index.search("greek", region="FR", language="fr")[0].food["food_id"] == "6"
+    assert len(index.search("greek")) == 2
+    assert index.search("yogurt", limit=1)[0].food["food_id"] == "5"
+    assert index.search("pizza") == []
+
+
+def test_refresh_and_remove():
+    index = FoodSearchIndex()
+    index.update(FOODS)
+    index.add({"food_id": "3", "food_name": "Skyr", "servings": {"serving": []}})
+    assert len(index) == 5
+    hit = index.search("skyr")[0]
+    assert hit.food["food_type"] == "Generic"
+    assert "servings" not in hit.food
+    assert [h.food["food_id"] for h in index.search("plain")] == []
+
+    index.remove(3)
+    assert 3 not in index
+    assert index.search("skyr") == []
+
+
+@pytest.fixture
+def client(stub_api):
+    stub_api.routes["foods.search"] = {"foods": {"food": FOODS[:3]}}
+    stub_api.routes["food.get"] = lambda params: {
+        "food": _food(params["food_id"], "Blueberry Muffin")
+    }
+    fs = Fatsecret("key", "secret")
+    fs.oauth.base_url = stub_api.url
+    return fs
+
+
+def test_local_search_falls_back_below_threshold(stub_api, client):
+    search = LocalSearch(client, min_results=2)
+    assert len(search.foods_search("yogurt")) == 3
+    assert len(stub_api.calls("foods.search")) == 1
+
+    local = search.foods_search("Yogurt", max_results=2)
+    assert [food["food_id"] for food in local] == ["1", "3"]
+    assert (
+        search.foods_search("yogurt", page_number=1, max_results=2)[0]["food_id"] == "2"
+    )
+    assert (search.hits, search.misses) == (2, 1)
+
+    search.foods_search("honey")
+    assert len(stub_api.calls("foods.search")) == 2
+
+    search.foods_search("yogurt", region="UK")
+    assert len(stub_api.calls("foods.search")) == 3
+
+
+def test_local_search_refetches_stale_foods(stub_api, client):
+    search = LocalSearch(client, min_results=1, max_age=60)
+    search.index.add(_food(1, "Greek Yogurt"), now=time.time() - 120)
+    search.foods_search("greek")
+    assert len(stub_api.calls("foods.search")) == 1
+    search.foods_search("greek")
+    assert len(stub_api.calls("foods.search")) == 1
+
+
+def test_food_get_feeds_the_index(client):
+    search = LocalSearch(client, min_results=1)
+    search.food_get(7)
+    assert search.foods_search("muffin")[0]["food_id"] == "7"
+    assert search.hits == 1
+
+
+def test_async_local_search(stub_api):
+    pytest.importorskip("aiohttp")
+    stub_api.routes["foods.search"] = {"foods": {"food": FOODS[:3]}}
+
+    async def scenario():
+        async with AsyncFatsecret("key", "secret") as fs:
+            fs.oauth.base_url = stub_api.url
+            search = AsyncLocalSearch(fs, min_results=1)
+            await search.foods_search("yogurt")
+            return await search.foods_search("plain")
+
+    assert asyncio.run(scenario())[0]["food_id"] == "3"
+    assert len(stub_api.calls("foods.search")) == 1
@@ -0,0 +1,114 @@
+from rauth.oauth import HmacSha1Signature
+
+from fatsecret import Fatsecret
+from fatsecret.signing import OAuth1Signer, normalize_url, percent_encode
+
+# Credentials from the examples in RFC 5849 section 1.2.
+CONSUMER = ("dpf43f3p2l4k3l03", "kd94hf93k423kf44")
+
+
+def test_percent_encode_unreserved_and_reserved():
+    assert percent_encode("abc-._~") == "abc-._~"
+    assert percent_encode("a b/c=d&e") == "a%20b%2Fc%3Dd%26e"
+    assert percent_encode("é") == "%C3%A9"
+
+
+def test_normalize_url():
+    assert normalize_url("HTTP://Example.com:80/r%20v/X?id=123") == (
+        "http://example.com/r%20v/X"
+    )
+    assert normalize_url("https://www.example.net:8080/?q=1") == (
+        "https://www.example.net:8080/"
+    )
+
+
+def test_rfc5849_base_string_example():
+    """Section 3.4.1.1, including repeated and pre-encoded parameters."""
+    signer = OAuth1Signer(
+        "9djdj82h48djs9d2", "secret", "kkk9d7dh3k39sjv7", version=None
+    )
+    params = [
+        ("b5", "=%3D"),
+        ("a3", "a"),
+        ("c@", ""),
+        ("a2", "r b"),
+        ("c2", ""),
+        ("a3", "2 q"),
+    ]
+    params += signer.oauth_params(nonce="7d8f3e4a", timestamp=137131201).items()
+    assert signer.base_string("POST", "http://example.com/request", params) == (
+        b"POST&http%3A%2F%2Fexample.com%2Frequest&a2%3Dr%2520b%26a3%3D2%2520q"
+        b"%26a3%3Da%26b5%3D%253D%25253D%26c%2540%3D%26c2%3D%26oauth_consumer_key"
+        b"%3D9djdj82h48djs9d2%26oauth_nonce%3D7d8f3e4a%26oauth_signature_method"
+        b"%3DHMAC-SHA1%26oauth_timestamp%3D137131201%26oauth_token%3Dkkk9d7dh3k39sjv7"
+    )
+
+
+def test_rfc5849_token_request_signature():
+    """Section 1.2, token credentials request."""
+    signer = OAuth1Signer(*CONSUMER, "hh5s93j4hdidpola", "hdhd0244k9j7ao03", None)
+    params = signer.oauth_params(nonce="walatlh", timestamp=137131201)
+    params["oauth_verifier"] = "hfdp7dh39dks9884"
+    signature = signer.signature("POST", "https://photos.example.net/token", params)
+    assert signature == "gKgrFCywp7rO0OXSjdot/IHF7IU="
+
+
+def test_rfc5849_resource_request_signature():
+    """Section 1.2, protected resource request.
+
+    The value printed in the RFC is wrong (errata 2550); this is the corrected one.
+    """
+    signer = OAuth1Signer(*CONSUMER, "nnch734d00sl2jdk", "pfkkdhi9sl3r4s00", None)
+    signed = signer.sign(
+        "GET",
+        "http://photos.example.net/photos",
+        {"file": "vacation.jpg", "size": "original"},
+        nonce="chapoH",
+        timestamp=137131202,
+    )
+    assert signed["oauth_signature"] == "MdpQcU8iPSUjWoN/UDMsK2sui9I="
+
+
+def test_sign_matches_rauth():
+    signer = OAuth1Signer("key", "s3cr~t&", "token", "t/secret")
+    params = {"method": "foods.search", "search_expression": "mac & cheese", "max": 5}
+    signed = signer.sign(
+        "GET", "https://platform.fatsecret.com/rest/server.api", params
+    )
+
+    oauth = {k: v for k, v in signed.items() if k.startswith("oauth_")}
+    expected = HmacSha1Signature().sign(
+        "s3cr~t&",
+        "t/secret",
+        "GET",
+        "https://platform.fatsecret.com/rest/server.api",
+        {k: v for k, v in oauth.items() if k != "oauth_signature"},
+        {"params": {k: str(v) for k, v in params.items()}},
+    )
+    assert oauth["oauth_signature"] == expected
+    assert signed["max"] == "5"
+
+
+def test_sign_drops_none_values():
+    signer = OAuth1Signer("key", "secret")
+    params = {"method": "foods.search", "page_number": None}
+    signed = signer.sign("GET", "https://example.com/api", params, "n", 1)
+
+    assert "page_number" not in signed
+    unsigned = {k: v for k, v in signed.items() if k != "oauth_signature"}
+    assert signer.signature("GET", "https://example.com/api", unsigned) == (
+        signed["oauth_signature"]
+    )
+
+
+def test_client_requests_are_signed(stub_api):
+    stub_api.routes["profile.get"] = {"profile": {"weight_measure": "Kg"}}
+    fs = Fatsecret("key", "secret", session_token=("token", "tsecret"))
+    fs.oauth.base_url = stub_api.url
+
+    assert fs.profile_get() == {"weight_measure": "Kg"}
+
+    params = dict(stub_api.calls("profile.get")[0])
+    signature = params.pop("oauth_signature")
+    verifier = OAuth1Signer("key", "secret", "token", "tsecret")
+    assert verifier.signature("GET", stub_api.url, params) == signature
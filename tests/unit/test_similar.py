@@ -0,0 +1,83 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+numpy = pytest.importorskip("numpy")
+
+from fatsecret import Food, SimilarFoods
+from fatsecret.similar import profile
+
+
+def test_package_import_does_not_load_numpy():
+    code = "import fatsecret, sys; assert 'numpy' not in sys.modules"
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    subprocess.run([sys.executable, "-c", code], check=True, env=env)
+
+
+def _food(food_id, name, amount="100", unit="g", **nutrients):
+    serving = dict(
+        {"serving_id": str(food_id), "metric_serving_amount": amount},
+        metric_serving_unit=unit,
+        **{key: str(value) for key, value in nutrients.items()},
+    )
+    return {
+        "food_id": str(food_id),
+        "food_name": name,
+        "servings": {"serving": serving},
+    }
+
+
+FOODS = [
+    _food(1, "Butter", calories=717, fat=81, saturated_fat=51),
+    _food(2, "Margarine", calories=717, fat=80, saturated_fat=15),
+    _food(3, "Lettuce", calories=15, carbohydrate=2.9, fiber=1.3),
+    _food(4, "Spinach", "30", calories=7, carbohydrate=1.1, fiber=0.7, iron=0.8),
+    _food(5, "Chicken breast", calories=165, protein=31, fat=3.6),
+]
+
+
+def test_profile_is_per_100g():
+    half = profile(_food(9, "Half", "50", calories=100))
+    full = profile(_food(9, "Full", "100", calories=200))
+    assert numpy.allclose(half, full)
+    assert profile(_food(9, "Slice", unit="slice", calories=80)) is None
+
+
+def test_nearest_foods():
+    index = SimilarFoods(capacity=2)
+    assert index.update(FOODS + [_food(6, "Bread", unit="slice")]) == 5
+    assert len(index) == 5
+    assert 6 not in index
+
+    nearest = index.nearest(1, k=2)
+    assert len(nearest) == 2
+    assert nearest[0].food_name == "Margarine"
+    assert nearest[0].distance < nearest[1].distance
+
+    greens = index.nearest(_food(7, "Kale", calories=49, carbohydrate=9, fiber=3.6))
+    assert {n.food_id for n in greens[:2]} == {3, 4}
+    assert len(greens) == 5
+
+    batched = index.nearest_many([1, 3, Food.from_dict(FOODS[4])], k=1)
+    assert [result[0].food_id for result in batched] == [2, 4, 3]
+
+    with pytest.raises(KeyError):
+        index.nearest(42)
+
+
+def test_replace_and_persist(tmp_path):
+    index = SimilarFoods()
+    index.update(FOODS)
+    index.add(_food(2, "Margarine light", calories=350, fat=40, saturated_fat=8))
+    assert len(index) == 5
+
+    path = str(tmp_path / "similar.npz")
+    index.save(path)
+    loaded = SimilarFoods.load(path)
+    assert len(loaded) == 5
+    assert loaded.nearest(1, k=4) == index.nearest(1, k=4)
+
+    loaded.add(_food(8, "Ghee", calories=876, fat=99, saturated_fat=62))
+    assert loaded.nearest(1, k=1)[0].food_name == "Ghee"
@@ -0,0 +1,104 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from fatsecret import AsyncFatsecret, Fatsecret, ParameterError
+from fatsecret.singleflight import SingleFlight
+
+
+def _slow(payload, delay=0.2):
+    def route(params):
+        time.sleep(delay)
+        return payload
+
+    return route
+
+
+def _client(stub_api, **kwargs):
+    fs = Fatsecret("key", "secret", **kwargs)
+    fs.oauth.base_url = stub_api.url
+    return fs
+
+
+def test_concurrent_identical_reads_share_one_request(stub_api):
+    stub_api.routes["food.get"] = _slow({"food": {"food_id": "1"}})
+    fs = _client(stub_api)
+    with ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(lambda _: fs.food_get("1"), range(8)))
+    assert all(result == {"food_id": "1"} for result in results)
+    assert len(stub_api.calls("food.get")) == 1
+    assert fs.single_flight.collapsed == 7
+    assert len(fs.single_flight) == 0
+
+
+def test_different_params_and_tokens_are_not_shared(stub_api):
+    stub_api.routes["food.get"] = _slow({"food": {"food_id": "1"}}, 0.1)
+    fs = _client(stub_api)
+    user = _client(stub_api, session_token=("token", "secret"))
+    user.single_flight = fs.single_flight
+    calls = [(fs, "1"), (fs, "2"), (user, "1")]
+    with ThreadPoolExecutor(3) as executor:
+        list(executor.map(lambda call: call[0].food_get(call[1]), calls))
+    assert len(stub_api.calls("food.get")) == 3
+    assert fs.single_flight.collapsed == 0
+
+
+def test_writes_are_never_shared(stub_api):
+    stub_api.routes["food_entry.create"] = _slow({"food_entry_id": "5"}, 0.1)
+    fs = _client(stub_api)
+    with ThreadPoolExecutor(3) as executor:
+        list(
+            executor.map(
+                lambda _: fs.food_entry_create(1, "entry", 2, 1, "lunch"), range(3)
+            )
+        )
+    assert len(stub_api.calls("food_entry.create")) == 3
+
+
+def test_errors_reach_every_waiter():
+    flight = SingleFlight()
+    started = threading.Event()
+
+    def fail():
+        started.set()
+        time.sleep(0.1)
+        raise ParameterError(106, "bad id")
+
+    def follower():
+        started.wait()
+        return flight.do("key", fail)
+
+    with ThreadPoolExecutor(2) as executor:
+        leader = executor.submit(flight.do, "key", fail)
+        other = executor.submit(follower)
+        for future in (leader, other):
+            with pytest.raises(ParameterError):
+                future.result()
+    assert flight.collapsed == 1
+
+
+def test_coalescing_can_be_disabled(stub_api):
+    stub_api.routes["food.get"] = _slow({"food": {"food_id": "1"}}, 0.1)
+    fs = _client(stub_api, coalesce=False)
+    with ThreadPoolExecutor(3) as executor:
+        list(executor.map(lambda _: fs.food_get("1"), range(3)))
+    assert len(stub_api.calls("food.get")) == 3
+
+
+def test_async_reads_share_one_request(stub_api):
+    pytest.importorskip("aiohttp")
+    stub_api.routes["food.get"] = _slow({"food": {"food_id": "1"}}, 0.1)
+
+    async def run():
+        async with AsyncFatsecret("key", "secret") as fs:
+            fs.oauth.base_url = stub_api.url
+            results = await asyncio.gather(*(fs.food_get("1") for _ in range(5)))
+            return results, fs.single_flight.collapsed
+
+    results, collapsed = asyncio.run(run())
+    assert results == [{"food_id": "1"}] * 5
+    assert collapsed == 4
+    assert len(stub_api.calls("food.get")) == 1
@@ -0,0 +1,167 @@
+import datetime
+
+import pytest
+
+from fatsecret import DiarySync, Fatsecret
+from fatsecret.signing import token_key
+from fatsecret.sync import date_int
+
+USER = token_key("token")
+
+JAN_5 = date_int(datetime.date(2024, 1, 5))
+JAN_9 = date_int(datetime.date(2024, 1, 9))
+FEB_2 = date_int(datetime.date(2024, 2, 2))
+
+
+class Diary:
+    """Food, exercise and weight diary served through the stub API."""
+
+    def __init__(self, stub_api):
+        self.food = {
+            JAN_5: [{"food_entry_id": "1", "calories": "100"}],
+            JAN_9: [{"food_entry_id": "2", "calories": "250"}],
+            FEB_2: [{"food_entry_id": "3", "calories": "80"}],
+        }
+        self.exercise = {JAN_5: [{"exercise_id": "2", "calories": "300"}]}
+        self.weights = {JAN_9: "70.5"}
+        stub_api.routes.update(
+            {
+                "food_entries.get_month": self.food_month,
+                "food_entries.get": self.food_day,
+                "exercise_entries.get_month": self.exercise_month,
+                "exercise_entries.get": self.exercise_day,
+                "weights.get_month": self.weight_month,
+            }
+        )
+
+    @staticmethod
+    def _in_month(days, params):
+        month = datetime.date(1970, 1, 1) + datetime.timedelta(int(params["date"]))
+        return [day for day in sorted(days) if _month(day) == (month.year, month.month)]
+
+    def food_month(self, params):
+        days = [
+            {
+                "date_int": str(day),
+                "calories": str(sum(int(e["calories"]) for e in self.food[day])),
+            }
+            for day in self._in_month(self.food, params)
+        ]
+        return {"month": {"day": days}} if days else {"month": {}}
+
+    def food_day(self, params):
+        entries = self.food.get(int(params["date"]))
+        return {"food_entries": {"food_entry": entries} if entries else None}
+
+    def exercise_month(self, params):
+        days = [
+            {"date_int": str(day), "calories": self.exercise[day][0]["calories"]}
+            for day in self._in_month(self.exercise, params)
+        ]
+        return {"month": {"day": days[0] if len(days) == 1 else days}}
+
+    def exercise_day(self, params):
+        return {
+            "exercise_entries": {"exercise_entry": self.exercise[int(params["date"])]}
+        }
+
+    def weight_month(self, params):
+        days = [
+            {"date_int": str(day), "weight_kg": self.weights[day]}
+            for day in self._in_month(self.weights, params)
+        ]
+        return {"month": {"day": days}}
+
+
+def _month(day):
+    date = datetime.date(1970, 1, 1) + datetime.timedelta(day)
+    return date.year, date.month
+
+
+@pytest.fixture
+def client(stub_api):
+    fs = Fatsecret("key", "secret", session_token=("token", "secret"))
+    fs.oauth.base_url = stub_api.url
+    return fs
+
+
+def test_initial_sync_mirrors_diary(stub_api, client, tmp_path):
+    diary = Diary(stub_api)
+    with DiarySync(str(tmp_path / "diary.db")) as store:
+        result = store.sync(
+            client, datetime.date(2024, 1, 1), datetime.date(2024, 2, 10)
+        )
+        assert result == (2, 4, 0)
+        jan = (datetime.date(2024, 1, 1), datetime.date(2024, 1, 31))
+        assert [e["food_entry_id"] for e in store.food_entries(USER, *jan)] == [
+            "1",
+            "2",
+        ]
+        assert store.exercise_entries(USER, *jan) == diary.exercise[JAN_5]
+        assert store.weights(USER, *jan) == {datetime.date(2024, 1, 9): 70.5}
+        assert store.checkpoint(USER) == datetime.date(2024, 2, 10)
+
+
+def test_resync_fetches_only_changed_days(stub_api, client, tmp_path):
+    diary = Diary(stub_api)
+    store = DiarySync(str(tmp_path / "diary.db"))
+    start, end = datetime.date(2024, 1, 1), datetime.date(2024, 2, 10)
+    store.sync(client, start, end)
+    stub_api.requests.clear()
+
+    assert store.sync(client, start, end) == (2, 0, 0)
+    assert not stub_api.calls("food_entries.get")
+
+    diary.food[JAN_9].append({"food_entry_id": "4", "calories": "50"})
+    del diary.food[FEB_2]
+    assert store.sync(client, start, end) == (2, 1, 1)
+    assert [call["date"] for call in stub_api.calls("food_entries.get")] == [str(JAN_9)]
+    entries = store.food_entries(USER, start, end)
+    assert [e["food_entry_id"] for e in entries] == ["1", "2", "4"]
+    store.close()
+
+
+def test_sync_resumes_from_checkpoint(stub_api, client, tmp_path):
+    Diary(stub_api)
+    store = DiarySync(str(tmp_path / "diary.db"))
+    store.sync(client, datetime.date(2024, 1, 1), datetime.date(2024, 1, 20))
+    stub_api.requests.clear()
+
+    assert store.sync(client, end=datetime.date(2024, 2, 10)).months == 2
+    assert store.checkpoint(USER) == datetime.date(2024, 2, 10)
+    store.close()
+
+
+def test_sync_accepts_datetimes(stub_api, client, tmp_path):
+    Diary(stub_api)
+    with DiarySync(str(tmp_path / "diary.db")) as store:
+        result = store.sync(
+            client, datetime.datetime(2024, 1, 1, 8), datetime.datetime(2024, 1, 20, 9)
+        )
+        assert result.months == 1
+        assert store.checkpoint(USER) == datetime.date(2024, 1, 20)
+
+
+def test_older_sync_keeps_checkpoint(stub_api, client, tmp_path):
+    Diary(stub_api)
+    with DiarySync(str(tmp_path / "diary.db")) as store:
+        store.sync(client, datetime.date(2024, 2, 1), datetime.date(2024, 2, 10))
+        store.sync(client, datetime.date(2024, 1, 1), datetime.date(2024, 1, 20))
+        assert store.checkpoint(USER) == datetime.date(2024, 2, 10)
+
+
+def test_access_token_is_not_stored(stub_api, client, tmp_path):
+    Diary(stub_api)
+    path = str(tmp_path / "diary.db")
+    with DiarySync(path) as store:
+        store.sync(client, datetime.date(2024, 1, 1), datetime.date(2024, 1, 20))
+        store.sync(client, end=datetime.date(2024, 1, 20), user="account-7")
+        assert store.checkpoint("account-7") == datetime.date(2024, 1, 20)
+    with open(path, "rb") as handle:
+        assert b"token" not in handle.read()
+
+
+def test_sync_requires_a_user(tmp_path):
+    with DiarySync(str(tmp_path / "diary.db")) as store:
+        with pytest.raises(ValueError):
+            store.sync(Fatsecret("key", "secret"))
@@ -0,0 +1,173 @@
+import asyncio
+import datetime
+import json
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from fatsecret import ApplicationError, AsyncFatsecret, Fatsecret, WriteQueue
+
+
+def _client(stub_api, token):
+    fs = Fatsecret("key", "secret", session_token=(token, "secret"))
+    fs.oauth.base_url = stub_api.url
+    return fs
+
+
+def _recording(log, delay=0.0):
+    def route(params):
+        time.sleep(delay)
+        log.append((params["oauth_token"], params["food_entry_name"]))
+        return {"food_entry_id": {"value": str(len(log))}}
+
+    return route
+
+
+ARGS = ("33691", "Apple", "1", 1, "breakfast")
+
+
+def test_writes_run_in_order_per_user(stub_api, tmp_path):
+    log = []
+    stub_api.routes["food_entry.create"] = _recording(log, delay=0.01)
+    alice, bob = _client(stub_api, "alice"), _client(stub_api, "bob")
+
+    with WriteQueue(str(tmp_path / "journal.db"), max_workers=2) as queue:
+        handles = []
+        for number in range(5):
+            for client in (alice, bob):
+                args = ("33691", f"{client.access_token} {number}") + ARGS[2:]
+                handles.append(queue.submit(client, "food_entry_create", *args))
+        assert 0 < queue.depth <= 10
+        assert queue.flush(timeout=5)
+        assert queue.depth == 0
+        assert queue.journaled() == 0
+        assert queue.completed == 10
+
+    assert all(handle.done() for handle in handles)
+    for user in ("alice", "bob"):
+        names = [name for token, name in log if token == user]
+        assert names == [f"{user} {number}" for number in range(5)]
+
+
+def test_failed_write_is_reported_and_others_continue(stub_api, tmp_path):
+    stub_api.routes["food_entry.delete"] = {
+        "error": {"code": 207, "message": "Invalid ID"}
+    }
+    stub_api.routes["weight.update"] = {"success": {"value": "1"}}
+    client = _client(stub_api, "alice")
+    with WriteQueue(str(tmp_path / "journal.db")) as queue:
+        failed = queue.submit(client, "food_entry_delete", "5")
+        ok = queue.submit(
+            client, "weight_update", 70.5, date=datetime.datetime(2024, 1, 1)
+        )
+        assert ok.result(timeout=5) is True
+        with pytest.raises(ApplicationError):
+            failed.result()
+        assert (queue.completed, queue.failed) == (1, 1)
+        assert queue.journaled() == 0
+
+
+def test_rejects_reads_and_anonymous_clients(stub_api, tmp_path):
+    with WriteQueue(str(tmp_path / "journal.db")) as queue:
+        with pytest.raises(ValueError):
+            queue.submit(_client(stub_api, "alice"), "food_get", "1")
+        anonymous = Fatsecret("key", "secret")
+        with pytest.raises(ValueError):
+            queue.submit(anonymous, "food_entry_create", *ARGS)
+
+
+def test_journal_keys_users_without_their_token(stub_api, tmp_path):
+    stub_api.routes["food_entry.create"] = _recording([])
+    client = _client(stub_api, "alice")
+    with WriteQueue(str(tmp_path / "journal.db")) as queue:
+        handle = queue.submit(client, "food_entry_create", *ARGS)
+        assert "alice" not in handle.user and len(handle.user) == 64
+        assert queue.submit(client, "food_entry_create", *ARGS).user == handle.user
+        assert queue.submit(client, "food_entry_create", *ARGS, user="7").user == "7"
+        assert queue.flush(timeout=5)
+
+
+def test_rejects_async_clients(tmp_path):
+    pytest.importorskip("aiohttp")
+    path = str(tmp_path / "journal.db")
+    client = AsyncFatsecret("key", "secret", session_token=("alice", "secret"))
+    with WriteQueue(path) as queue:
+        with pytest.raises(ValueError, match="synchronous"):
+            queue.submit(client, "food_entry_create", *ARGS)
+        assert queue.journaled() == 0
+
+    # A client factory may still hand replayed writes an async client.
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "INSERT INTO pending_writes (user, method, arguments, created) "
+            "VALUES ('alice', 'food_entry_create', ?, 0)",
+            (json.dumps({"args": ARGS, "kwargs": {}}),),
+        )
+    with WriteQueue(path, client_factory=lambda user: client) as queue:
+        (handle,) = queue.recovered
+        with pytest.raises(TypeError):
+            handle.result(timeout=5)
+        assert (queue.completed, queue.failed) == (0, 1)
+        assert queue.journaled() == 0
+
+
+def test_pending_writes_are_replayed_after_a_crash(stub_api, tmp_path):
+    path = str(tmp_path / "journal.db")
+    release = threading.Event()
+    log = []
+
+    def blocked(params):
+        release.wait(5)
+        return _recording(log)(params)
+
+    stub_api.routes["food_entry.create"] = blocked
+    client = _client(stub_api, "alice")
+    queue = WriteQueue(path)
+    when = datetime.datetime(2024, 1, 1, 8, 30)
+    for name in ("first", "second", "third"):
+        queue.submit(
+            client,
+            "food_entry_create",
+            "1",
+            name,
+            "1",
+            1,
+            "lunch",
+            date=when,
+            user="u1",
+        )
+    assert queue.depth_by_user() == {"u1": 3}
+    # Simulate a crash: the first write is in flight, the others never run.
+    threading.Timer(0.1, release.set).start()
+    queue.close(wait=False)
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM pending_writes").fetchone() == (2,)
+
+    users = []
+
+    def factory(user):
+        users.append(user)
+        return _client(stub_api, {"u1": "alice"}[user])
+
+    with WriteQueue(path, client_factory=factory) as recovered:
+        assert [h.seq for h in recovered.recovered] == [2, 3]
+        assert recovered.flush(timeout=5)
+        assert recovered.journaled() == 0
+    assert users == ["u1"]
+    assert [name for _, name in log] == ["first", "second", "third"]
+    dates = {params["date"] for params in stub_api.calls("food_entry.create")}
+    assert len(dates) == 1
+
+
+def test_handles_can_be_awaited(stub_api, tmp_path):
+    stub_api.routes["saved_meal_item.add"] = {"saved_meal_item_id": {"value": "8"}}
+    client = _client(stub_api, "alice")
+
+    async def handler(queue):
+        handle = queue.submit(client, "saved_meal_item_add", "1", "2", "Apple", "3", 1)
+        return await handle
+
+    with WriteQueue(str(tmp_path / "journal.db")) as queue:
+        assert asyncio.run(handler(queue)) is not None